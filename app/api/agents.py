@@ -148,24 +148,21 @@ async def cancel_workflow(run_id: int, request: Request):
 
 
 @router.get("/api/workflows/runs")
-async def list_runs(db: AsyncSession = Depends(get_db)):
-    runs = await workflow_service.get_runs(db, limit=50)
+async def list_runs(before: int | None = None, db: AsyncSession = Depends(get_db)):
+    runs = await workflow_service.get_runs(db, limit=50, before_id=before)
     return [workflow_service.run_to_dict(r) for r in runs]
 
 
 @router.get("/api/workflows/runs/{run_id}")
-async def get_run_detail(run_id: int, db: AsyncSession = Depends(get_db)):
-    run = await workflow_service.get_run(db, run_id)
+async def get_run_detail(run_id: int):
+    run, steps, matches = await workflow_service.get_run_detail(run_id, matches_limit=50)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
 
-    steps = await workflow_service.get_run_steps(db, run_id)
-    matches = await workflow_service.get_run_matches(db, run_id, limit=50)
-
     return {
         "run": workflow_service.run_to_dict(run),
         "steps": [workflow_service.step_to_dict(s) for s in steps],
-        "matches": [workflow_service.match_to_dict(m) for m in matches],
+        "matches": matches,
     }
 
 
@@ -220,6 +220,29 @@ def _serialize_opp(opp: Opportunity) -> dict:
     }
 
 
+def _serialize_opp_row(row: dict) -> dict:
+    """Serialize a search result row (see search_service.LIST_COLS)."""
+    return {
+        "opportunity_id": row["opportunity_id"],
+        "opportunity_number": row["opportunity_number"],
+        "title": row["title"],
+        "status": row["status"],
+        "agency_code": row["agency_code"],
+        "agency_name": row["agency_name"],
+        "posting_date": row["posting_date"].isoformat() if row["posting_date"] else None,
+        "close_date": row["close_date"].isoformat() if row["close_date"] else None,
+        "close_date_description": row["close_date_description"],
+        "award_ceiling": float(row["award_ceiling"]) if row["award_ceiling"] else None,
+        "award_floor": float(row["award_floor"]) if row["award_floor"] else None,
+        "category": row["category"],
+        "funding_instrument_description": row["funding_instrument_description"],
+        "is_team_based": row["is_team_based"],
+        "is_multi_institution": row["is_multi_institution"],
+        "is_multi_disciplinary": row["is_multi_disciplinary"],
+        "grants_gov_url": row["grants_gov_url"],
+    }
+
+
 def _serialize_opp_detail(opp: Opportunity) -> dict:
     base = _serialize_opp(opp)
     base.update({
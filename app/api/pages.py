@@ -68,7 +68,7 @@ async def search_page(
     facets = await search_service.get_facets(db, status_list)
 
     # Batch query document counts for this page of results
-    opp_internal_ids = [opp.id for opp in results["opportunities"]]
+    opp_internal_ids = [opp["id"] for opp in results["opportunities"]]
     doc_counts = {}
     if opp_internal_ids:
         stmt = (
@@ -85,9 +85,15 @@ async def search_page(
     context = {
         "request": request,
         "opportunities": results["opportunities"],
-        "total": results["total"],
+        "total": results["total_min"],
+        "total_is_estimate": results["total"] is None,
         "page": results["page"],
-        "total_pages": results["total_pages"],
+        # When the count stopped early, every page up to the lower bound exists
+        "total_pages": (
+            results["total_pages"]
+            if results["total_pages"] is not None
+            else (results["total_min"] + results["per_page"] - 1) // results["per_page"]
+        ),
         "facets": facets,
         "query": q or "",
         "status": status or "posted,forecasted",
@@ -1,12 +1,12 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.api.opportunities import _serialize_opp
+from app.api.opportunities import _serialize_opp_row
 from app.services.search_service import search_service
 
 router = APIRouter(tags=["search"])
@@ -30,39 +30,49 @@ async def api_search(
     sort_order: str = "asc",
     page: int = 1,
     per_page: int = 25,
+    after: str | None = None,
+    exact_total: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
     status_list = status.split(",") if status else None
     agency_list = agency.split(",") if agency else None
     category_list = category.split(",") if category else None
 
-    results = await search_service.search(
-        session=db,
-        query=q,
-        status=status_list,
-        agency_codes=agency_list,
-        category_codes=category_list,
-        close_date_start=close_date_start,
-        close_date_end=close_date_end,
-        award_ceiling_min=award_min,
-        award_ceiling_max=award_max,
-        is_team_based=team_based,
-        is_multi_institution=multi_institution,
-        is_multi_disciplinary=multi_disciplinary,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        page=page,
-        per_page=per_page,
-    )
+    try:
+        results = await search_service.search(
+            session=db,
+            query=q,
+            status=status_list,
+            agency_codes=agency_list,
+            category_codes=category_list,
+            close_date_start=close_date_start,
+            close_date_end=close_date_end,
+            award_ceiling_min=award_min,
+            award_ceiling_max=award_max,
+            is_team_based=team_based,
+            is_multi_institution=multi_institution,
+            is_multi_disciplinary=multi_disciplinary,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page=page,
+            per_page=per_page,
+            after=after,
+            exact_total=exact_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     facets = await search_service.get_facets(db, status_list)
 
     return {
-        "opportunities": [_serialize_opp(o) for o in results["opportunities"]],
+        "opportunities": [_serialize_opp_row(o) for o in results["opportunities"]],
         "total": results["total"],
+        "total_min": results["total_min"],
+        "has_more": results["has_more"],
         "page": results["page"],
         "per_page": results["per_page"],
         "total_pages": results["total_pages"],
+        "next_cursor": results["next_cursor"],
         "facets": facets,
     }
 
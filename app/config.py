@@ -18,6 +18,9 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "openai/gpt-oss-120b"
     LLM_API_KEY: str = "not-needed"
 
+    # Upper bound on one matchmaking workflow run (0 disables the limit)
+    WORKFLOW_MAX_SECONDS: int = 6 * 3600
+
     # CollabNet Data API (researcher data)
     COLLABNET_API_URL: str = "https://collabnet-api.nkn.uidaho.edu"
     COLLABNET_API_KEY: str = ""
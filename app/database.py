@@ -10,6 +10,8 @@ engine = create_async_engine(
     pool_recycle=1800,
     pool_size=10,
     max_overflow=20,
+    # Bulk sync statements vary by row count, so keep more compiled forms
+    query_cache_size=1200,
 )
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -5,11 +5,13 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import text
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.config import settings
 from app.database import engine, Base, async_session
 from app.services.cache_service import cache_service
+from app.services.settings_service import settings_service
 from app.services.sync_service import sync_service
 from app.services.researcher_sync_service import researcher_sync_service
 from app.services.agent_service import agent_service
@@ -23,6 +25,61 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# schema_meta row holding the innodb_ft_min_token_size ft_opp_title_desc was built with
+FT_TOKEN_SIZE_META_KEY = "ft_opp_token_size"
+FT_REBUILD_LOCK_KEY = "pf:ft_rebuild_lock"
+FT_REBUILD_LOCK_TTL = 3600  # seconds; a rebuild of a large opportunities table is slow
+
+
+async def _fulltext_index_exists(conn) -> bool:
+    result = await conn.execute(text(
+        "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+        "AND table_name = 'opportunities' AND index_name = 'ft_opp_title_desc' LIMIT 1"
+    ))
+    return result.first() is not None
+
+
+async def _rebuild_fulltext_index():
+    """Rebuild ft_opp_title_desc if it was built with another innodb_ft_min_token_size.
+
+    The setting only applies to FULLTEXT indexes built after it changes. The
+    index is dropped and re-added in one ALTER, so searches wait for the
+    rebuild rather than failing on a missing index.
+    """
+    token = await cache_service.acquire_lock(FT_REBUILD_LOCK_KEY, FT_REBUILD_LOCK_TTL)
+    if token is None:
+        return
+    try:
+        async with engine.begin() as conn:
+            if not await _fulltext_index_exists(conn):
+                return
+            token_size = str((await conn.execute(text("SELECT @@innodb_ft_min_token_size"))).scalar())
+            built_with = (await conn.execute(
+                text("SELECT value FROM schema_meta WHERE `key` = :key"),
+                {"key": FT_TOKEN_SIZE_META_KEY},
+            )).scalar()
+        if built_with == token_size:
+            return
+
+        logger.info(f"Rebuilding opportunity FULLTEXT index for min token size {token_size}")
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "ALTER TABLE opportunities DROP INDEX ft_opp_title_desc, "
+                "ADD FULLTEXT INDEX ft_opp_title_desc (title, synopsis_description)"
+            ))
+            await conn.execute(
+                text(
+                    "INSERT INTO schema_meta (`key`, value) VALUES (:key, :size) "
+                    "ON DUPLICATE KEY UPDATE value = VALUES(value)"
+                ),
+                {"key": FT_TOKEN_SIZE_META_KEY, "size": token_size},
+            )
+        logger.info("Opportunity FULLTEXT index rebuilt")
+    except Exception:
+        logger.exception("Failed to rebuild opportunity FULLTEXT index (non-fatal)")
+    finally:
+        await cache_service.release_lock(FT_REBUILD_LOCK_KEY, token)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -31,9 +88,12 @@ async def lifespan(app: FastAPI):
 
     # Connect to Redis
     await cache_service.connect()
+    settings_service.start_listener()
 
     # Create tables directly via SQLAlchemy
     import app.models  # noqa: F401 - ensure all models are imported
+    async with engine.connect() as conn:
+        ft_index_existed = await _fulltext_index_exists(conn)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables created")
@@ -45,8 +105,22 @@ async def lifespan(app: FastAPI):
             "ALTER TABLE workflow_runs ADD COLUMN IF NOT EXISTS last_completed_node VARCHAR(100) DEFAULT NULL",
             "ALTER TABLE workflow_runs ADD COLUMN IF NOT EXISTS checkpoint_state MEDIUMTEXT DEFAULT NULL",
             "ALTER TABLE workflow_runs ADD COLUMN IF NOT EXISTS retry_count INT NOT NULL DEFAULT 0",
+            "CREATE FULLTEXT INDEX IF NOT EXISTS ft_opp_title_desc ON opportunities (title, synopsis_description)",
+            "ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS close_date_sort DATE "
+            "GENERATED ALWAYS AS (IFNULL(close_date, '9999-12-31')) STORED",
+            "CREATE INDEX IF NOT EXISTS ix_opp_close_date_sort ON opportunities (close_date_sort)",
+            "CREATE INDEX IF NOT EXISTS ix_opp_status_close_ceiling "
+            "ON opportunities (status, close_date, award_ceiling, posting_date)",
+            "DROP INDEX IF EXISTS ix_opp_status_close ON opportunities",
+            "CREATE INDEX IF NOT EXISTS ix_wr_created ON workflow_runs (created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_am_run_score ON agent_matches (run_id, overall_score)",
+            "DROP INDEX IF EXISTS ix_am_run ON agent_matches",
+            "ALTER TABLE researchers ADD COLUMN IF NOT EXISTS verso_etag VARCHAR(255) DEFAULT NULL",
+            "ALTER TABLE researchers ADD COLUMN IF NOT EXISTS verso_last_modified VARCHAR(64) DEFAULT NULL",
             "ALTER TABLE opportunity_documents ADD COLUMN IF NOT EXISTS source VARCHAR(20) NOT NULL DEFAULT 'grants_gov'",
             "UPDATE opportunity_documents SET doc_category = 'solicitation' WHERE doc_category IN ('rfp_rfa', 'nofo')",
+            "CREATE TABLE IF NOT EXISTS schema_meta "
+            "(`key` VARCHAR(100) NOT NULL PRIMARY KEY, value VARCHAR(255) DEFAULT NULL)",
         ]:
             try:
                 await conn.execute(sa_text(ddl))
@@ -54,6 +128,17 @@ async def lifespan(app: FastAPI):
                 pass  # Column already exists or table doesn't exist yet
     logger.info("Startup migrations applied")
 
+    # An index built by this boot already uses the current token size
+    if not ft_index_existed:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(
+                    sa_text("INSERT IGNORE INTO schema_meta (`key`, value) VALUES (:key, @@innodb_ft_min_token_size)"),
+                    {"key": FT_TOKEN_SIZE_META_KEY},
+                )
+            except Exception:
+                logger.exception("Failed to record FULLTEXT token size (non-fatal)")
+
     # Sync agent definitions from AGENT.md files and seed defaults
     try:
         async with async_session() as session:
@@ -97,6 +182,8 @@ async def lifespan(app: FastAPI):
 
     if _is_primary:
         await setup_scheduler_from_db()
+        asyncio.create_task(_rebuild_fulltext_index())
+        asyncio.create_task(sync_service._refresh_facet_summary())
         if settings.SYNC_ON_STARTUP:
             asyncio.create_task(sync_service.full_sync())
         if settings.RESEARCHER_SYNC_ON_STARTUP:
@@ -107,6 +194,9 @@ async def lifespan(app: FastAPI):
     # Shutdown
     from app.tasks.scheduler import scheduler
     scheduler.shutdown(wait=False)
+    from app.services.verso_client import verso_client
+    await verso_client.close()
+    await settings_service.close()
     await cache_service.close()
     await engine.dispose()
     logger.info("ProposalForge shutdown complete")
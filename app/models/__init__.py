@@ -34,6 +34,7 @@ from app.models.agent import (
     AgentMatch,
 )
 from app.models.document import OpportunityDocument, DocumentChunk
+from app.models.facet_summary import OpportunityFacetSummary, CategoryFacetSummary
 
 __all__ = [
     "Agency",
@@ -67,4 +68,6 @@ __all__ = [
     "AgentMatch",
     "OpportunityDocument",
     "DocumentChunk",
+    "OpportunityFacetSummary",
+    "CategoryFacetSummary",
 ]
@@ -96,6 +96,7 @@ class WorkflowRun(Base):
     __table_args__ = (
         Index("ix_wr_workflow_status", "workflow_id", "status"),
         Index("ix_wr_status", "status"),
+        Index("ix_wr_created", "created_at"),
     )
 
 
@@ -148,7 +149,7 @@ class AgentMatch(Base):
     opportunity = relationship("Opportunity")
 
     __table_args__ = (
-        Index("ix_am_run", "run_id"),
+        Index("ix_am_run_score", "run_id", "overall_score"),
         Index("ix_am_researcher_score", "researcher_id", "overall_score"),
         Index("ix_am_opp_score", "opportunity_id", "overall_score"),
     )
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import String, Integer, DateTime, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class OpportunityFacetSummary(Base):
+    """Pre-aggregated opportunity counts backing the search facets.
+
+    Rebuilt by SearchService.refresh_facet_summary after each Grants.gov
+    sync and daily, since deadline buckets are relative to the refresh date.
+    Deadline buckets are exclusive: week (0-7 days), month (8-30),
+    quarter (31-90), other, none.
+    """
+    __tablename__ = "opportunity_facet_summary"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    agency_code: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    deadline_bucket: Mapped[str] = mapped_column(String(10), nullable=False)
+    ceiling_bucket: Mapped[str] = mapped_column(String(10), nullable=False)
+    opportunity_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+    )
+
+    __table_args__ = (
+        Index("ix_facet_summary_status_agency", "status", "agency_code"),
+    )
+
+
+class CategoryFacetSummary(Base):
+    __tablename__ = "category_facet_summary"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    category_code: Mapped[str] = mapped_column(String(10), nullable=False)
+    category_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    opportunity_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_category_summary_status_code", "status", "category_code"),
+    )
@@ -3,7 +3,7 @@ from decimal import Decimal
 
 from sqlalchemy import (
     String, Text, Date, DateTime, Numeric, Boolean, Integer,
-    ForeignKey, Index, text,
+    ForeignKey, Index, Computed, text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -28,6 +28,11 @@ class Opportunity(Base):
 
     posting_date: Mapped[date | None] = mapped_column(Date, nullable=True)
     close_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    # close_date with NULL mapped past any real date, so an ascending sort puts
+    # open-ended opportunities last and can read ix_opp_close_date_sort
+    close_date_sort: Mapped[date | None] = mapped_column(
+        Date, Computed("IFNULL(close_date, '9999-12-31')", persisted=True),
+    )
     close_date_description: Mapped[str | None] = mapped_column(Text, nullable=True)
     archive_date: Mapped[date | None] = mapped_column(Date, nullable=True)
 
@@ -77,8 +82,16 @@ class Opportunity(Base):
     documents = relationship("OpportunityDocument", back_populates="opportunity", cascade="all, delete-orphan", lazy="noload")
 
     __table_args__ = (
-        Index("ix_opp_status_close", "status", "close_date"),
+        # Covers the status-filtered deadline/ceiling/posting aggregates
+        # (InnoDB appends id); also serves every (status, close_date) lookup
+        Index("ix_opp_status_close_ceiling", "status", "close_date", "award_ceiling", "posting_date"),
         Index("ix_opp_agency_status", "agency_code", "status"),
         Index("ix_opp_ceiling", "award_ceiling"),
         Index("ix_opp_posting_date", "posting_date"),
+        Index("ix_opp_close_date_sort", "close_date_sort"),
+        Index(
+            "ft_opp_title_desc",
+            "title", "synopsis_description",
+            mysql_prefix="FULLTEXT",
+        ),
     )
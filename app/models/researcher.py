@@ -43,6 +43,9 @@ class Researcher(Base):
         onupdate=datetime.utcnow,
     )
     last_synced_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Cache validators from the last VERSO fetch (raw ETag / Last-Modified headers)
+    verso_etag: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    verso_last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     # Relationships
     keywords = relationship("ResearcherKeyword", back_populates="researcher", cascade="all, delete-orphan", lazy="selectin")
@@ -51,8 +51,16 @@ async def _emit_log(run_id: int, event_dict: dict):
         logger.debug("Failed to emit log event", exc_info=True)
 
 
+# run_id -> set once cancellation of that run has reached this worker, so
+# checks inside nodes skip the Redis round trip
+_cancel_events: dict[int, asyncio.Event] = {}
+
+
 async def _is_cancelled(run_id: int) -> bool:
-    """Check Redis cancel flag."""
+    """Check the in-process cancel event, then the Redis cancel flag."""
+    event = _cancel_events.get(run_id)
+    if event is not None and event.is_set():
+        return True
     try:
         r = cache_service._redis
         if not r:
@@ -913,33 +921,35 @@ async def persist_node(state: MatchmakingState) -> dict:
     try:
         async with async_session() as session:
             # Delete any existing matches for this run (idempotent on resume)
-            from sqlalchemy import delete
+            from sqlalchemy import delete, insert
             await session.execute(
                 delete(AgentMatch).where(AgentMatch.run_id == run_id)
             )
 
-            for m in final_matches:
-                r_id = m.get("researcher_id")
-                o_id = m.get("opportunity_id")
-                if not r_id or not o_id:
-                    continue
-
-                agent_match = AgentMatch(
-                    run_id=run_id,
-                    researcher_id=r_id,
-                    opportunity_id=o_id,
-                    overall_score=m.get("overall_score", 0),
-                    relevance_score=m.get("relevance_score", 0),
-                    feasibility_score=m.get("feasibility_score", 0),
-                    impact_score=m.get("impact_score", 0),
-                    justification=m.get("justification", ""),
-                    critique=m.get("critique", ""),
-                    summary=m.get("summary", ""),
-                    confidence=m.get("confidence", "medium"),
-                    computed_at=datetime.utcnow(),
-                )
-                session.add(agent_match)
-                inserted += 1
+            computed_at = datetime.utcnow()
+            rows = [
+                {
+                    "run_id": run_id,
+                    "researcher_id": m["researcher_id"],
+                    "opportunity_id": m["opportunity_id"],
+                    "overall_score": m.get("overall_score", 0),
+                    "relevance_score": m.get("relevance_score", 0),
+                    "feasibility_score": m.get("feasibility_score", 0),
+                    "impact_score": m.get("impact_score", 0),
+                    "justification": m.get("justification", ""),
+                    "critique": m.get("critique", ""),
+                    "summary": m.get("summary", ""),
+                    "confidence": m.get("confidence", "medium"),
+                    "computed_at": computed_at,
+                }
+                for m in final_matches
+                if m.get("researcher_id") and m.get("opportunity_id")
+            ]
+            # One executemany; ORM adds would issue an INSERT per row to
+            # fetch each autoincrement id
+            if rows:
+                await session.execute(insert(AgentMatch), rows)
+            inserted = len(rows)
 
             await session.commit()
 
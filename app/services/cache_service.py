@@ -1,6 +1,13 @@
+import asyncio
+import base64
+import fnmatch
 import json
 import logging
-from typing import Any
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
 
 import redis.asyncio as redis
 
@@ -11,26 +18,155 @@ logger = logging.getLogger(__name__)
 FACET_TTL = 300  # 5 minutes
 AGENCY_LIST_TTL = 3600  # 1 hour
 STATS_TTL = 300  # 5 minutes
+REFRESH_LOCK_TTL = 30  # max seconds one worker may spend recomputing an entry
+COLD_WAIT_TIMEOUT = 5.0  # seconds to wait for another worker's first compute of a key
+COLD_WAIT_INTERVAL = 0.1  # seconds between re-reads while waiting
+L1_TTL = 10  # seconds an entry is served from process memory without Redis
+L1_MAX_ENTRIES = 16  # in-process entries kept, least recently used evicted first
+INVALIDATE_CHANNEL = "pf:invalidate"  # tells every worker to drop its L1 copies
+# Every cached-view prefix under pf:*. Locks, sync/progress stats and workflow
+# state share the namespace and must survive invalidate_all().
+CACHE_PREFIXES = (
+    "pf:facets", "pf:stats", "pf:agencies", "pf:categories",
+    "pf:researcher_facets", "pf:researcher_stats", "pf:researcher_departments",
+    "pf:analytics:", "pf:matches:", "pf:agent_matches:",
+)
+
+# Values whose JSON exceeds this many bytes are stored zlib-compressed
+COMPRESS_MIN_BYTES = 4096
+# JSON text never starts with this, so it marks a compressed payload
+COMPRESSED_PREFIX = "z:"
+
+# SCANs and UNLINKs every key matching each ARGV pattern in one round trip.
+# UNLINK frees the values in the background, so large deletes don't block.
+_UNLINK_MATCHING_LUA = """
+local removed = 0
+for _, pattern in ipairs(ARGV) do
+    local cursor = "0"
+    repeat
+        local res = redis.call("SCAN", cursor, "MATCH", pattern, "COUNT", 1000)
+        cursor = res[1]
+        if #res[2] > 0 then
+            removed = removed + redis.call("UNLINK", unpack(res[2]))
+        end
+    until cursor == "0"
+end
+return removed
+"""
+
+# Owner-checked lock scripts: only the holder of the token may extend or
+# release, so a worker whose lock expired can't drop its successor's lock
+_EXTEND_LOCK_LUA = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LOCK_LUA = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def _encode(value: Any) -> str:
+    data = json.dumps(value, default=str, separators=(",", ":"))
+    if len(data) < COMPRESS_MIN_BYTES:
+        return data
+    # The client decodes responses as text, so compressed bytes are base64'd
+    packed = base64.b64encode(zlib.compress(data.encode(), 3)).decode("ascii")
+    return COMPRESSED_PREFIX + packed
+
+
+def _decode(data: str) -> Any:
+    if data.startswith(COMPRESSED_PREFIX):
+        data = zlib.decompress(base64.b64decode(data[len(COMPRESSED_PREFIX):])).decode()
+    return json.loads(data)
 
 
 class CacheService:
     def __init__(self):
         self._redis: redis.Redis | None = None
+        # key -> (expires_at monotonic, value), in LRU order
+        self._l1: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._listener: asyncio.Task | None = None
+        # key -> reset callback for in-process state kept outside the L1 tier
+        self._local_resets: dict[str, Callable[[], None]] = {}
+        self._unlink_matching = None
+        self._release_lock_script = None
 
     async def connect(self):
         self._redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._unlink_matching = self._redis.register_script(_UNLINK_MATCHING_LUA)
+        self._release_lock_script = self._redis.register_script(_RELEASE_LOCK_LUA)
+        self._listener = asyncio.create_task(self._listen())
 
     async def close(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
         if self._redis:
             await self._redis.close()
 
+    def _l1_get(self, key: str) -> tuple[bool, Any]:
+        entry = self._l1.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            del self._l1[key]
+            return False, None
+        self._l1.move_to_end(key)
+        return True, entry[1]
+
+    def _l1_set(self, key: str, value: Any):
+        self._l1[key] = (time.monotonic() + L1_TTL, value)
+        self._l1.move_to_end(key)
+        while len(self._l1) > L1_MAX_ENTRIES:
+            self._l1.popitem(last=False)
+
+    def register_local(self, key: str, reset: Callable[[], None]):
+        """Call reset on every worker whenever an invalidation pattern matches key."""
+        self._local_resets[key] = reset
+
+    def _drop_local(self, pattern: str):
+        for key in [k for k in self._l1 if fnmatch.fnmatchcase(k, pattern)]:
+            del self._l1[key]
+        for key, reset in self._local_resets.items():
+            if fnmatch.fnmatchcase(key, pattern):
+                reset()
+
+    async def _listen(self):
+        """Clear the in-process tier whenever any worker invalidates the cache."""
+        while True:
+            pubsub = self.pubsub()
+            if pubsub is None:
+                return
+            try:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._drop_local(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                self._drop_local("*")
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.close()
+
     async def get(self, key: str) -> Any | None:
         if not self._redis:
             return None
         try:
             data = await self._redis.get(key)
             if data:
-                return json.loads(data)
+                return _decode(data)
         except Exception as e:
             logger.warning(f"Cache get error for {key}: {e}")
         return None
@@ -39,32 +175,154 @@ class CacheService:
         if not self._redis:
             return
         try:
-            await self._redis.set(key, json.dumps(value, default=str), ex=ttl)
+            await self._redis.set(key, _encode(value), ex=ttl)
         except Exception as e:
             logger.warning(f"Cache set error for {key}: {e}")
 
-    async def delete(self, key: str):
+    async def delete(self, *keys: str):
         if not self._redis:
             return
         try:
-            await self._redis.delete(key)
+            await self._redis.delete(*keys)
         except Exception as e:
-            logger.warning(f"Cache delete error for {key}: {e}")
+            logger.warning(f"Cache delete error for {', '.join(keys)}: {e}")
 
     async def delete_pattern(self, pattern: str):
+        await self._delete_patterns([pattern])
+
+    async def invalidate_prefix(self, *prefixes: str):
+        """Drop every cached key starting with one of the given prefixes."""
+        await self._delete_patterns([f"{prefix}*" for prefix in prefixes])
+
+    async def _delete_patterns(self, patterns: list[str]):
+        if not patterns:
+            return
+        if self._redis:
+            try:
+                await self._unlink_matching(args=patterns)
+            except Exception as e:
+                logger.warning(f"Cache delete error for {patterns}: {e}")
+        for pattern in patterns:
+            self._drop_local(pattern)
+            await self.publish(INVALIDATE_CHANNEL, pattern)
+
+    async def publish(self, channel: str, message: str):
         if not self._redis:
             return
         try:
-            keys = []
-            async for key in self._redis.scan_iter(match=pattern):
-                keys.append(key)
-            if keys:
-                await self._redis.delete(*keys)
+            await self._redis.publish(channel, message)
         except Exception as e:
-            logger.warning(f"Cache delete error for {pattern}: {e}")
+            logger.warning(f"Cache publish error for {channel}: {e}")
+
+    def pubsub(self):
+        """Return a new pub/sub connection, or None when Redis isn't connected."""
+        return self._redis.pubsub() if self._redis else None
+
+    def pipeline(self):
+        """Return a non-transactional pipeline, or None when Redis isn't connected."""
+        return self._redis.pipeline(transaction=False) if self._redis else None
+
+    @staticmethod
+    def pipe_set(pipe, key: str, value: Any, ttl: int = FACET_TTL):
+        """Queue a set() on a pipeline, encoded the same way as set()."""
+        pipe.set(key, _encode(value), ex=ttl)
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]], ttl: int = FACET_TTL,
+    ) -> Any:
+        """Cache-aside with stale-while-revalidate and single-flight refresh.
+
+        Entries are stored as {"data", "soft_expiry"} and kept in Redis for
+        2*ttl. Past soft expiry, one worker takes a short lock and recomputes
+        while everyone else keeps serving the stale value; on a cold miss the
+        others wait briefly for that worker's result. A short-lived
+        in-process copy avoids a Redis round-trip for repeated reads.
+        """
+        hit, value = self._l1_get(key)
+        if hit:
+            return value
+
+        entry = await self.get(key)
+        lock_key = f"{key}:lock"
+        if isinstance(entry, dict) and "soft_expiry" in entry:
+            if time.time() < entry["soft_expiry"]:
+                self._l1_set(key, entry["data"])
+                return entry["data"]
+            token = await self.acquire_lock(lock_key, REFRESH_LOCK_TTL)
+            if token is None:
+                return entry["data"]
+        else:
+            token = await self.acquire_lock(lock_key, REFRESH_LOCK_TTL)
+            if token is None:
+                # Cold key being computed elsewhere: wait for that result
+                # rather than computing it again
+                entry = await self._wait_for_entry(key)
+                if entry is not None:
+                    self._l1_set(key, entry["data"])
+                    return entry["data"]
+
+        try:
+            data = await compute()
+            await self.set(key, {"data": data, "soft_expiry": time.time() + ttl}, ttl * 2)
+            self._l1_set(key, data)
+            return data
+        finally:
+            if token:
+                await self.release_lock(lock_key, token)
+
+    async def _wait_for_entry(self, key: str) -> dict | None:
+        """Poll for an entry another worker is computing; None if it doesn't appear in time."""
+        deadline = time.monotonic() + COLD_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(COLD_WAIT_INTERVAL)
+            entry = await self.get(key)
+            if isinstance(entry, dict) and "soft_expiry" in entry:
+                return entry
+        return None
 
     async def invalidate_all(self):
-        await self.delete_pattern("pf:*")
+        """Drop every cached view; lock and state keys are kept."""
+        self._l1.clear()
+        await self.invalidate_prefix(*CACHE_PREFIXES)
+
+    async def acquire_lock(self, key: str, ttl: int) -> str | None:
+        """Take an owner-tokened lock and return the token, or None if it is held.
+
+        If Redis is unavailable the caller gets a token and may proceed.
+        """
+        token = uuid.uuid4().hex
+        if not self._redis:
+            return token
+        try:
+            if not await self._redis.set(key, token, nx=True, ex=ttl):
+                return None
+        except Exception as e:
+            logger.warning(f"Cache lock error for {key}: {e}")
+        return token
+
+    @staticmethod
+    def pipe_extend_lock(pipe, key: str, token: str, ttl: int):
+        """Queue a TTL extension of a lock, applied only if token still owns it."""
+        pipe.eval(_EXTEND_LOCK_LUA, 1, key, token, ttl)
+
+    async def extend_lock(self, key: str, token: str, ttl: int):
+        pipe = self.pipeline()
+        if pipe is None:
+            return
+        try:
+            self.pipe_extend_lock(pipe, key, token, ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Cache lock extend error for {key}: {e}")
+
+    async def release_lock(self, key: str, token: str):
+        """Delete a lock only if token still owns it."""
+        if not self._redis:
+            return
+        try:
+            await self._release_lock_script(keys=[key], args=[token])
+        except Exception as e:
+            logger.warning(f"Cache unlock error for {key}: {e}")
 
     async def acquire_primary_lock(self, ttl: int = 300) -> bool:
         """Try to acquire a lock so only one uvicorn worker runs startup tasks."""
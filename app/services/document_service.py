@@ -7,7 +7,7 @@ import uuid
 from datetime import date, datetime
 
 import httpx
-from sqlalchemy import select, or_, func, text
+from sqlalchemy import select, insert, or_, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
@@ -32,60 +32,57 @@ class DocumentService:
         self.processing_stats: dict = {}
         self._grants_client = GrantsGovClient()
 
-    async def extract_attachment_metadata(
-        self, session: AsyncSession, opp, detail: dict
+    async def extract_attachment_metadata_many(
+        self, session: AsyncSession, items: list[tuple[int, dict]]
     ) -> int:
-        """Parse attachment metadata from fetchOpportunity response and upsert rows.
+        """Upsert attachment metadata for many (opportunity_id, detail) pairs.
 
-        Returns the number of new documents created.
+        Existing rows are loaded with one query and new rows are written with
+        one multi-row INSERT. Returns the number of new documents created.
         """
-        folders = detail.get("synopsisAttachmentFolders") or []
-        created = 0
-
-        for folder in folders:
-            folder_name = folder.get("folderName", "")
-            attachments = folder.get("synopsisAttachments") or []
-
-            for att in attachments:
-                att_id = str(att.get("id", ""))
-                if not att_id:
-                    continue
-
-                # Check if already exists
-                stmt = select(OpportunityDocument).where(
-                    OpportunityDocument.attachment_id == att_id
-                )
-                result = await session.execute(stmt)
-                existing = result.scalar_one_or_none()
-
-                if existing:
-                    # Update metadata if changed
-                    existing.file_name = att.get("fileName", existing.file_name)
-                    existing.mime_type = att.get("mimeType", existing.mime_type)
-                    existing.file_size = att.get("fileLobSize", existing.file_size)
-                    existing.file_description = att.get("fileDescription", existing.file_description)
-                    existing.folder_name = folder_name
-                    continue
-
-                doc = OpportunityDocument(
-                    opportunity_id=opp.id,
-                    attachment_id=att_id,
-                    file_name=att.get("fileName", "unknown"),
-                    mime_type=att.get("mimeType"),
-                    file_size=att.get("fileLobSize"),
-                    file_description=att.get("fileDescription"),
-                    folder_name=folder_name,
-                    download_status="pending",
-                    ocr_status="pending",
-                    embed_status="pending",
-                )
-                session.add(doc)
-                created += 1
+        attachments: dict[str, tuple[int, str, dict]] = {}
+        for opportunity_id, detail in items:
+            for folder in detail.get("synopsisAttachmentFolders") or []:
+                folder_name = folder.get("folderName", "")
+                for att in folder.get("synopsisAttachments") or []:
+                    att_id = str(att.get("id", ""))
+                    if att_id:
+                        attachments[att_id] = (opportunity_id, folder_name, att)
+        if not attachments:
+            return 0
 
-        if created > 0:
-            await session.flush()
+        result = await session.execute(
+            select(OpportunityDocument).where(
+                OpportunityDocument.attachment_id.in_(list(attachments))
+            )
+        )
+        for existing in result.scalars():
+            # Update metadata if changed
+            _, folder_name, att = attachments.pop(existing.attachment_id)
+            existing.file_name = att.get("fileName", existing.file_name)
+            existing.mime_type = att.get("mimeType", existing.mime_type)
+            existing.file_size = att.get("fileLobSize", existing.file_size)
+            existing.file_description = att.get("fileDescription", existing.file_description)
+            existing.folder_name = folder_name
+
+        if attachments:
+            await session.execute(insert(OpportunityDocument), [
+                {
+                    "opportunity_id": opportunity_id,
+                    "attachment_id": att_id,
+                    "file_name": att.get("fileName", "unknown"),
+                    "mime_type": att.get("mimeType"),
+                    "file_size": att.get("fileLobSize"),
+                    "file_description": att.get("fileDescription"),
+                    "folder_name": folder_name,
+                    "download_status": "pending",
+                    "ocr_status": "pending",
+                    "embed_status": "pending",
+                }
+                for att_id, (opportunity_id, folder_name, att) in attachments.items()
+            ])
 
-        return created
+        return len(attachments)
 
     # Domains to skip when extracting linked documents
     _SKIP_DOMAINS = {
@@ -907,8 +904,9 @@ class DocumentService:
             async with async_session() as session:
                 # Get settings once
                 ocr_settings = await settings_service.get_ocr_settings(session)
-                embed_settings = await settings_service.get_embedding_settings(session)
-                llm_settings = await settings_service.get_llm_settings(session)
+                model_settings = await settings_service.get_all_model_settings(session)
+                embed_settings = model_settings["embedding"]
+                llm_settings = model_settings["llm"]
 
                 # Reset all failed docs back to pending and clear errors
                 await session.execute(
@@ -145,7 +145,7 @@ class PipelineService:
             os.makedirs(doc_path, exist_ok=True)
             logger.info(f"Cleared document storage at {doc_path}")
 
-        # Invalidate all caches
+        # Invalidate all cached views; workflow checkpoints and locks are kept
         from app.services.cache_service import cache_service
         await cache_service.invalidate_all()
         logger.info("Nuke complete — ready for fresh sync")
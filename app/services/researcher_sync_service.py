@@ -4,7 +4,7 @@ import re
 from datetime import datetime, date
 from decimal import Decimal, InvalidOperation
 
-from sqlalchemy import select, text
+from sqlalchemy import insert, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import async_session
@@ -26,6 +26,28 @@ logger = logging.getLogger(__name__)
 
 SYNC_STATS_KEY = "pf:researcher_sync_stats"
 SYNC_STATS_TTL = 3600
+# Seconds between background stats publishes while a sync is running
+STATS_PUBLISH_INTERVAL = 2.0
+# Rows upserted per transaction; each row runs inside its own SAVEPOINT
+COMMIT_BATCH_SIZE = 200
+# Cached views derived from researcher data; locks, stats and workflow
+# state under pf:* are left alone when a sync finishes
+RESEARCHER_CACHE_PREFIXES = (
+    "pf:researcher_facets", "pf:researcher_stats", "pf:researcher_departments",
+    "pf:analytics:", "pf:matches:", "pf:agent_matches:",
+)
+
+# Link tables populated from VERSO records, keyed as in pending-link dicts
+VERSO_LINK_TABLES = {
+    "grants": ResearcherGrant.__table__,
+    "projects": ResearcherProject.__table__,
+    "activities": ResearcherActivity.__table__,
+}
+
+
+def _new_pending_links() -> dict[str, list[dict]]:
+    return {key: [] for key in VERSO_LINK_TABLES}
+
 
 # Strip HTML tags from AI summaries
 HTML_TAG_RE = re.compile(r"<[^>]+>")
@@ -37,6 +59,21 @@ def _strip_html(text_val: str | None) -> str | None:
     return HTML_TAG_RE.sub("", text_val).strip()
 
 
+# Alternative VERSO keys for each nested entity list, in lookup order
+VERSO_GRANT_KEYS = ("grant", "grants")
+VERSO_PROJECT_KEYS = ("project", "projects")
+VERSO_ACTIVITY_KEYS = ("activity", "activities")
+
+
+def _extract_list(data: dict, keys: tuple[str, ...]) -> list:
+    """Return the first truthy value among keys, normalized to a list."""
+    for key in keys:
+        val = data.get(key)
+        if val:
+            return val if isinstance(val, list) else [val]
+    return []
+
+
 def _extract_contact(contacts: list | None, contact_type: str) -> str | None:
     """Extract a contact value from the contacts array by type."""
     if not contacts:
@@ -78,7 +115,7 @@ class ResearcherSyncService:
         self.is_syncing = False
         self.last_sync: datetime | None = None
         self.sync_stats: dict = {}
-        self._cancel_requested = False
+        self._cancel_event = asyncio.Event()
         self._current_log_id: int | None = None
         self._task: asyncio.Task | None = None
 
@@ -91,6 +128,15 @@ class ResearcherSyncService:
         except Exception:
             pass
 
+    async def _periodic_publish(self, interval: float = STATS_PUBLISH_INTERVAL):
+        """Publish sync_stats on a fixed cadence so hot loops never await Redis."""
+        while self.is_syncing and not self._cancel_event.is_set():
+            await self._publish_stats()
+            try:
+                await asyncio.wait_for(self._cancel_event.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
     @staticmethod
     async def get_shared_stats() -> dict | None:
         return await cache_service.get(SYNC_STATS_KEY)
@@ -125,7 +171,7 @@ class ResearcherSyncService:
 
     def cancel_sync(self):
         if self.is_syncing:
-            self._cancel_requested = True
+            self._cancel_event.set()
             # Cancel the asyncio task to interrupt any pending await (e.g. HTTP requests)
             if self._task and not self._task.done():
                 self._task.cancel()
@@ -464,33 +510,51 @@ class ResearcherSyncService:
         return {"linked": linked, "skipped": skipped, "errors": errors}
 
     async def _apply_summaries(self, session: AsyncSession, summaries: list[dict]) -> int:
-        """Match summaries to researchers and update ai_summary fields (decomposed + concatenated)."""
-        matched = 0
+        """Match summaries to researchers and update ai_summary fields (decomposed + concatenated).
+
+        Researchers are loaded once into in-memory lookups and all matched
+        rows are written with a single executemany UPDATE by primary key.
+        """
+        by_primary_id: dict[str, int] = {}
+        by_first_last: dict[tuple[str, str], int | None] = {}
+        by_full_name: dict[str, int | None] = {}
+        result = await session.execute(
+            select(Researcher.id, Researcher.primary_id, Researcher.first_name,
+                   Researcher.last_name, Researcher.full_name)
+        )
+        # Keys are lowercased to mirror the case-insensitive column collation
+        for rid, primary_id, first_name, last_name, full_name in result.all():
+            by_primary_id[primary_id.lower()] = rid
+            # None marks an ambiguous name, which is skipped like before
+            if first_name is not None and last_name is not None:
+                key = (first_name.lower(), last_name.lower())
+                by_first_last[key] = None if key in by_first_last else rid
+            if full_name is not None:
+                key = full_name.lower()
+                by_full_name[key] = None if key in by_full_name else rid
+
+        updates: dict[int, dict] = {}
         for summary in summaries:
             try:
                 # Try to match by primary_id / username first
                 target_id = summary.get("primary_id") or summary.get("username") or summary.get("researcher_id")
-                researcher = None
+                researcher_id = None
 
                 if target_id:
-                    stmt = select(Researcher).where(Researcher.primary_id == str(target_id))
-                    result = await session.execute(stmt)
-                    researcher = result.scalar_one_or_none()
+                    researcher_id = by_primary_id.get(str(target_id).lower())
 
                 # Fall back to first_name + last_name matching
-                if not researcher:
+                if not researcher_id:
                     first = (summary.get("first_name") or "").strip()
                     last = (summary.get("last_name") or "").strip()
                     if first and last:
-                        stmt = select(Researcher).where(
-                            Researcher.first_name == first,
-                            Researcher.last_name == last,
-                        )
-                        result = await session.execute(stmt)
-                        researcher = result.scalar_one_or_none()
+                        key = (first.lower(), last.lower())
+                        if key in by_first_last and by_first_last[key] is None:
+                            continue
+                        researcher_id = by_first_last.get(key)
 
                 # Fall back to full_name matching
-                if not researcher:
+                if not researcher_id:
                     name = summary.get("name") or summary.get("full_name") or summary.get("researcher_name") or ""
                     if not name:
                         first = (summary.get("first_name") or "").strip()
@@ -498,17 +562,12 @@ class ResearcherSyncService:
                         if first or last:
                             name = f"{first} {last}".strip()
                     if name:
-                        stmt = select(Researcher).where(Researcher.full_name == name)
-                        result = await session.execute(stmt)
-                        researcher = result.scalar_one_or_none()
+                        researcher_id = by_full_name.get(name.lower())
 
-                if researcher:
+                if researcher_id:
                     # Extract individual summary sections and concatenated text
                     ai_summaries = summary.get("ai_summaries")
-                    themes_text = None
-                    methods_text = None
-                    impacts_text = None
-                    collabs_text = None
+                    sections = {"themes": None, "methods": None, "impacts": None, "collabs": None}
                     raw_summary = ""
 
                     if isinstance(ai_summaries, dict):
@@ -526,14 +585,7 @@ class ResearcherSyncService:
                                     cleaned = _strip_html(resp)
                                     if cleaned:
                                         parts.append(cleaned)
-                                        if attr_name == "themes":
-                                            themes_text = cleaned
-                                        elif attr_name == "methods":
-                                            methods_text = cleaned
-                                        elif attr_name == "impacts":
-                                            impacts_text = cleaned
-                                        elif attr_name == "collabs":
-                                            collabs_text = cleaned
+                                        sections[attr_name] = cleaned
                         raw_summary = "\n\n".join(p for p in parts if p)
 
                     # Fall back to flat fields
@@ -542,18 +594,22 @@ class ResearcherSyncService:
                         raw_summary = _strip_html(raw_summary) or ""
 
                     if raw_summary:
-                        researcher.ai_summary = raw_summary
-                        researcher.ai_summary_themes = themes_text
-                        researcher.ai_summary_methods = methods_text
-                        researcher.ai_summary_impacts = impacts_text
-                        researcher.ai_summary_collabs = collabs_text
-                        matched += 1
+                        updates[researcher_id] = {
+                            "id": researcher_id,
+                            "ai_summary": raw_summary,
+                            "ai_summary_themes": sections["themes"],
+                            "ai_summary_methods": sections["methods"],
+                            "ai_summary_impacts": sections["impacts"],
+                            "ai_summary_collabs": sections["collabs"],
+                        }
 
             except Exception as e:
                 logger.error(f"Error applying summary: {e}")
                 continue
 
-        return matched
+        if updates:
+            await session.execute(update(Researcher), list(updates.values()))
+        return len(updates)
 
     # ------------------------------------------------------------------
     # VERSO sync helpers
@@ -792,11 +848,7 @@ class ResearcherSyncService:
         count = 0
         try:
             researcher_data = await verso_client.fetch_researcher(primary_id)
-            grants_list = researcher_data.get("grant") or researcher_data.get("grants") or []
-            if not isinstance(grants_list, list):
-                grants_list = [grants_list] if grants_list else []
-
-            for g_data in grants_list:
+            for g_data in _extract_list(researcher_data, VERSO_GRANT_KEYS):
                 if not isinstance(g_data, dict):
                     continue
                 grant = await self._upsert_grant(session, g_data)
@@ -813,11 +865,7 @@ class ResearcherSyncService:
         count = 0
         try:
             researcher_data = await verso_client.fetch_researcher(primary_id)
-            projects_list = researcher_data.get("project") or researcher_data.get("projects") or []
-            if not isinstance(projects_list, list):
-                projects_list = [projects_list] if projects_list else []
-
-            for p_data in projects_list:
+            for p_data in _extract_list(researcher_data, VERSO_PROJECT_KEYS):
                 if not isinstance(p_data, dict):
                     continue
                 project = await self._upsert_project(session, p_data)
@@ -834,11 +882,7 @@ class ResearcherSyncService:
         count = 0
         try:
             researcher_data = await verso_client.fetch_researcher(primary_id)
-            activities_list = researcher_data.get("activity") or researcher_data.get("activities") or []
-            if not isinstance(activities_list, list):
-                activities_list = [activities_list] if activities_list else []
-
-            for a_data in activities_list:
+            for a_data in _extract_list(researcher_data, VERSO_ACTIVITY_KEYS):
                 if not isinstance(a_data, dict):
                     continue
                 activity = await self._upsert_activity(session, a_data)
@@ -866,61 +910,110 @@ class ResearcherSyncService:
     # ------------------------------------------------------------------
 
     async def _sync_researcher_verso_data(
-        self, session: AsyncSession, researcher_id: int, primary_id: str
+        self, session: AsyncSession, researcher_id: int, primary_id: str,
+        pending_links: dict[str, list[dict]],
+        etag: str | None = None, last_modified: str | None = None,
     ) -> dict:
-        """Fetch full VERSO researcher record once and extract grants, projects, activities, identifiers."""
+        """Fetch full VERSO researcher record once and extract grants, projects, activities, identifiers.
+
+        Researcher links are appended to pending_links rather than inserted;
+        callers write them with _flush_pending_links. If the record is
+        unchanged since the stored etag/last_modified, nothing is touched.
+        """
         counts = {"grants": 0, "projects": 0, "activities": 0, "identifiers": 0}
         try:
-            researcher_data = await verso_client.fetch_researcher(primary_id)
+            researcher_data = await verso_client.fetch_researcher(
+                primary_id, etag=etag, last_modified=last_modified,
+            )
         except Exception as e:
             if "404" not in str(e) and "not found" not in str(e).lower():
                 logger.error(f"Error fetching VERSO data for {primary_id}: {e}")
             return counts
 
+        if researcher_data is None:
+            return counts
+
+        # The upserts log and swallow their own errors; validators are only
+        # stored if every child row saved, so a partial record is refetched
+        complete = True
+
         # Grants
-        grants_list = researcher_data.get("grant") or researcher_data.get("grants") or []
-        if not isinstance(grants_list, list):
-            grants_list = [grants_list] if grants_list else []
-        for g_data in grants_list:
+        for g_data in _extract_list(researcher_data, VERSO_GRANT_KEYS):
             if not isinstance(g_data, dict):
                 continue
             grant = await self._upsert_grant(session, g_data)
             if grant:
                 role = g_data.get("role") or g_data.get("researcher_role")
-                await self._link_grant_to_researcher(session, grant.id, researcher_id, role)
+                pending_links["grants"].append(
+                    {"researcher_id": researcher_id, "grant_id": grant.id, "role": role}
+                )
                 counts["grants"] += 1
+            else:
+                complete = False
 
         # Projects
-        projects_list = researcher_data.get("project") or researcher_data.get("projects") or []
-        if not isinstance(projects_list, list):
-            projects_list = [projects_list] if projects_list else []
-        for p_data in projects_list:
+        for p_data in _extract_list(researcher_data, VERSO_PROJECT_KEYS):
             if not isinstance(p_data, dict):
                 continue
             project = await self._upsert_project(session, p_data)
             if project:
                 role = p_data.get("role") or p_data.get("researcher_role")
-                await self._link_project_to_researcher(session, project.id, researcher_id, role)
+                pending_links["projects"].append(
+                    {"researcher_id": researcher_id, "project_id": project.id, "role": role}
+                )
                 counts["projects"] += 1
+            else:
+                complete = False
 
         # Activities
-        activities_list = researcher_data.get("activity") or researcher_data.get("activities") or []
-        if not isinstance(activities_list, list):
-            activities_list = [activities_list] if activities_list else []
-        for a_data in activities_list:
+        for a_data in _extract_list(researcher_data, VERSO_ACTIVITY_KEYS):
             if not isinstance(a_data, dict):
                 continue
             activity = await self._upsert_activity(session, a_data)
             if activity:
                 role = a_data.get("role") or a_data.get("researcher_role")
-                await self._link_activity_to_researcher(session, activity.id, researcher_id, role)
+                pending_links["activities"].append(
+                    {"researcher_id": researcher_id, "activity_id": activity.id, "role": role}
+                )
                 counts["activities"] += 1
+            else:
+                complete = False
 
         # Identifiers
         counts["identifiers"] = await self._upsert_identifiers(session, researcher_id, researcher_data)
 
+        if complete:
+            new_etag, new_last_modified = verso_client.get_validators(primary_id)
+            await session.execute(
+                update(Researcher)
+                .where(Researcher.id == researcher_id)
+                .values(verso_etag=new_etag, verso_last_modified=new_last_modified)
+            )
+
         return counts
 
+    async def _flush_pending_links(self, session: AsyncSession, pending_links: dict[str, list[dict]]):
+        """Bulk-insert accumulated researcher links, skipping ones that already exist."""
+        for key, rows in pending_links.items():
+            if rows:
+                await session.execute(insert(VERSO_LINK_TABLES[key]).prefix_with("IGNORE"), rows)
+                rows.clear()
+
+    async def _commit_before_cancel(
+        self, session: AsyncSession, pending_links: dict[str, list[dict]] | None = None,
+    ):
+        """Commit rows upserted since the last batch commit when the task is cancelled.
+
+        The interrupted row's SAVEPOINT has already been rolled back, so only
+        completed rows (and their pending links) are written.
+        """
+        try:
+            if pending_links:
+                await self._flush_pending_links(session, pending_links)
+            await session.commit()
+        except Exception as e:
+            logger.warning(f"Could not commit researcher sync progress on cancel: {e}")
+
     # ------------------------------------------------------------------
     # Main sync
     # ------------------------------------------------------------------
@@ -931,7 +1024,7 @@ class ResearcherSyncService:
             return
 
         self.is_syncing = True
-        self._cancel_requested = False
+        self._cancel_event.clear()
         self._task = asyncio.current_task()
         self.sync_stats = {
             "started": datetime.utcnow().isoformat(),
@@ -952,6 +1045,21 @@ class ResearcherSyncService:
 
         log_id = await self._create_sync_log("researcher_full")
         self._current_log_id = log_id
+        publisher = asyncio.create_task(self._periodic_publish())
+
+        cancelled = self._cancel_event.is_set
+
+        # Phases 1-3 only depend on each other at write time, so start all
+        # three CollabNet fetches now and consume them in phase order.
+        researchers_fetch = asyncio.create_task(
+            collabnet_client.fetch_all_researchers(cancel_check=cancelled)
+        )
+        documents_fetch = asyncio.create_task(
+            collabnet_client.fetch_all_documents(cancel_check=cancelled)
+        )
+        summaries_fetch = asyncio.create_task(
+            collabnet_client.fetch_all_summaries(cancel_check=cancelled)
+        )
 
         try:
             # Phase 1: Fetch and upsert researchers
@@ -959,11 +1067,9 @@ class ResearcherSyncService:
             self.sync_stats["phase"] = "researchers"
             await self._publish_stats()
 
-            researchers_data = await collabnet_client.fetch_all_researchers(
-                cancel_check=lambda: self._cancel_requested,
-            )
+            researchers_data = await researchers_fetch
 
-            if self._cancel_requested:
+            if cancelled():
                 self.sync_stats["cancelled"] = True
                 await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
                 return
@@ -971,39 +1077,42 @@ class ResearcherSyncService:
             self.sync_stats["total"] = len(researchers_data)
             logger.info(f"Fetched {len(researchers_data)} researchers from CollabNet")
 
-            for i, r_data in enumerate(researchers_data):
-                if self._cancel_requested:
-                    self.sync_stats["cancelled"] = True
-                    await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
-                    return
+            async with async_session() as session:
+                for i, r_data in enumerate(researchers_data):
+                    if cancelled():
+                        await session.commit()
+                        self.sync_stats["cancelled"] = True
+                        await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
+                        return
 
-                try:
-                    async with async_session() as session:
-                        async with session.begin():
+                    try:
+                        async with session.begin_nested():
                             result = await self._upsert_researcher(session, r_data)
-                            if result:
-                                self.sync_stats["success"] += 1
-                                self.sync_stats["researchers_synced"] += 1
-                            else:
-                                self.sync_stats["errors"] += 1
-                except Exception as e:
-                    logger.error(f"Error upserting researcher: {e}")
-                    self.sync_stats["errors"] += 1
-                    self.sync_stats["last_error"] = str(e)[:200]
-
-                if (i + 1) % 100 == 0:
-                    await self._publish_stats()
+                        if result:
+                            self.sync_stats["success"] += 1
+                            self.sync_stats["researchers_synced"] += 1
+                        else:
+                            self.sync_stats["errors"] += 1
+                    except asyncio.CancelledError:
+                        await self._commit_before_cancel(session)
+                        raise
+                    except Exception as e:
+                        logger.error(f"Error upserting researcher: {e}")
+                        self.sync_stats["errors"] += 1
+                        self.sync_stats["last_error"] = str(e)[:200]
+
+                    if (i + 1) % COMMIT_BATCH_SIZE == 0:
+                        await session.commit()
+                await session.commit()
 
             # Phase 2: Fetch and upsert publications
             logger.info("Researcher sync phase 2: fetching publications...")
             self.sync_stats["phase"] = "publications"
             await self._publish_stats()
 
-            documents_data = await collabnet_client.fetch_all_documents(
-                cancel_check=lambda: self._cancel_requested,
-            )
+            documents_data = await documents_fetch
 
-            if self._cancel_requested:
+            if cancelled():
                 self.sync_stats["cancelled"] = True
                 await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
                 return
@@ -1011,39 +1120,42 @@ class ResearcherSyncService:
             self.sync_stats["total"] += len(documents_data)
             logger.info(f"Fetched {len(documents_data)} documents from CollabNet")
 
-            for i, doc_data in enumerate(documents_data):
-                if self._cancel_requested:
-                    self.sync_stats["cancelled"] = True
-                    await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
-                    return
+            async with async_session() as session:
+                for i, doc_data in enumerate(documents_data):
+                    if cancelled():
+                        await session.commit()
+                        self.sync_stats["cancelled"] = True
+                        await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
+                        return
 
-                try:
-                    async with async_session() as session:
-                        async with session.begin():
+                    try:
+                        async with session.begin_nested():
                             result = await self._upsert_publication(session, doc_data)
-                            if result:
-                                self.sync_stats["success"] += 1
-                                self.sync_stats["publications_synced"] += 1
-                            else:
-                                self.sync_stats["errors"] += 1
-                except Exception as e:
-                    logger.error(f"Error upserting publication: {e}")
-                    self.sync_stats["errors"] += 1
-                    self.sync_stats["last_error"] = str(e)[:200]
-
-                if (i + 1) % 500 == 0:
-                    await self._publish_stats()
+                        if result:
+                            self.sync_stats["success"] += 1
+                            self.sync_stats["publications_synced"] += 1
+                        else:
+                            self.sync_stats["errors"] += 1
+                    except asyncio.CancelledError:
+                        await self._commit_before_cancel(session)
+                        raise
+                    except Exception as e:
+                        logger.error(f"Error upserting publication: {e}")
+                        self.sync_stats["errors"] += 1
+                        self.sync_stats["last_error"] = str(e)[:200]
+
+                    if (i + 1) % COMMIT_BATCH_SIZE == 0:
+                        await session.commit()
+                await session.commit()
 
             # Phase 3: Fetch and apply AI summaries
             logger.info("Researcher sync phase 3: fetching AI summaries...")
             self.sync_stats["phase"] = "summaries"
             await self._publish_stats()
 
-            summaries_data = await collabnet_client.fetch_all_summaries(
-                cancel_check=lambda: self._cancel_requested,
-            )
+            summaries_data = await summaries_fetch
 
-            if self._cancel_requested:
+            if cancelled():
                 self.sync_stats["cancelled"] = True
                 await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
                 return
@@ -1067,42 +1179,59 @@ class ResearcherSyncService:
                 self.sync_stats["phase"] = "verso"
                 await self._publish_stats()
 
-                # Load all researcher IDs + primary_ids
+                # Load all researcher IDs + primary_ids with their last VERSO validators
                 async with async_session() as session:
                     rows = (await session.execute(
-                        select(Researcher.id, Researcher.primary_id)
+                        select(
+                            Researcher.id, Researcher.primary_id,
+                            Researcher.verso_etag, Researcher.verso_last_modified,
+                        )
                     )).all()
 
                 total_researchers = len(rows)
-                for i, (rid, pid) in enumerate(rows):
-                    if self._cancel_requested:
-                        self.sync_stats["cancelled"] = True
-                        await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
-                        return
-
-                    try:
-                        async with async_session() as session:
-                            async with session.begin():
-                                counts = await self._sync_researcher_verso_data(session, rid, pid)
-                                self.sync_stats["grants_synced"] += counts["grants"]
-                                self.sync_stats["projects_synced"] += counts["projects"]
-                                self.sync_stats["activities_synced"] += counts["activities"]
-                                self.sync_stats["identifiers_synced"] += counts["identifiers"]
-                                total_verso = sum(counts.values())
-                                self.sync_stats["success"] += total_verso
-                    except Exception as e:
-                        logger.error(f"Error syncing VERSO data for researcher {pid}: {e}")
-                        self.sync_stats["errors"] += 1
-                        self.sync_stats["last_error"] = str(e)[:200]
-
-                    if (i + 1) % 25 == 0 or (i + 1) == total_researchers:
+                pending_links = _new_pending_links()
+                async with async_session() as session:
+                    for i, (rid, pid, etag, last_modified) in enumerate(rows):
+                        if cancelled():
+                            await self._flush_pending_links(session, pending_links)
+                            await session.commit()
+                            self.sync_stats["cancelled"] = True
+                            await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
+                            return
+
+                        try:
+                            researcher_links = _new_pending_links()
+                            async with session.begin_nested():
+                                counts = await self._sync_researcher_verso_data(
+                                    session, rid, pid, researcher_links, etag, last_modified,
+                                )
+                            for key, links in researcher_links.items():
+                                pending_links[key].extend(links)
+                            self.sync_stats["grants_synced"] += counts["grants"]
+                            self.sync_stats["projects_synced"] += counts["projects"]
+                            self.sync_stats["activities_synced"] += counts["activities"]
+                            self.sync_stats["identifiers_synced"] += counts["identifiers"]
+                            total_verso = sum(counts.values())
+                            self.sync_stats["success"] += total_verso
+                        except asyncio.CancelledError:
+                            await self._commit_before_cancel(session, pending_links)
+                            raise
+                        except Exception as e:
+                            logger.error(f"Error syncing VERSO data for researcher {pid}: {e}")
+                            self.sync_stats["errors"] += 1
+                            self.sync_stats["last_error"] = str(e)[:200]
+
+                        if (i + 1) % COMMIT_BATCH_SIZE == 0:
+                            await self._flush_pending_links(session, pending_links)
+                            await session.commit()
                         self.sync_stats["verso_progress"] = f"{i + 1}/{total_researchers}"
-                        await self._publish_stats()
+                    await self._flush_pending_links(session, pending_links)
+                    await session.commit()
             else:
                 logger.info("Skipping VERSO phases — VERSO_API_KEY not configured")
 
             # Invalidate caches
-            await cache_service.invalidate_all()
+            await cache_service.invalidate_prefix(*RESEARCHER_CACHE_PREFIXES)
 
             # Reset chat schema cache so new tables are discovered
             try:
@@ -1130,8 +1259,15 @@ class ResearcherSyncService:
             self.sync_stats["last_error"] = str(e)[:200]
             await self._finish_sync_log(log_id, "failed", self.sync_stats, str(e))
         finally:
+            publisher.cancel()
+            fetches = (researchers_fetch, documents_fetch, summaries_fetch)
+            for fetch in fetches:
+                fetch.cancel()
+            # Retrieve their outcomes so a failed fetch isn't logged as unretrieved
+            await asyncio.gather(*fetches, return_exceptions=True)
+            await verso_client.close()
             self.is_syncing = False
-            self._cancel_requested = False
+            self._cancel_event.clear()
             self._current_log_id = None
             self._task = None
             await self._publish_stats()
@@ -1,18 +1,236 @@
+import asyncio
+import base64
+import json
 import logging
+import re
+import time
 from datetime import date, timedelta
 from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import select, func, text, case, and_, or_
+from sqlalchemy import (
+    select, func, text, case, and_, or_, delete, insert, literal_column, bindparam, cast,
+    Date, Double,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Opportunity, Agency, OpportunityFundingCategory
+from app.database import async_session
+from app.models import (
+    Opportunity, Agency, OpportunityFundingCategory,
+    OpportunityFacetSummary, CategoryFacetSummary,
+)
 from app.services.cache_service import cache_service, FACET_TTL, AGENCY_LIST_TTL, STATS_TTL
 
 logger = logging.getLogger(__name__)
 
+# Boolean-mode operators; a query made only of these has nothing to match
+FT_OPERATORS_RE = re.compile(r'[+\-<>()~*"@\s]+')
+
+SORT_COLUMNS = {
+    "close_date": Opportunity.close_date,
+    "posting_date": Opportunity.posting_date,
+    "award_ceiling": Opportunity.award_ceiling,
+    "title": Opportunity.title,
+}
+
+# Columns needed to render a search result; loading full Opportunity
+# entities would also pull every selectin relationship for the page
+LIST_COLS = (
+    Opportunity.id,
+    Opportunity.opportunity_id,
+    Opportunity.opportunity_number,
+    Opportunity.title,
+    Opportunity.status,
+    Opportunity.agency_code,
+    Agency.name.label("agency_name"),
+    Opportunity.category,
+    Opportunity.posting_date,
+    Opportunity.close_date,
+    Opportunity.close_date_description,
+    Opportunity.award_ceiling,
+    Opportunity.award_floor,
+    Opportunity.funding_instrument_description,
+    Opportunity.is_team_based,
+    Opportunity.is_multi_institution,
+    Opportunity.is_multi_disciplinary,
+    Opportunity.grants_gov_url,
+)
+
+# Rows fetched per round-trip when streaming unbounded list queries
+STREAM_CHUNK_SIZE = 1000
+
+# Days-until-close windows for the live deadline facet (inclusive)
+DEADLINE_WINDOWS = {"this_week": 7, "this_month": 30, "this_quarter": 90}
+
+# Approximate totals count at most this many pages beyond the requested one
+APPROX_COUNT_PAGES = 50
+
+# NULL-free stand-ins for ascending sorts, so ORDER BY needs no ISNULL()
+# and can walk an index
+NULLS_LAST_ASC_COLUMNS = {
+    "close_date": (Opportunity.close_date_sort, date(9999, 12, 31)),
+}
+
+# Restores typed sort values from their JSON form in a keyset cursor
+_CURSOR_DECODERS = {
+    "close_date": date.fromisoformat,
+    "posting_date": date.fromisoformat,
+    "award_ceiling": Decimal,
+    "title": str,
+}
+
+
+def encode_cursor(sort_by: str, opp: dict) -> str:
+    """Encode the (is-null, sort value, id) position after opp as an opaque token."""
+    value = opp[sort_by]
+    payload = [1 if value is None else 0, None if value is None else str(value), opp["id"]]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(sort_by: str, cursor: str) -> tuple[int, Any, int]:
+    """Inverse of encode_cursor; raises ValueError for a malformed token."""
+    try:
+        is_null, value, opp_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if value is not None:
+            value = _CURSOR_DECODERS[sort_by](value)
+        return int(is_null), value, int(opp_id)
+    except (ValueError, TypeError, ArithmeticError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+async def _fetch_all(stmt, params: dict | None = None) -> list:
+    """Run a read-only statement on its own pooled connection.
+
+    AsyncSession serializes statements on one connection, so independent
+    aggregates are each given a short-lived session and gathered.
+    """
+    async with async_session() as session:
+        result = await session.execute(stmt, params)
+        return result.all()
+
+
+def _category_links(*columns, where=None):
+    """Unique (opportunity, category) rows as a subquery.
+
+    The link table has no unique constraint on (opportunity_id, category_code),
+    so counts run as COUNT(*) over this deduplicated set rather than a
+    per-group COUNT(DISTINCT opportunity_id).
+    """
+    stmt = (
+        select(OpportunityFundingCategory.opportunity_id, *columns)
+        .distinct()
+        .join(Opportunity, Opportunity.id == OpportunityFundingCategory.opportunity_id)
+    )
+    if where is not None:
+        stmt = stmt.where(where)
+    return stmt.subquery()
+
+
+def _agency_counts_stmt(condition):
+    """Per-agency-code counts; names come from the in-process agency map."""
+    return (
+        select(Opportunity.agency_code, func.count())
+        .where(condition, Opportunity.agency_code.isnot(None))
+        .group_by(Opportunity.agency_code)
+    )
+
+
+def _top_agencies(rows, names: dict[str, str], limit: int) -> list[dict]:
+    """Rank agencies by name, skipping codes with no agencies row."""
+    totals: dict[str, int] = {}
+    for code, count in rows:
+        name = names.get(code)
+        if name is not None:
+            totals[name] = totals.get(name, 0) + count
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{"name": name, "count": count} for name, count in ranked]
+
+
+_FT_MATCH = text(
+    "MATCH(opportunities.title, opportunities.synopsis_description) "
+    "AGAINST(:query IN BOOLEAN MODE)"
+)
+
+# Statements whose shape never changes are built once at import; dates that
+# move day to day are bound as parameters at execution time.
+_TODAY = bindparam("today", type_=Date)
+_WEEK_END = bindparam("week_end", type_=Date)
+_MONTH_END = bindparam("month_end", type_=Date)
+_WEEK_AGO = bindparam("week_ago", type_=Date)
+
+_IS_OPEN = Opportunity.status.in_(["posted", "forecasted"])
+_IS_CLOSED = Opportunity.status == "closed"
+_IS_ARCHIVED = Opportunity.status == "archived"
+_HAS_CEILING = Opportunity.award_ceiling.isnot(None)
+
+# Open, closed and archived summaries in a single conditional-aggregate scan;
+# money aggregates are cast to DOUBLE so the driver hands back floats
+_STATS_STMT = select(
+    func.sum(case((_IS_OPEN, 1), else_=0)).label("total_open"),
+    func.sum(case((and_(_IS_OPEN, Opportunity.close_date >= _TODAY, Opportunity.close_date <= _WEEK_END), 1), else_=0)).label("closing_this_week"),
+    func.sum(case((and_(_IS_OPEN, Opportunity.close_date >= _TODAY, Opportunity.close_date <= _MONTH_END), 1), else_=0)).label("closing_this_month"),
+    func.sum(case((and_(_IS_OPEN, Opportunity.posting_date >= _WEEK_AGO), 1), else_=0)).label("new_this_week"),
+    func.sum(case((_IS_CLOSED, 1), else_=0)).label("closed_total"),
+    cast(func.sum(case((and_(_IS_CLOSED, _HAS_CEILING), Opportunity.award_ceiling), else_=0)), Double).label("closed_total_funding"),
+    cast(func.avg(case((and_(_IS_CLOSED, _HAS_CEILING), Opportunity.award_ceiling), else_=None)), Double).label("closed_avg_ceiling"),
+    func.sum(case((_IS_ARCHIVED, 1), else_=0)).label("archived_total"),
+    cast(func.sum(case((and_(_IS_ARCHIVED, _HAS_CEILING), Opportunity.award_ceiling), else_=0)), Double).label("archived_total_funding"),
+    cast(func.avg(case((and_(_IS_ARCHIVED, _HAS_CEILING), Opportunity.award_ceiling), else_=None)), Double).label("archived_avg_ceiling"),
+).where(Opportunity.status.in_(["posted", "forecasted", "closed", "archived"]))
+
+_OPEN_AGENCY_COUNTS_STMT = _agency_counts_stmt(_IS_OPEN)
+_CLOSED_AGENCY_COUNTS_STMT = _agency_counts_stmt(_IS_CLOSED)
+_ARCHIVED_AGENCY_COUNTS_STMT = _agency_counts_stmt(_IS_ARCHIVED)
+_AGENCY_NAMES_STMT = select(Agency.code, Agency.name)
+# Invalidation key for each worker's in-process agency name map
+AGENCY_NAMES_KEY = "pf:agencies:names"
+
+_open_category_links = _category_links(OpportunityFundingCategory.category_name, where=_IS_OPEN)
+_TOP_CATEGORIES_STMT = (
+    select(_open_category_links.c.category_name, func.count().label("count"))
+    .group_by(_open_category_links.c.category_name)
+    .order_by(func.count().desc())
+    .limit(10)
+)
+
+_AGENCIES_STMT = (
+    select(Agency.code, Agency.name, func.count(Opportunity.id).label("count"))
+    .join(Opportunity, Opportunity.agency_code == Agency.code, isouter=True)
+    .group_by(Agency.code, Agency.name)
+    .order_by(Agency.name)
+)
+
+_all_category_links = _category_links(
+    OpportunityFundingCategory.category_code,
+    OpportunityFundingCategory.category_name,
+)
+_CATEGORIES_STMT = (
+    select(_all_category_links.c.category_code, _all_category_links.c.category_name, func.count().label("count"))
+    .group_by(_all_category_links.c.category_code, _all_category_links.c.category_name)
+    .order_by(func.count().desc())
+)
+
 
 class SearchService:
+    def __init__(self):
+        # agency code -> name, so aggregates can group on opportunities alone;
+        # every worker drops it when AGENCY_NAMES_KEY is invalidated
+        self._agency_names: dict[str, str] | None = None
+        self._agency_names_loaded_at = 0.0
+        cache_service.register_local(AGENCY_NAMES_KEY, self._reset_agency_names)
+
+    def _reset_agency_names(self):
+        self._agency_names = None
+
+    async def _get_agency_names(self) -> dict[str, str]:
+        if (
+            self._agency_names is None
+            or time.monotonic() - self._agency_names_loaded_at > AGENCY_LIST_TTL
+        ):
+            rows = await _fetch_all(_AGENCY_NAMES_STMT)
+            self._agency_names = dict(rows)
+            self._agency_names_loaded_at = time.monotonic()
+        return self._agency_names
 
     async def search(
         self,
@@ -32,20 +250,32 @@ class SearchService:
         sort_order: str = "asc",
         page: int = 1,
         per_page: int = 25,
+        after: str | None = None,
+        exact_total: bool = False,
     ) -> dict[str, Any]:
+        """Search opportunities, one page at a time.
+
+        Pages are addressed by number (OFFSET) or, when after is a cursor
+        from a previous result's next_cursor, by seeking past that row.
+        Opportunities are returned as plain dicts of LIST_COLS plus
+        funding_categories.
+
+        Unless exact_total is set, matches are only counted up to
+        APPROX_COUNT_PAGES pages past the current one; past that total is
+        None and total_min holds the lower bound. Cursor pages aren't counted
+        at all unless exact_total is set, so both are None.
+        """
         # Build base query
-        stmt = select(Opportunity)
-        count_stmt = select(func.count(Opportunity.id))
+        stmt = select(*LIST_COLS).join(Agency, Agency.code == Opportunity.agency_code, isouter=True)
+        count_stmt = select(Opportunity.id)
 
         conditions = []
 
-        # Full-text search
+        # Full-text search; skip MATCH entirely when no searchable term remains
+        if query and not FT_OPERATORS_RE.sub("", query):
+            query = None
         if query and query.strip():
-            ft = text(
-                "MATCH(opportunities.title, opportunities.synopsis_description) "
-                "AGAINST(:query IN BOOLEAN MODE)"
-            )
-            conditions.append(ft)
+            conditions.append(_FT_MATCH)
 
         # Status filter
         if status:
@@ -55,17 +285,17 @@ class SearchService:
         if agency_codes:
             conditions.append(Opportunity.agency_code.in_(agency_codes))
 
-        # Category filter (via join)
+        # Category filter; EXISTS so an opportunity in several matching
+        # categories is returned and counted once
         if category_codes:
-            stmt = stmt.join(
-                OpportunityFundingCategory,
-                OpportunityFundingCategory.opportunity_id == Opportunity.id,
-            )
-            count_stmt = count_stmt.join(
-                OpportunityFundingCategory,
-                OpportunityFundingCategory.opportunity_id == Opportunity.id,
+            conditions.append(
+                select(OpportunityFundingCategory.id)
+                .where(
+                    OpportunityFundingCategory.opportunity_id == Opportunity.id,
+                    OpportunityFundingCategory.category_code.in_(category_codes),
+                )
+                .exists()
             )
-            conditions.append(OpportunityFundingCategory.category_code.in_(category_codes))
 
         # Date range
         if close_date_start:
@@ -97,108 +327,296 @@ class SearchService:
         if query and query.strip():
             params["query"] = query.strip()
 
-        # Get total count
-        count_result = await session.execute(count_stmt, params)
-        total = count_result.scalar()
+        # An exact total for an offset page rides along as COUNT(*) OVER() on
+        # the page query; a cursor seek filters rows, so it needs its own count.
+        # Cursor pages skip counting unless an exact total is asked for.
+        window_total = exact_total and not after
+        total = total_min = None
+        if window_total:
+            stmt = stmt.add_columns(func.count().over().label("_total"))
+        elif exact_total or not after:
+            total, total_min = await self._count(session, count_stmt, params, exact_total, page, per_page)
 
         # Sorting
-        sort_column = {
-            "close_date": Opportunity.close_date,
-            "posting_date": Opportunity.posting_date,
-            "award_ceiling": Opportunity.award_ceiling,
-            "title": Opportunity.title,
-        }.get(sort_by, Opportunity.close_date)
-
-        # MariaDB doesn't support NULLS LAST, use ISNULL() trick instead
-        if sort_order == "desc":
-            stmt = stmt.order_by(func.isnull(sort_column), sort_column.desc())
+        if sort_by not in SORT_COLUMNS:
+            sort_by = "close_date"
+        sort_column = SORT_COLUMNS[sort_by]
+        null_key = func.isnull(sort_column)
+        descending = sort_order == "desc"
+        sort_key = None if descending else NULLS_LAST_ASC_COLUMNS.get(sort_by)
+
+        # MariaDB doesn't support NULLS LAST, so either sort on a NULL-free
+        # generated column or fall back to the ISNULL() trick;
+        # id breaks ties so keyset cursors are stable
+        if sort_key:
+            stmt = stmt.order_by(sort_key[0].asc(), Opportunity.id.asc())
+        elif descending:
+            stmt = stmt.order_by(null_key, sort_column.desc(), Opportunity.id.desc())
         else:
-            stmt = stmt.order_by(func.isnull(sort_column), sort_column.asc())
+            stmt = stmt.order_by(null_key, sort_column.asc(), Opportunity.id.asc())
 
         # Pagination
-        offset = (page - 1) * per_page
-        stmt = stmt.offset(offset).limit(per_page)
+        if after:
+            after_null, after_value, after_id = decode_cursor(sort_by, after)
+            id_past = Opportunity.id < after_id if descending else Opportunity.id > after_id
+            if sort_key:
+                sort_value = sort_key[1] if after_null else after_value
+                seek = or_(
+                    sort_key[0] > sort_value,
+                    and_(sort_key[0] == sort_value, id_past),
+                )
+            elif after_null:
+                # Already in the trailing NULL group, only id order remains
+                seek = and_(null_key == 1, id_past)
+            else:
+                value_past = sort_column < after_value if descending else sort_column > after_value
+                seek = or_(
+                    null_key == 1,
+                    value_past,
+                    and_(sort_column == after_value, id_past),
+                )
+            stmt = stmt.where(seek)
+        else:
+            stmt = stmt.offset((page - 1) * per_page)
+        # One extra row tells whether another page follows
+        stmt = stmt.limit(per_page + 1)
 
         result = await session.execute(stmt, params)
-        opportunities = result.scalars().unique().all()
+        opportunities = [dict(row) for row in result.mappings().all()]
+        more_rows = len(opportunities) > per_page
+        del opportunities[per_page:]
+        if window_total:
+            if opportunities:
+                total = total_min = opportunities[0]["_total"]
+                for opp in opportunities:
+                    del opp["_total"]
+            else:
+                # Past the last page there is no row to carry the window count
+                total, total_min = await self._count(session, count_stmt, params, True, page, per_page)
+        await self._attach_categories(session, opportunities)
+
+        next_cursor = encode_cursor(sort_by, opportunities[-1]) if more_rows else None
 
         return {
             "opportunities": opportunities,
             "total": total,
+            "total_min": total_min,
+            "has_more": more_rows,
             "page": page,
             "per_page": per_page,
-            "total_pages": (total + per_page - 1) // per_page if total else 0,
+            "total_pages": (total + per_page - 1) // per_page if total is not None else None,
+            "next_cursor": next_cursor,
         }
 
+    async def _count(
+        self, session: AsyncSession, count_stmt, params: dict,
+        exact: bool, page: int, per_page: int,
+    ) -> tuple[int | None, int]:
+        """Return (total, total_min), stopping early for broad queries unless exact."""
+        count_cap = None if exact else (page + APPROX_COUNT_PAGES) * per_page
+        if count_cap:
+            count_stmt = count_stmt.limit(count_cap)
+        count_result = await session.execute(
+            select(func.count()).select_from(count_stmt.subquery()), params,
+        )
+        total_min = count_result.scalar() or 0
+        total = None if count_cap and total_min >= count_cap else total_min
+        return total, total_min
+
+    async def _attach_categories(self, session: AsyncSession, opportunities: list[dict]) -> None:
+        """Add funding_categories to each result row with one query for the page."""
+        by_id = {opp["id"]: opp for opp in opportunities}
+        for opp in opportunities:
+            opp["funding_categories"] = []
+        if not by_id:
+            return
+        stmt = (
+            select(
+                OpportunityFundingCategory.opportunity_id,
+                OpportunityFundingCategory.category_code,
+                OpportunityFundingCategory.category_name,
+            )
+            .where(OpportunityFundingCategory.opportunity_id.in_(by_id))
+            .order_by(OpportunityFundingCategory.id)
+        )
+        result = await session.execute(stmt)
+        for opp_id, code, name in result.all():
+            by_id[opp_id]["funding_categories"].append({"category_code": code, "category_name": name})
+
     async def get_facets(self, session: AsyncSession, status: list[str] | None = None) -> dict[str, Any]:
         cache_key = f"pf:facets:{','.join(status) if status else 'all'}"
-        cached = await cache_service.get(cache_key)
-        if cached:
-            return cached
+        return await cache_service.get_or_compute(
+            cache_key, lambda: self._compute_facets(status), FACET_TTL,
+        )
 
-        base_condition = Opportunity.status.in_(status) if status else True
+    async def _compute_facets(self, status: list[str] | None) -> dict[str, Any]:
+        facets = await self._compute_facets_from_summary(status)
+        if facets is not None:
+            return facets
+        return await self._compute_facets_live(status)
+
+    async def _compute_facets_from_summary(self, status: list[str] | None) -> dict[str, Any] | None:
+        """Build facets from the pre-aggregated summary tables.
+
+        Returns None if the summary has not been populated yet.
+        """
+        summary_condition = OpportunityFacetSummary.status.in_(status) if status else True
+        category_condition = CategoryFacetSummary.status.in_(status) if status else True
+        total = func.sum(OpportunityFacetSummary.opportunity_count)
 
-        # Agency counts
         agency_stmt = (
-            select(
-                Opportunity.agency_code,
-                Agency.name,
-                func.count(Opportunity.id).label("count"),
-            )
-            .join(Agency, Agency.code == Opportunity.agency_code, isouter=True)
-            .where(base_condition)
-            .group_by(Opportunity.agency_code, Agency.name)
-            .order_by(func.count(Opportunity.id).desc())
+            select(OpportunityFacetSummary.agency_code, total)
+            .where(summary_condition)
+            .group_by(OpportunityFacetSummary.agency_code)
+            .order_by(total.desc())
             .limit(50)
         )
-        agency_result = await session.execute(agency_stmt)
-        agency_counts = [
-            {"code": row[0], "name": row[1] or row[0], "count": row[2]}
-            for row in agency_result.all()
-            if row[0]
-        ]
-
-        # Category counts
+        category_total = func.sum(CategoryFacetSummary.opportunity_count)
         cat_stmt = (
+            select(CategoryFacetSummary.category_code, CategoryFacetSummary.category_name, category_total)
+            .where(category_condition)
+            .group_by(CategoryFacetSummary.category_code, CategoryFacetSummary.category_name)
+            .order_by(category_total.desc())
+        )
+        bucket_stmt = (
             select(
-                OpportunityFundingCategory.category_code,
-                OpportunityFundingCategory.category_name,
-                func.count(func.distinct(OpportunityFundingCategory.opportunity_id)).label("count"),
+                OpportunityFacetSummary.deadline_bucket,
+                OpportunityFacetSummary.ceiling_bucket,
+                total,
             )
-            .join(Opportunity, Opportunity.id == OpportunityFundingCategory.opportunity_id)
-            .where(base_condition)
-            .group_by(OpportunityFundingCategory.category_code, OpportunityFundingCategory.category_name)
-            .order_by(func.count(func.distinct(OpportunityFundingCategory.opportunity_id)).desc())
+            .where(summary_condition)
+            .group_by(OpportunityFacetSummary.deadline_bucket, OpportunityFacetSummary.ceiling_bucket)
         )
-        cat_result = await session.execute(cat_stmt)
-        category_counts = [
-            {"code": row[0], "name": row[1], "count": row[2]}
-            for row in cat_result.all()
-        ]
+        populated_stmt = select(OpportunityFacetSummary.id).limit(1)
+
+        populated, agency_rows, cat_rows, bucket_rows, agency_names = await asyncio.gather(
+            _fetch_all(populated_stmt), _fetch_all(agency_stmt),
+            _fetch_all(cat_stmt), _fetch_all(bucket_stmt), self._get_agency_names(),
+        )
+        if not populated:
+            return None
+
+        deadline_counts = {"week": 0, "month": 0, "quarter": 0, "none": 0}
+        ceiling_ranges = {"under_100k": 0, "100k_500k": 0, "500k_1m": 0, "over_1m": 0}
+        for deadline_bucket, ceiling_bucket, count in bucket_rows:
+            count = int(count or 0)
+            if deadline_bucket in deadline_counts:
+                deadline_counts[deadline_bucket] += count
+            if ceiling_bucket in ceiling_ranges:
+                ceiling_ranges[ceiling_bucket] += count
+
+        return {
+            "agencies": [
+                {"code": row[0], "name": agency_names.get(row[0], row[0]), "count": int(row[1])}
+                for row in agency_rows
+                if row[0]
+            ],
+            "categories": [
+                {"code": row[0], "name": row[1], "count": int(row[2])}
+                for row in cat_rows
+            ],
+            "deadlines": {
+                "this_week": deadline_counts["week"],
+                "this_month": deadline_counts["week"] + deadline_counts["month"],
+                "this_quarter": deadline_counts["week"] + deadline_counts["month"] + deadline_counts["quarter"],
+                "no_deadline": deadline_counts["none"],
+            },
+            "ceilings": ceiling_ranges,
+        }
 
-        # Deadline buckets
+    async def refresh_facet_summary(self):
+        """Rebuild the facet summary tables from opportunities in one transaction."""
         today = date.today()
         week_end = today + timedelta(days=7)
         month_end = today + timedelta(days=30)
         quarter_end = today + timedelta(days=90)
 
-        deadline_stmt = select(
-            func.sum(case((and_(Opportunity.close_date >= today, Opportunity.close_date <= week_end), 1), else_=0)).label("this_week"),
-            func.sum(case((and_(Opportunity.close_date >= today, Opportunity.close_date <= month_end), 1), else_=0)).label("this_month"),
-            func.sum(case((and_(Opportunity.close_date >= today, Opportunity.close_date <= quarter_end), 1), else_=0)).label("this_quarter"),
-            func.sum(case((Opportunity.close_date.is_(None), 1), else_=0)).label("no_deadline"),
-        ).where(base_condition)
+        deadline_bucket = case(
+            (Opportunity.close_date.is_(None), "none"),
+            (and_(Opportunity.close_date >= today, Opportunity.close_date <= week_end), "week"),
+            (and_(Opportunity.close_date > week_end, Opportunity.close_date <= month_end), "month"),
+            (and_(Opportunity.close_date > month_end, Opportunity.close_date <= quarter_end), "quarter"),
+            else_="other",
+        ).label("deadline_bucket")
+        ceiling_bucket = case(
+            (Opportunity.award_ceiling.is_(None), "none"),
+            (Opportunity.award_ceiling < 100000, "under_100k"),
+            (Opportunity.award_ceiling < 500000, "100k_500k"),
+            (Opportunity.award_ceiling < 1000000, "500k_1m"),
+            else_="over_1m",
+        ).label("ceiling_bucket")
+
+        opp_select = (
+            select(
+                Opportunity.status, Opportunity.agency_code,
+                deadline_bucket, ceiling_bucket, func.count(),
+            )
+            .group_by(
+                Opportunity.status, Opportunity.agency_code,
+                literal_column("deadline_bucket"), literal_column("ceiling_bucket"),
+            )
+        )
+        links = _category_links(
+            Opportunity.status,
+            OpportunityFundingCategory.category_code,
+            OpportunityFundingCategory.category_name,
+        )
+        cat_select = (
+            select(links.c.status, links.c.category_code, links.c.category_name, func.count())
+            .group_by(links.c.status, links.c.category_code, links.c.category_name)
+        )
 
-        deadline_result = await session.execute(deadline_stmt)
-        dr = deadline_result.one()
-        deadline_buckets = {
-            "this_week": dr[0] or 0,
-            "this_month": dr[1] or 0,
-            "this_quarter": dr[2] or 0,
-            "no_deadline": dr[3] or 0,
-        }
+        async with async_session() as session:
+            async with session.begin():
+                await session.execute(delete(OpportunityFacetSummary))
+                await session.execute(
+                    insert(OpportunityFacetSummary).from_select(
+                        ["status", "agency_code", "deadline_bucket", "ceiling_bucket", "opportunity_count"],
+                        opp_select,
+                    )
+                )
+                await session.execute(delete(CategoryFacetSummary))
+                await session.execute(
+                    insert(CategoryFacetSummary).from_select(
+                        ["status", "category_code", "category_name", "opportunity_count"],
+                        cat_select,
+                    )
+                )
+        # Runs after every sync, which is when agencies change
+        await cache_service.invalidate_prefix("pf:facets:", AGENCY_NAMES_KEY)
+        logger.info("Facet summary refreshed")
+
+    async def _compute_facets_live(self, status: list[str] | None) -> dict[str, Any]:
+        base_condition = Opportunity.status.in_(status) if status else True
 
-        # Award ceiling ranges
+        # Agency counts
+        agency_stmt = (
+            select(Opportunity.agency_code, func.count(Opportunity.id).label("count"))
+            .where(base_condition)
+            .group_by(Opportunity.agency_code)
+            .order_by(func.count(Opportunity.id).desc())
+            .limit(50)
+        )
+
+        # Category counts
+        links = _category_links(
+            OpportunityFundingCategory.category_code,
+            OpportunityFundingCategory.category_name,
+            where=base_condition,
+        )
+        cat_stmt = (
+            select(links.c.category_code, links.c.category_name, func.count().label("count"))
+            .group_by(links.c.category_code, links.c.category_name)
+            .order_by(func.count().desc())
+        )
+
+        # Deadlines come back as a days-left histogram and are bucketed here
+        days_left = func.datediff(Opportunity.close_date, date.today()).label("days_left")
+        deadline_stmt = (
+            select(days_left, func.count())
+            .where(base_condition)
+            .group_by(literal_column("days_left"))
+        )
         ceiling_stmt = select(
             func.sum(case((Opportunity.award_ceiling < 100000, 1), else_=0)).label("under_100k"),
             func.sum(case((and_(Opportunity.award_ceiling >= 100000, Opportunity.award_ceiling < 500000), 1), else_=0)).label("100k_500k"),
@@ -206,8 +624,30 @@ class SearchService:
             func.sum(case((Opportunity.award_ceiling >= 1000000, 1), else_=0)).label("over_1m"),
         ).where(base_condition)
 
-        ceiling_result = await session.execute(ceiling_stmt)
-        cr = ceiling_result.one()
+        agency_rows, cat_rows, deadline_rows, ceiling_rows, agency_names = await asyncio.gather(
+            _fetch_all(agency_stmt), _fetch_all(cat_stmt),
+            _fetch_all(deadline_stmt), _fetch_all(ceiling_stmt),
+            self._get_agency_names(),
+        )
+        agency_counts = [
+            {"code": row[0], "name": agency_names.get(row[0], row[0]), "count": row[1]}
+            for row in agency_rows
+            if row[0]
+        ]
+        category_counts = [
+            {"code": row[0], "name": row[1], "count": row[2]}
+            for row in cat_rows
+        ]
+        deadline_buckets = {name: 0 for name in DEADLINE_WINDOWS}
+        deadline_buckets["no_deadline"] = 0
+        for days, count in deadline_rows:
+            if days is None:
+                deadline_buckets["no_deadline"] += count
+                continue
+            for name, window in DEADLINE_WINDOWS.items():
+                if 0 <= days <= window:
+                    deadline_buckets[name] += count
+        cr = ceiling_rows[0]
         ceiling_ranges = {
             "under_100k": cr[0] or 0,
             "100k_500k": cr[1] or 0,
@@ -221,106 +661,35 @@ class SearchService:
             "deadlines": deadline_buckets,
             "ceilings": ceiling_ranges,
         }
-
-        await cache_service.set(cache_key, facets, FACET_TTL)
         return facets
 
     async def get_stats(self, session: AsyncSession) -> dict[str, Any]:
-        cached = await cache_service.get("pf:stats")
-        if cached:
-            return cached
+        return await cache_service.get_or_compute("pf:stats", self._compute_stats, STATS_TTL)
 
+    async def _compute_stats(self) -> dict[str, Any]:
         today = date.today()
-        week_end = today + timedelta(days=7)
-        month_end = today + timedelta(days=30)
-        week_ago = today - timedelta(days=7)
-
-        stats_stmt = select(
-            func.count(Opportunity.id).label("total_open"),
-            func.sum(case((and_(Opportunity.close_date >= today, Opportunity.close_date <= week_end), 1), else_=0)).label("closing_this_week"),
-            func.sum(case((and_(Opportunity.close_date >= today, Opportunity.close_date <= month_end), 1), else_=0)).label("closing_this_month"),
-            func.sum(case((Opportunity.posting_date >= week_ago, 1), else_=0)).label("new_this_week"),
-        ).where(Opportunity.status.in_(["posted", "forecasted"]))
-
-        result = await session.execute(stats_stmt)
-        row = result.one()
-
-        # Top agencies
-        agency_stmt = (
-            select(
-                Agency.name,
-                func.count(Opportunity.id).label("count"),
-            )
-            .join(Agency, Agency.code == Opportunity.agency_code)
-            .where(Opportunity.status.in_(["posted", "forecasted"]))
-            .group_by(Agency.name)
-            .order_by(func.count(Opportunity.id).desc())
-            .limit(15)
-        )
-        agency_result = await session.execute(agency_stmt)
-        top_agencies = [{"name": r[0], "count": r[1]} for r in agency_result.all()]
-
-        # Top categories
-        cat_stmt = (
-            select(
-                OpportunityFundingCategory.category_name,
-                func.count(func.distinct(OpportunityFundingCategory.opportunity_id)).label("count"),
-            )
-            .join(Opportunity, Opportunity.id == OpportunityFundingCategory.opportunity_id)
-            .where(Opportunity.status.in_(["posted", "forecasted"]))
-            .group_by(OpportunityFundingCategory.category_name)
-            .order_by(func.count(func.distinct(OpportunityFundingCategory.opportunity_id)).desc())
-            .limit(10)
-        )
-        cat_result = await session.execute(cat_stmt)
-        top_categories = [{"name": r[0], "count": r[1]} for r in cat_result.all()]
-
-        # Closed/archived summary stats
-        closed_stmt = select(
-            func.count(Opportunity.id).label("total"),
-            func.sum(case((Opportunity.award_ceiling.isnot(None), Opportunity.award_ceiling), else_=0)).label("total_funding"),
-            func.avg(case((Opportunity.award_ceiling.isnot(None), Opportunity.award_ceiling), else_=None)).label("avg_ceiling"),
-        ).where(Opportunity.status == "closed")
-        closed_result = await session.execute(closed_stmt)
-        closed_row = closed_result.one()
-
-        archived_stmt = select(
-            func.count(Opportunity.id).label("total"),
-            func.sum(case((Opportunity.award_ceiling.isnot(None), Opportunity.award_ceiling), else_=0)).label("total_funding"),
-            func.avg(case((Opportunity.award_ceiling.isnot(None), Opportunity.award_ceiling), else_=None)).label("avg_ceiling"),
-        ).where(Opportunity.status == "archived")
-        archived_result = await session.execute(archived_stmt)
-        archived_row = archived_result.one()
-
-        # Top agencies for closed
-        closed_agency_stmt = (
-            select(
-                Agency.name,
-                func.count(Opportunity.id).label("count"),
-            )
-            .join(Agency, Agency.code == Opportunity.agency_code)
-            .where(Opportunity.status == "closed")
-            .group_by(Agency.name)
-            .order_by(func.count(Opportunity.id).desc())
-            .limit(10)
-        )
-        closed_agency_result = await session.execute(closed_agency_stmt)
-        closed_top_agencies = [{"name": r[0], "count": r[1]} for r in closed_agency_result.all()]
-
-        # Top agencies for archived
-        archived_agency_stmt = (
-            select(
-                Agency.name,
-                func.count(Opportunity.id).label("count"),
-            )
-            .join(Agency, Agency.code == Opportunity.agency_code)
-            .where(Opportunity.status == "archived")
-            .group_by(Agency.name)
-            .order_by(func.count(Opportunity.id).desc())
-            .limit(10)
+        params = {
+            "today": today,
+            "week_end": today + timedelta(days=7),
+            "month_end": today + timedelta(days=30),
+            "week_ago": today - timedelta(days=7),
+        }
+        (
+            stats_rows, agency_rows, cat_rows, closed_agency_rows, archived_agency_rows,
+            agency_names,
+        ) = await asyncio.gather(
+            _fetch_all(_STATS_STMT, params),
+            _fetch_all(_OPEN_AGENCY_COUNTS_STMT),
+            _fetch_all(_TOP_CATEGORIES_STMT),
+            _fetch_all(_CLOSED_AGENCY_COUNTS_STMT),
+            _fetch_all(_ARCHIVED_AGENCY_COUNTS_STMT),
+            self._get_agency_names(),
         )
-        archived_agency_result = await session.execute(archived_agency_stmt)
-        archived_top_agencies = [{"name": r[0], "count": r[1]} for r in archived_agency_result.all()]
+        row = stats_rows[0]
+        top_agencies = _top_agencies(agency_rows, agency_names, 15)
+        top_categories = [{"name": r[0], "count": r[1]} for r in cat_rows]
+        closed_top_agencies = _top_agencies(closed_agency_rows, agency_names, 10)
+        archived_top_agencies = _top_agencies(archived_agency_rows, agency_names, 10)
 
         stats = {
             "total_open": int(row[0] or 0),
@@ -330,62 +699,37 @@ class SearchService:
             "top_agencies": top_agencies,
             "top_categories": top_categories,
             "closed": {
-                "total": closed_row[0] or 0,
-                "total_funding": float(closed_row[1] or 0),
-                "avg_ceiling": float(closed_row[2] or 0),
+                "total": int(row[4] or 0),
+                "total_funding": row[5] or 0.0,
+                "avg_ceiling": row[6] or 0.0,
                 "top_agencies": closed_top_agencies,
             },
             "archived": {
-                "total": archived_row[0] or 0,
-                "total_funding": float(archived_row[1] or 0),
-                "avg_ceiling": float(archived_row[2] or 0),
+                "total": int(row[7] or 0),
+                "total_funding": row[8] or 0.0,
+                "avg_ceiling": row[9] or 0.0,
                 "top_agencies": archived_top_agencies,
             },
         }
-
-        await cache_service.set("pf:stats", stats, STATS_TTL)
         return stats
 
     async def get_agencies(self, session: AsyncSession) -> list[dict]:
-        cached = await cache_service.get("pf:agencies")
-        if cached:
-            return cached
-
-        stmt = (
-            select(
-                Agency.code,
-                Agency.name,
-                func.count(Opportunity.id).label("count"),
-            )
-            .join(Opportunity, Opportunity.agency_code == Agency.code, isouter=True)
-            .group_by(Agency.code, Agency.name)
-            .order_by(Agency.name)
+        return await cache_service.get_or_compute(
+            "pf:agencies", lambda: self._compute_agencies(session), AGENCY_LIST_TTL,
         )
-        result = await session.execute(stmt)
-        agencies = [{"code": r[0], "name": r[1], "count": r[2]} for r in result.all()]
 
-        await cache_service.set("pf:agencies", agencies, AGENCY_LIST_TTL)
-        return agencies
+    async def _compute_agencies(self, session: AsyncSession) -> list[dict]:
+        result = await session.stream(_AGENCIES_STMT.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        return [{"code": r[0], "name": r[1], "count": r[2]} async for r in result]
 
     async def get_categories(self, session: AsyncSession) -> list[dict]:
-        cached = await cache_service.get("pf:categories")
-        if cached:
-            return cached
-
-        stmt = (
-            select(
-                OpportunityFundingCategory.category_code,
-                OpportunityFundingCategory.category_name,
-                func.count(func.distinct(OpportunityFundingCategory.opportunity_id)).label("count"),
-            )
-            .group_by(OpportunityFundingCategory.category_code, OpportunityFundingCategory.category_name)
-            .order_by(func.count(func.distinct(OpportunityFundingCategory.opportunity_id)).desc())
+        return await cache_service.get_or_compute(
+            "pf:categories", lambda: self._compute_categories(session), AGENCY_LIST_TTL,
         )
-        result = await session.execute(stmt)
-        categories = [{"code": r[0], "name": r[1], "count": r[2]} for r in result.all()]
 
-        await cache_service.set("pf:categories", categories, AGENCY_LIST_TTL)
-        return categories
+    async def _compute_categories(self, session: AsyncSession) -> list[dict]:
+        result = await session.stream(_CATEGORIES_STMT.execution_options(yield_per=STREAM_CHUNK_SIZE))
+        return [{"code": r[0], "name": r[1], "count": r[2]} async for r in result]
 
 
 search_service = SearchService()
@@ -1,11 +1,15 @@
+import asyncio
 import logging
+from datetime import datetime
 from typing import Any
 
 from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings as app_settings
 from app.models.site_setting import SiteSetting
+from app.services.cache_service import cache_service
 
 logger = logging.getLogger(__name__)
 
@@ -53,28 +57,109 @@ COLLABNET_SCHEDULER_DAY_KEY = "collabnet_scheduler_day"
 COLLABNET_SCHEDULER_HOUR_KEY = "collabnet_scheduler_hour"
 COLLABNET_SCHEDULER_MINUTE_KEY = "collabnet_scheduler_minute"
 
+# Redis channel used to tell other workers their settings cache is stale
+INVALIDATE_CHANNEL = "pf:settings:invalidate"
+
 
 class SettingsService:
+    """Site settings backed by the site_settings table.
+
+    The whole table is small, so it is read once per process and served
+    from memory. Writes update the local copy and publish the key on
+    INVALIDATE_CHANNEL so other workers reload on their next read.
+    """
+
+    def __init__(self):
+        self._cache: dict[str, str | None] = {}
+        self._loaded = False
+        # Bumped on every write/invalidation so an in-flight load can't
+        # mark a stale snapshot as current
+        self._version = 0
+        self._listener: asyncio.Task | None = None
+
+    async def _ensure_loaded(self, session: AsyncSession) -> None:
+        if self._loaded:
+            return
+        version = self._version
+        result = await session.execute(select(SiteSetting.key, SiteSetting.value))
+        cache = dict(result.all())
+        if version == self._version:
+            self._cache = cache
+            self._loaded = True
+
+    def invalidate(self) -> None:
+        """Drop the in-process copy; the next read reloads it from the DB."""
+        self._version += 1
+        self._loaded = False
 
     async def get(self, session: AsyncSession, key: str, default: str | None = None) -> str | None:
         """Get a setting value by key, falling back to default."""
-        stmt = select(SiteSetting.value).where(SiteSetting.key == key)
-        result = await session.execute(stmt)
-        value = result.scalar_one_or_none()
+        await self._ensure_loaded(session)
+        value = self._cache.get(key)
         return value if value is not None else default
 
+    async def get_many(self, session: AsyncSession, keys: list[str]) -> dict[str, str | None]:
+        """Get several settings at once; missing keys are absent from the result."""
+        await self._ensure_loaded(session)
+        return {key: self._cache[key] for key in keys if key in self._cache}
+
     async def set(self, session: AsyncSession, key: str, value: str | None) -> None:
         """Set a setting value, creating or updating as needed."""
-        stmt = select(SiteSetting).where(SiteSetting.key == key)
-        result = await session.execute(stmt)
-        existing = result.scalar_one_or_none()
-
-        if existing:
-            existing.value = value
-        else:
-            session.add(SiteSetting(key=key, value=value))
-
+        await self.set_many(session, {key: value})
+
+    async def set_many(self, session: AsyncSession, items: dict[str, str | None]) -> None:
+        """Upsert several settings in one INSERT ... ON DUPLICATE KEY UPDATE."""
+        if not items:
+            return
+        stmt = mysql_insert(SiteSetting).values(
+            [{"key": key, "value": value} for key, value in items.items()]
+        )
+        stmt = stmt.on_duplicate_key_update(
+            value=stmt.inserted.value,
+            updated_at=datetime.utcnow(),
+        )
+        await session.execute(stmt)
         await session.commit()
+        self._version += 1
+        self._cache.update(items)
+        await cache_service.publish(INVALIDATE_CHANNEL, ",".join(items))
+
+    # --- Cross-worker invalidation ---
+
+    def start_listener(self) -> None:
+        """Start listening for settings changes made by other workers."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = cache_service.pubsub()
+            if pubsub is None:
+                return
+            try:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                # Anything published while we were disconnected was missed
+                self.invalidate()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Settings invalidation listener error: {e}")
+                self.invalidate()
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.close()
 
     # --- LLM Settings ---
 
@@ -83,9 +168,10 @@ class SettingsService:
 
         DB value takes precedence if non-empty, otherwise config.py default.
         """
-        base_url = await self.get(session, LLM_BASE_URL_KEY)
-        model = await self.get(session, LLM_MODEL_KEY)
-        api_key = await self.get(session, LLM_API_KEY_KEY)
+        values = await self.get_many(session, [LLM_BASE_URL_KEY, LLM_MODEL_KEY, LLM_API_KEY_KEY])
+        base_url = values.get(LLM_BASE_URL_KEY)
+        model = values.get(LLM_MODEL_KEY)
+        api_key = values.get(LLM_API_KEY_KEY)
         return {
             "base_url": base_url or app_settings.LLM_BASE_URL,
             "model": model or app_settings.LLM_MODEL,
@@ -100,17 +186,24 @@ class SettingsService:
         api_key: str = "",
     ) -> None:
         """Save all LLM settings to the database."""
-        await self.set(session, LLM_BASE_URL_KEY, base_url)
-        await self.set(session, LLM_MODEL_KEY, model)
-        await self.set(session, LLM_API_KEY_KEY, api_key)
+        await self.set_many(session, {
+            LLM_BASE_URL_KEY: base_url,
+            LLM_MODEL_KEY: model,
+            LLM_API_KEY_KEY: api_key,
+        })
 
     # --- Embedding Settings ---
 
     async def get_embedding_settings(self, session: AsyncSession) -> dict[str, str]:
         """Get embedding endpoint settings."""
-        base_url = await self.get(session, EMBED_BASE_URL_KEY)
-        model = await self.get(session, EMBED_MODEL_KEY)
-        api_key = await self.get(session, EMBED_API_KEY_KEY)
+        values = await self.get_many(session, [
+            EMBED_BASE_URL_KEY,
+            EMBED_MODEL_KEY,
+            EMBED_API_KEY_KEY,
+        ])
+        base_url = values.get(EMBED_BASE_URL_KEY)
+        model = values.get(EMBED_MODEL_KEY)
+        api_key = values.get(EMBED_API_KEY_KEY)
         return {
             "base_url": base_url or "",
             "model": model or "",
@@ -125,17 +218,24 @@ class SettingsService:
         api_key: str = "",
     ) -> None:
         """Save embedding endpoint settings to the database."""
-        await self.set(session, EMBED_BASE_URL_KEY, base_url)
-        await self.set(session, EMBED_MODEL_KEY, model)
-        await self.set(session, EMBED_API_KEY_KEY, api_key)
+        await self.set_many(session, {
+            EMBED_BASE_URL_KEY: base_url,
+            EMBED_MODEL_KEY: model,
+            EMBED_API_KEY_KEY: api_key,
+        })
 
     # --- Re-ranker Settings ---
 
     async def get_reranker_settings(self, session: AsyncSession) -> dict[str, str]:
         """Get re-ranker endpoint settings."""
-        base_url = await self.get(session, RERANKER_BASE_URL_KEY)
-        model = await self.get(session, RERANKER_MODEL_KEY)
-        api_key = await self.get(session, RERANKER_API_KEY_KEY)
+        values = await self.get_many(session, [
+            RERANKER_BASE_URL_KEY,
+            RERANKER_MODEL_KEY,
+            RERANKER_API_KEY_KEY,
+        ])
+        base_url = values.get(RERANKER_BASE_URL_KEY)
+        model = values.get(RERANKER_MODEL_KEY)
+        api_key = values.get(RERANKER_API_KEY_KEY)
         return {
             "base_url": base_url or "",
             "model": model or "",
@@ -150,9 +250,19 @@ class SettingsService:
         api_key: str = "",
     ) -> None:
         """Save re-ranker endpoint settings to the database."""
-        await self.set(session, RERANKER_BASE_URL_KEY, base_url)
-        await self.set(session, RERANKER_MODEL_KEY, model)
-        await self.set(session, RERANKER_API_KEY_KEY, api_key)
+        await self.set_many(session, {
+            RERANKER_BASE_URL_KEY: base_url,
+            RERANKER_MODEL_KEY: model,
+            RERANKER_API_KEY_KEY: api_key,
+        })
+
+    async def get_all_model_settings(self, session: AsyncSession) -> dict[str, dict[str, str]]:
+        """Get LLM, embedding and re-ranker settings together."""
+        # Called in turn: they share one session, and each may reload the table
+        llm = await self.get_llm_settings(session)
+        embedding = await self.get_embedding_settings(session)
+        reranker = await self.get_reranker_settings(session)
+        return {"llm": llm, "embedding": embedding, "reranker": reranker}
 
     # --- Timezone ---
 
@@ -170,11 +280,18 @@ class SettingsService:
 
     async def get_ocr_settings(self, session: AsyncSession) -> dict[str, Any]:
         """Get OCR / document processing settings, falling back to config.py defaults."""
-        method = await self.get(session, OCR_METHOD_KEY)
-        endpoint_url = await self.get(session, OCR_ENDPOINT_URL_KEY)
-        workers = await self.get(session, DOC_WORKERS_KEY)
-        chunk_size = await self.get(session, CHUNK_SIZE_TOKENS_KEY)
-        chunk_overlap = await self.get(session, CHUNK_OVERLAP_TOKENS_KEY)
+        values = await self.get_many(session, [
+            OCR_METHOD_KEY,
+            OCR_ENDPOINT_URL_KEY,
+            DOC_WORKERS_KEY,
+            CHUNK_SIZE_TOKENS_KEY,
+            CHUNK_OVERLAP_TOKENS_KEY,
+        ])
+        method = values.get(OCR_METHOD_KEY)
+        endpoint_url = values.get(OCR_ENDPOINT_URL_KEY)
+        workers = values.get(DOC_WORKERS_KEY)
+        chunk_size = values.get(CHUNK_SIZE_TOKENS_KEY)
+        chunk_overlap = values.get(CHUNK_OVERLAP_TOKENS_KEY)
         return {
             "method": method or app_settings.OCR_METHOD,
             "endpoint_url": endpoint_url or app_settings.OCR_ENDPOINT_URL,
@@ -193,21 +310,25 @@ class SettingsService:
         chunk_overlap_tokens: int | None = None,
     ) -> None:
         """Save OCR / document processing settings to the database."""
-        await self.set(session, OCR_METHOD_KEY, method)
-        await self.set(session, OCR_ENDPOINT_URL_KEY, endpoint_url)
+        items = {OCR_METHOD_KEY: method, OCR_ENDPOINT_URL_KEY: endpoint_url}
         if doc_workers is not None:
-            await self.set(session, DOC_WORKERS_KEY, str(max(1, min(doc_workers, 16))))
+            items[DOC_WORKERS_KEY] = str(max(1, min(doc_workers, 16)))
         if chunk_size_tokens is not None:
-            await self.set(session, CHUNK_SIZE_TOKENS_KEY, str(max(100, chunk_size_tokens)))
+            items[CHUNK_SIZE_TOKENS_KEY] = str(max(100, chunk_size_tokens))
         if chunk_overlap_tokens is not None:
-            await self.set(session, CHUNK_OVERLAP_TOKENS_KEY, str(max(0, chunk_overlap_tokens)))
+            items[CHUNK_OVERLAP_TOKENS_KEY] = str(max(0, chunk_overlap_tokens))
+        await self.set_many(session, items)
 
     # --- Per-source Scheduler Settings ---
 
     async def get_grants_scheduler_settings(self, session: AsyncSession) -> dict[str, Any]:
         """Get Grants.gov scheduler settings."""
-        enabled = await self.get(session, GRANTS_SCHEDULER_ENABLED_KEY)
-        interval = await self.get(session, GRANTS_SCHEDULER_INTERVAL_KEY)
+        values = await self.get_many(session, [
+            GRANTS_SCHEDULER_ENABLED_KEY,
+            GRANTS_SCHEDULER_INTERVAL_KEY,
+        ])
+        enabled = values.get(GRANTS_SCHEDULER_ENABLED_KEY)
+        interval = values.get(GRANTS_SCHEDULER_INTERVAL_KEY)
         return {
             "enabled": enabled != "false",  # default True
             "interval_hours": int(interval) if interval else app_settings.SYNC_INTERVAL_HOURS,
@@ -220,17 +341,25 @@ class SettingsService:
         interval_hours: int | None = None,
     ) -> None:
         """Save Grants.gov scheduler settings."""
+        items = {}
         if enabled is not None:
-            await self.set(session, GRANTS_SCHEDULER_ENABLED_KEY, "true" if enabled else "false")
+            items[GRANTS_SCHEDULER_ENABLED_KEY] = "true" if enabled else "false"
         if interval_hours is not None:
-            await self.set(session, GRANTS_SCHEDULER_INTERVAL_KEY, str(interval_hours))
+            items[GRANTS_SCHEDULER_INTERVAL_KEY] = str(interval_hours)
+        await self.set_many(session, items)
 
     async def get_collabnet_scheduler_settings(self, session: AsyncSession) -> dict[str, Any]:
         """Get CollabNet scheduler settings."""
-        enabled = await self.get(session, COLLABNET_SCHEDULER_ENABLED_KEY)
-        day = await self.get(session, COLLABNET_SCHEDULER_DAY_KEY)
-        hour = await self.get(session, COLLABNET_SCHEDULER_HOUR_KEY)
-        minute = await self.get(session, COLLABNET_SCHEDULER_MINUTE_KEY)
+        values = await self.get_many(session, [
+            COLLABNET_SCHEDULER_ENABLED_KEY,
+            COLLABNET_SCHEDULER_DAY_KEY,
+            COLLABNET_SCHEDULER_HOUR_KEY,
+            COLLABNET_SCHEDULER_MINUTE_KEY,
+        ])
+        enabled = values.get(COLLABNET_SCHEDULER_ENABLED_KEY)
+        day = values.get(COLLABNET_SCHEDULER_DAY_KEY)
+        hour = values.get(COLLABNET_SCHEDULER_HOUR_KEY)
+        minute = values.get(COLLABNET_SCHEDULER_MINUTE_KEY)
         return {
             "enabled": enabled != "false",  # default True
             "day": day or "fri",
@@ -247,14 +376,16 @@ class SettingsService:
         minute: int | None = None,
     ) -> None:
         """Save CollabNet scheduler settings."""
+        items = {}
         if enabled is not None:
-            await self.set(session, COLLABNET_SCHEDULER_ENABLED_KEY, "true" if enabled else "false")
+            items[COLLABNET_SCHEDULER_ENABLED_KEY] = "true" if enabled else "false"
         if day is not None:
-            await self.set(session, COLLABNET_SCHEDULER_DAY_KEY, day)
+            items[COLLABNET_SCHEDULER_DAY_KEY] = day
         if hour is not None:
-            await self.set(session, COLLABNET_SCHEDULER_HOUR_KEY, str(hour))
+            items[COLLABNET_SCHEDULER_HOUR_KEY] = str(hour)
         if minute is not None:
-            await self.set(session, COLLABNET_SCHEDULER_MINUTE_KEY, str(minute))
+            items[COLLABNET_SCHEDULER_MINUTE_KEY] = str(minute)
+        await self.set_many(session, items)
 
 
 settings_service = SettingsService()
@@ -1,9 +1,12 @@
 import asyncio
 import logging
 import re
-from datetime import datetime, date
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, date, timedelta
 
-from sqlalchemy import select, text
+from sqlalchemy import select, text, delete, insert, update, func, literal_column, case, bindparam
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import async_session
@@ -14,28 +17,122 @@ from app.models import (
 from app.models.sync_log import SyncLog
 from app.services.grants_client import GrantsGovClient
 from app.services.cache_service import cache_service
+from app.services.search_service import search_service
 
 logger = logging.getLogger(__name__)
 
-TEAM_KEYWORDS = re.compile(
-    r"\b(team|collaborative|co-pi|multi-pi|co-investigator)\b", re.IGNORECASE
+# Team, multi-institution and multi-jurisdiction keywords in one pattern so
+# a description is scanned once; the named group says which flag matched.
+# Matched against lowercased text, which is cheaper than IGNORECASE folding
+CLASSIFIER_RE = re.compile(
+    r"\b(?:"
+    r"(?P<team>team|collaborative|co-pi|multi-pi|co-investigator)"
+    r"|(?P<inst>multi-institutional|subaward|consortium|sub-award|subcontract)"
+    r"|(?P<juris>multi-state|multi-jurisdiction|interstate|inter-state)"
+    r")\b"
 )
-MULTI_INST_KEYWORDS = re.compile(
-    r"\b(multi-institutional|subaward|consortium|sub-award|subcontract)\b", re.IGNORECASE
-)
-MULTI_JURIS_KEYWORDS = re.compile(
-    r"\b(multi-state|multi-jurisdiction|interstate|inter-state)\b", re.IGNORECASE
+# Keyword hits appear early; capping the scan bounds the cost of huge HTML pastes
+CLASSIFY_MAX_CHARS = 16384
+CLASSIFY_MIN_CHARS = 4  # shorter than any keyword
+CLASSIFY_CACHE_SIZE = 10000  # description hashes remembered across batches
+
+# Grants.gov date formats, most common first
+_DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%Y-%m-%d-%H-%M-%S")
+# "Mon DD, YYYY HH:MM:SS AM/PM TZ" from synopsis; only the date part is kept
+SYNOPSIS_DATE_RE = re.compile(r"^([A-Z][a-z]{2}) (\d{1,2}), (\d{4}) \d{1,2}:\d{2}:\d{2} [AP]M")
+_MONTHS = {
+    name: i for i, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1
+    )
+}
+
+
+def _parse_fixed_date(value: str, formats: tuple[str, ...]) -> date | None:
+    """Parse one of the fixed-width formats, slicing instead of strptime.
+
+    Only strings of a plausible length fall back to strptime (for unpadded
+    forms like 1/5/2024), so free-text dates are rejected cheaply.
+    """
+    n = len(value)
+    try:
+        if n == 10 and value[2] == "/" and value[5] == "/":
+            return date(int(value[6:]), int(value[:2]), int(value[3:5]))
+        if (n == 10 or (n == 19 and len(formats) > 2)) and value[4] == "-" and value[7] == "-":
+            return date(int(value[:4]), int(value[5:7]), int(value[8:10]))
+    except ValueError:
+        return None
+    if n > 19:
+        return None
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _seconds_since(column, now: datetime):
+    """SQL expression for the seconds elapsed between a DATETIME column and now."""
+    return func.timestampdiff(literal_column("MICROSECOND"), column, now) / 1000000.0
+
+
+# Child tables rewritten wholesale on every opportunity upsert
+ASSOCIATION_MODELS = (
+    OpportunityApplicantType, OpportunityFundingInstrument,
+    OpportunityFundingCategory, OpportunityALN,
 )
 
+# Per-batch statements built once so their compiled forms are reused
+_OPP_PKS_STMT = select(Opportunity.opportunity_id, Opportunity.id).where(
+    Opportunity.opportunity_id.in_(bindparam("opp_ids", expanding=True))
+)
+_FRESH_ROWS_STMT = select(
+    Opportunity.opportunity_id, Opportunity.close_date, Opportunity.status
+).where(
+    Opportunity.opportunity_id.in_(bindparam("opp_ids", expanding=True)),
+    Opportunity.last_synced_at >= bindparam("since"),
+)
+_DELETE_CHILDREN_STMTS = {
+    cls: delete(cls)
+    .where(cls.opportunity_id.in_(bindparam("pks", expanding=True)))
+    .execution_options(synchronize_session=False)
+    for cls in ASSOCIATION_MODELS
+}
+_INSERT_CHILDREN_STMTS = {cls: insert(cls) for cls in ASSOCIATION_MODELS}
+
+CLOSE_CHUNK_SIZE = 1000
+_CLOSE_PAST_DEADLINE_SQL = text(
+    "UPDATE opportunities SET status = 'closed' "
+    f"WHERE status = 'posted' AND close_date < CURDATE() LIMIT {CLOSE_CHUNK_SIZE}"
+)
 
 SYNC_STATS_KEY = "pf:sync_stats"
 SYNC_STATS_TTL = 3600  # 1 hour max
+SYNC_LOCK_KEY = "pf:sync_lock"
+SYNC_LOCK_TTL = 7200  # 2 hours; extended by the stats heartbeat while syncing
+MAX_ERRORS_LISTED = 20  # most recent per-opportunity errors kept in sync_stats
+UPSERT_BATCH_SIZE = 500  # fetched details written per bulk transaction
+# Full syncs don't re-fetch rows synced this recently whose search hit
+# (close date, status) still matches the stored row
+SYNC_FRESH_WINDOW = timedelta(hours=6)
+STATS_PUBLISH_INTERVAL = 1.0  # min seconds between progress publishes
+STATS_HEARTBEAT_INTERVAL = 2.0  # seconds between background publishes while syncing
+# Cached views derived from opportunity data; locks, stats and workflow
+# state under pf:* are left alone when a sync finishes
+OPPORTUNITY_CACHE_PREFIXES = (
+    "pf:facets", "pf:stats", "pf:agencies", "pf:categories",
+    "pf:analytics:", "pf:matches:", "pf:agent_matches:",
+)
 
 
 class SyncService:
     def __init__(self):
         self.client = GrantsGovClient()
         self.is_syncing = False
+        self._last_publish = 0.0
+        self._heartbeat: asyncio.Task | None = None
+        self._lock_token: str | None = None
+        self._classify_cache: OrderedDict[int, frozenset[str]] = OrderedDict()
         self.last_sync: datetime | None = None
         self.sync_stats: dict = {}
         self._cancel_requested = False
@@ -46,13 +143,59 @@ class SyncService:
         """Write current sync stats to Redis so all workers can read them."""
         try:
             import json
-            data = {"is_syncing": self.is_syncing, "stats": self.sync_stats}
+            stats = {**self.sync_stats, "errors_list": list(self.sync_stats.get("errors_list", ()))}
+            data = {"is_syncing": self.is_syncing, "stats": stats}
             if self.last_sync:
                 data["last_sync"] = self.last_sync.isoformat()
             await cache_service.set(SYNC_STATS_KEY, data, SYNC_STATS_TTL)
         except Exception:
             pass  # Best-effort; don't break sync over a stats publish failure
 
+    async def _acquire_lock(self) -> bool:
+        """Take the cross-worker sync lock so two workers never sync at once."""
+        self._lock_token = await cache_service.acquire_lock(SYNC_LOCK_KEY, SYNC_LOCK_TTL)
+        return self._lock_token is not None
+
+    async def _refresh_lock(self):
+        if self._lock_token:
+            await cache_service.extend_lock(SYNC_LOCK_KEY, self._lock_token, SYNC_LOCK_TTL)
+
+    async def _release_lock(self):
+        token, self._lock_token = self._lock_token, None
+        if token:
+            await cache_service.release_lock(SYNC_LOCK_KEY, token)
+
+    async def _publish_progress(self):
+        """Publish mid-sync progress, at most once per STATS_PUBLISH_INTERVAL."""
+        now = time.monotonic()
+        if now - self._last_publish < STATS_PUBLISH_INTERVAL:
+            return
+        self._last_publish = now
+        await self._publish_stats()
+
+    async def _stats_heartbeat(self):
+        """Keep shared stats fresh while a sync runs, without callers publishing."""
+        while self.is_syncing:
+            await asyncio.sleep(STATS_HEARTBEAT_INTERVAL)
+            await self._publish_progress()
+            await self._refresh_lock()
+
+    def _start_heartbeat(self):
+        self._last_publish = 0.0
+        self._heartbeat = asyncio.create_task(self._stats_heartbeat())
+
+    def _stop_heartbeat(self):
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    @staticmethod
+    async def _refresh_facet_summary():
+        try:
+            await search_service.refresh_facet_summary()
+        except Exception as e:
+            logger.error(f"Failed to refresh facet summary: {e}", exc_info=True)
+
     @staticmethod
     async def get_shared_stats() -> dict | None:
         """Read sync stats from Redis (cross-worker shared state)."""
@@ -61,17 +204,14 @@ class SyncService:
     def _parse_date(self, date_str: str | None) -> date | None:
         if not date_str:
             return None
-        try:
-            # Grants.gov uses MM/DD/YYYY format
-            return datetime.strptime(date_str, "%m/%d/%Y").date()
-        except (ValueError, TypeError):
-            try:
-                return datetime.strptime(date_str, "%Y-%m-%d").date()
-            except (ValueError, TypeError):
-                return None
+        # Grants.gov uses MM/DD/YYYY format, occasionally ISO
+        return _parse_fixed_date(date_str, _DATE_FORMATS[:2])
 
     def _parse_decimal(self, val) -> float | None:
-        if val is None:
+        # JSON numbers and blank/"none" strings are common; skip the exception path
+        if isinstance(val, (int, float)):
+            return float(val)
+        if val is None or val == "" or val == "none":
             return None
         try:
             return float(val)
@@ -79,56 +219,69 @@ class SyncService:
             return None
 
     def _classify_opportunity(self, description: str | None, num_categories: int) -> dict:
-        desc = description or ""
+        found = self._classifier_groups(description or "")
         return {
             "is_multi_disciplinary": num_categories >= 2,
-            "is_team_based": bool(TEAM_KEYWORDS.search(desc)),
-            "is_multi_institution": bool(MULTI_INST_KEYWORDS.search(desc)),
-            "is_multi_jurisdiction": bool(MULTI_JURIS_KEYWORDS.search(desc)),
+            "is_team_based": "team" in found,
+            "is_multi_institution": "inst" in found,
+            "is_multi_jurisdiction": "juris" in found,
         }
 
-    async def _upsert_agency(self, session: AsyncSession, agency_code: str, agency_name: str):
-        if not agency_code:
-            return
-        existing = await session.get(Agency, agency_code)
-        if not existing:
-            session.add(Agency(code=agency_code, name=agency_name or agency_code))
+    def _classifier_groups(self, description: str) -> frozenset[str]:
+        """Keyword groups found in a description, memoized by its hash.
+
+        Many synopses share boilerplate text, so repeats skip the regex scan.
+        """
+        if len(description) < CLASSIFY_MIN_CHARS:
+            return frozenset()
+        key = hash(description)
+        found = self._classify_cache.get(key)
+        if found is not None:
+            self._classify_cache.move_to_end(key)
+            return found
+        groups = set()
+        for m in CLASSIFIER_RE.finditer(description.lower()):
+            groups.add(m.lastgroup)
+            if len(groups) == 3:
+                break
+        found = frozenset(groups)
+        self._classify_cache[key] = found
+        if len(self._classify_cache) > CLASSIFY_CACHE_SIZE:
+            self._classify_cache.popitem(last=False)
+        return found
 
     def _parse_grants_date(self, date_str: str | None) -> date | None:
         """Parse various date formats from Grants.gov API."""
         if not date_str or date_str == "none":
             return None
-        # Try MM/DD/YYYY (search results format)
-        for fmt in ("%m/%d/%Y", "%Y-%m-%d", "%Y-%m-%d-%H-%M-%S"):
+        parsed = _parse_fixed_date(date_str, _DATE_FORMATS)
+        if parsed:
+            return parsed
+        m = SYNOPSIS_DATE_RE.match(date_str)
+        if m and m.group(1) in _MONTHS:
             try:
-                return datetime.strptime(date_str, fmt).date()
-            except (ValueError, TypeError):
-                continue
-        # Try "Mon DD, YYYY HH:MM:SS AM/PM TZ" format from synopsis
-        try:
-            # Strip timezone abbreviation
-            parts = date_str.rsplit(" ", 1)
-            if len(parts) == 2:
-                return datetime.strptime(parts[0], "%b %d, %Y %I:%M:%S %p").date()
-        except (ValueError, TypeError):
-            pass
+                return date(int(m.group(3)), _MONTHS[m.group(1)], int(m.group(2)))
+            except ValueError:
+                pass
         return None
 
     async def _mark_stale_syncs(self):
         """Mark any orphaned 'running' sync_logs as failed (e.g. from restarts)."""
+        now = datetime.utcnow()
         async with async_session() as session:
             async with session.begin():
-                stmt = select(SyncLog).where(SyncLog.status == "running")
-                result = await session.execute(stmt)
-                stale = result.scalars().all()
-                now = datetime.utcnow()
-                for log in stale:
-                    log.status = "failed"
-                    log.completed_at = now
-                    log.duration_seconds = (now - log.started_at).total_seconds()
-                    log.error_message = "Interrupted (server restart or orphaned)"
-                if stale:
-                    logger.info(f"Marked {len(stale)} orphaned sync logs as failed")
+                result = await session.execute(
+                    update(SyncLog)
+                    .where(SyncLog.status == "running")
+                    .values(
+                        status="failed",
+                        completed_at=now,
+                        duration_seconds=_seconds_since(SyncLog.started_at, now),
+                        error_message="Interrupted (server restart or orphaned)",
+                    )
+                )
+                if result.rowcount:
+                    logger.info(f"Marked {result.rowcount} orphaned sync logs as failed")
 
     async def _create_sync_log(self, sync_type: str) -> int:
         """Create a sync_log row and return its id."""
@@ -150,15 +303,19 @@ class SyncService:
         now = datetime.utcnow()
         async with async_session() as session:
             async with session.begin():
-                log = await session.get(SyncLog, log_id)
-                if log:
-                    log.status = status
-                    log.completed_at = now
-                    log.duration_seconds = (now - log.started_at).total_seconds()
-                    log.total_items = stats.get("total", 0)
-                    log.success_count = stats.get("success", 0)
-                    log.error_count = stats.get("errors", 0)
-                    log.error_message = error_msg
+                await session.execute(
+                    update(SyncLog)
+                    .where(SyncLog.id == log_id)
+                    .values(
+                        status=status,
+                        completed_at=now,
+                        duration_seconds=_seconds_since(SyncLog.started_at, now),
+                        total_items=stats.get("total", 0),
+                        success_count=stats.get("success", 0),
+                        error_count=stats.get("errors", 0),
+                        error_message=error_msg,
+                    )
+                )
         # Update Redis shared stats to reflect sync is done
         await self._publish_stats()
 
@@ -172,230 +329,324 @@ class SyncService:
             return True
         return False
 
-    async def _upsert_opportunity(self, session: AsyncSession, detail: dict) -> Opportunity | None:
-        try:
-            # fetchOpportunity response structure - data IS the opportunity
-            opp_id = detail.get("id")
-            if not opp_id:
-                logger.warning("No opportunity ID found in detail response")
-                return None
+    def _build_rows(self, detail: dict, now: datetime) -> dict | None:
+        """Turn a fetchOpportunity response into plain row dicts (no DB access).
 
-            opp_id = int(opp_id)
-
-            # Agency info from agencyDetails
-            agency_details = detail.get("agencyDetails", {}) or {}
-            agency_code = detail.get("owningAgencyCode") or agency_details.get("agencyCode", "")
-            agency_name = agency_details.get("agencyName", "")
-            if agency_code:
-                await self._upsert_agency(session, agency_code, agency_name)
-
-            # Also upsert top-level agency if different
-            top_agency = detail.get("topAgencyDetails", {}) or {}
-            top_code = top_agency.get("agencyCode", "")
-            if top_code and top_code != agency_code:
-                await self._upsert_agency(session, top_code, top_agency.get("agencyName", ""))
-                # Set parent relationship
-                if agency_code:
-                    existing = await session.get(Agency, agency_code)
-                    if existing and not existing.parent_agency_code:
-                        existing.parent_agency_code = top_code
-
-            # Look for existing
-            stmt = select(Opportunity).where(Opportunity.opportunity_id == opp_id)
-            result = await session.execute(stmt)
-            opp = result.scalar_one_or_none()
-
-            synopsis = detail.get("synopsis", {}) or {}
-            description = synopsis.get("synopsisDesc", "") or ""
-
-            # Funding categories from synopsis for classification
-            categories = synopsis.get("fundingActivityCategories", []) or []
-            classification = self._classify_opportunity(description, len(categories))
-
-            # Contact info from synopsis
-            contact_name = synopsis.get("agencyContactName")
-            contact_email = synopsis.get("agencyContactEmail")
-            contact_phone = synopsis.get("agencyContactPhone")
-
-            # Status: 'ost' field contains "POSTED", "FORECASTED", etc.
-            status_val = (detail.get("ost") or "posted").lower()
-
-            title = detail.get("opportunityTitle") or "Untitled"
-
-            # Category
-            opp_category = detail.get("opportunityCategory", {}) or {}
-
-            # Dates: posting from synopsis, close from responseDateDesc or search hit
-            posting_date = self._parse_grants_date(
-                synopsis.get("postingDateStr") or synopsis.get("postingDate")
-            )
-            close_date_desc = detail.get("originalDueDateDesc") or synopsis.get("responseDateDesc")
-            # closeDate from search results is MM/DD/YYYY format
-            close_date = self._parse_date(detail.get("_search_close_date")) or self._parse_date(close_date_desc)
-            archive_date = self._parse_grants_date(synopsis.get("archiveDateStr"))
-
-            # Award info from synopsis - these come as strings
-            award_ceiling_raw = synopsis.get("awardCeiling")
-            if award_ceiling_raw == "none":
-                award_ceiling_raw = None
-            award_floor_raw = synopsis.get("awardFloor")
-            if award_floor_raw == "none":
-                award_floor_raw = None
-
-            # Funding instruments from synopsis
-            instruments = synopsis.get("fundingInstruments", []) or []
-            fi_desc = ", ".join(fi.get("description", "") for fi in instruments) if instruments else None
-
-            values = dict(
-                opportunity_id=opp_id,
-                opportunity_number=detail.get("opportunityNumber"),
-                title=title,
-                status=status_val,
-                category=opp_category.get("category"),
-                category_explanation=opp_category.get("description"),
-                agency_code=agency_code or None,
-                posting_date=posting_date,
-                close_date=close_date,
-                close_date_description=close_date_desc,
-                archive_date=archive_date,
-                award_ceiling=self._parse_decimal(award_ceiling_raw),
-                award_floor=self._parse_decimal(award_floor_raw),
-                estimated_total_funding=self._parse_decimal(synopsis.get("estimatedFunding")),
-                expected_number_of_awards=self._parse_decimal(synopsis.get("numberOfAwards")),
-                cost_sharing=synopsis.get("costSharing"),
-                synopsis_description=description[:65000] if description else None,
-                contact_name=contact_name,
-                contact_email=contact_email,
-                contact_phone=contact_phone,
-                funding_instrument_type=instruments[0].get("id") if instruments else None,
-                funding_instrument_description=fi_desc,
-                grants_gov_url=f"https://www.grants.gov/search-results-detail/{opp_id}",
-                last_synced_at=datetime.utcnow(),
-                **classification,
-            )
-
-            if opp:
-                for k, v in values.items():
-                    setattr(opp, k, v)
-            else:
-                opp = Opportunity(**values)
-                session.add(opp)
-
-            await session.flush()
-
-            # Upsert association tables - delete and recreate
-            for cls in [OpportunityApplicantType, OpportunityFundingInstrument, OpportunityFundingCategory, OpportunityALN]:
-                await session.execute(
-                    text(f"DELETE FROM {cls.__tablename__} WHERE opportunity_id = :oid"),
-                    {"oid": opp.id},
-                )
+        Child rows are keyed by table and filled in with opportunity_id once
+        the batch's primary keys are known. now is the batch's sync time.
+        """
+        # fetchOpportunity response structure - data IS the opportunity
+        opp_id = detail.get("id")
+        if not opp_id:
+            logger.warning("No opportunity ID found in detail response")
+            return None
 
+        opp_id = int(opp_id)
+
+        # Agency info from agencyDetails, plus the top-level agency if different
+        agency_details = detail.get("agencyDetails", {}) or {}
+        agency_code = detail.get("owningAgencyCode") or agency_details.get("agencyCode", "")
+        agency_name = agency_details.get("agencyName", "")
+        top_agency = detail.get("topAgencyDetails", {}) or {}
+        top_code = top_agency.get("agencyCode", "")
+        if top_code == agency_code:
+            top_code = ""
+        agencies = []
+        if agency_code:
+            agencies.append((agency_code, agency_name, top_code or None))
+        if top_code:
+            agencies.append((top_code, top_agency.get("agencyName", ""), None))
+
+        synopsis = detail.get("synopsis", {}) or {}
+        description = synopsis.get("synopsisDesc", "") or ""
+
+        # Funding categories from synopsis for classification
+        categories = synopsis.get("fundingActivityCategories") or []
+        classification = self._classify_opportunity(description[:CLASSIFY_MAX_CHARS], len(categories))
+
+        # Contact info from synopsis
+        contact_name = synopsis.get("agencyContactName")
+        contact_email = synopsis.get("agencyContactEmail")
+        contact_phone = synopsis.get("agencyContactPhone")
+
+        # Status: 'ost' field contains "POSTED", "FORECASTED", etc.
+        status_val = (detail.get("ost") or "posted").lower()
+
+        title = detail.get("opportunityTitle") or "Untitled"
+
+        # Category
+        opp_category = detail.get("opportunityCategory", {}) or {}
+
+        # Dates: posting from synopsis, close from responseDateDesc or search hit
+        posting_date = self._parse_grants_date(
+            synopsis.get("postingDateStr") or synopsis.get("postingDate")
+        )
+        close_date_desc = detail.get("originalDueDateDesc") or synopsis.get("responseDateDesc")
+        # closeDate from search results is MM/DD/YYYY format
+        close_date = self._parse_date(detail.get("_search_close_date")) or self._parse_date(close_date_desc)
+        archive_date = self._parse_grants_date(synopsis.get("archiveDateStr"))
+
+        # Funding instruments from synopsis; names feed both the summary
+        # column and the child rows
+        instruments = synopsis.get("fundingInstruments") or []
+        instrument_names = [fi.get("description", "") for fi in instruments]
+        fi_desc = ", ".join(instrument_names) if instruments else None
+
+        values = dict(
+            opportunity_id=opp_id,
+            opportunity_number=detail.get("opportunityNumber"),
+            title=title,
+            status=status_val,
+            category=opp_category.get("category"),
+            category_explanation=opp_category.get("description"),
+            agency_code=agency_code or None,
+            posting_date=posting_date,
+            close_date=close_date,
+            close_date_description=close_date_desc,
+            archive_date=archive_date,
+            # Award info comes as strings; _parse_decimal maps "none" to None
+            award_ceiling=self._parse_decimal(synopsis.get("awardCeiling")),
+            award_floor=self._parse_decimal(synopsis.get("awardFloor")),
+            estimated_total_funding=self._parse_decimal(synopsis.get("estimatedFunding")),
+            expected_number_of_awards=self._parse_decimal(synopsis.get("numberOfAwards")),
+            cost_sharing=synopsis.get("costSharing"),
+            synopsis_description=description[:65000] if description else None,
+            contact_name=contact_name,
+            contact_email=contact_email,
+            contact_phone=contact_phone,
+            funding_instrument_type=instruments[0].get("id") if instruments else None,
+            funding_instrument_description=fi_desc,
+            grants_gov_url=f"https://www.grants.gov/search-results-detail/{opp_id}",
+            last_synced_at=now,
+            **classification,
+        )
+
+        children = {
             # Applicant types from synopsis
-            for at in (synopsis.get("applicantTypes", []) or []):
-                session.add(OpportunityApplicantType(
-                    opportunity_id=opp.id,
-                    type_code=str(at.get("id", "")),
-                    type_name=at.get("description", ""),
-                ))
-
+            OpportunityApplicantType: [
+                {"type_code": str(at.get("id", "")), "type_name": at.get("description", "")}
+                for at in (synopsis.get("applicantTypes") or [])
+            ],
             # Funding instruments from synopsis
-            for fi in instruments:
-                session.add(OpportunityFundingInstrument(
-                    opportunity_id=opp.id,
-                    instrument_code=str(fi.get("id", "")),
-                    instrument_name=fi.get("description", ""),
-                ))
-
+            OpportunityFundingInstrument: [
+                {"instrument_code": str(fi.get("id", "")), "instrument_name": name}
+                for fi, name in zip(instruments, instrument_names)
+            ],
             # Funding categories from synopsis
-            for fc in categories:
-                session.add(OpportunityFundingCategory(
-                    opportunity_id=opp.id,
-                    category_code=str(fc.get("id", "")),
-                    category_name=fc.get("description", ""),
-                ))
-
+            OpportunityFundingCategory: [
+                {"category_code": str(fc.get("id", "")), "category_name": fc.get("description", "")}
+                for fc in categories
+            ],
             # ALNs/CFDAs from top-level
-            for aln in (detail.get("cfdas", []) or []):
-                aln_num = str(aln.get("cfdaNumber", ""))
-                session.add(OpportunityALN(
-                    opportunity_id=opp.id,
-                    aln_number=aln_num,
-                    program_title=aln.get("programTitle"),
-                ))
-
-            # Extract attachment metadata (lightweight, no downloads) — skip closed/archived
-            is_open = status_val != "archived" and (opp.close_date is None or opp.close_date >= date.today())
-            if is_open:
-                try:
-                    from app.services.document_service import document_service
-                    await document_service.extract_attachment_metadata(session, opp, detail)
-                    # Note: linked document extraction (HTTP fetches) is deferred
-                    # to the Retrieve phase to keep Discovery fast
-                except Exception as e:
-                    logger.warning(f"Failed to extract document metadata for {opp_id}: {e}")
-
-            return opp
-        except Exception as e:
-            logger.error(f"Error upserting opportunity: {e}", exc_info=True)
-            return None
+            OpportunityALN: [
+                {"aln_number": str(aln.get("cfdaNumber", "")), "program_title": aln.get("programTitle")}
+                for aln in (detail.get("cfdas") or [])
+            ],
+        }
+
+        # Attachment metadata is only extracted for open opportunities
+        is_open = status_val != "archived" and (close_date is None or close_date >= date.today())
+
+        return {
+            "opportunity": values,
+            "agencies": agencies,
+            "children": children,
+            "detail": detail if is_open else None,
+        }
 
-    async def _run_fetch_phase(self, items: list[dict], close_dates: dict, log_id: int):
-        """Phase 2: fetch details and upsert. Shared by full_sync and refresh_sync."""
+    async def _upsert_batch(self, session: AsyncSession, rows: list[dict]):
+        """Write a batch of _build_rows results with bulk statements."""
+        # Agencies: one upsert for the whole batch, then one UPDATE that
+        # fills in parent codes that are still unset
+        names: dict[str, str] = {}
+        parents: dict[str, str] = {}
+        for row in rows:
+            for code, name, parent_code in row["agencies"]:
+                if name or code not in names:
+                    names[code] = name or code
+                if parent_code:
+                    parents.setdefault(code, parent_code)
+        if names:
+            stmt = mysql_insert(Agency).values([{"code": c, "name": n} for c, n in names.items()])
+            # Refresh names, but never overwrite one with the code placeholder
+            stmt = stmt.on_duplicate_key_update(
+                name=func.if_(stmt.inserted.name != stmt.inserted.code, stmt.inserted.name, Agency.name),
+            )
+            await session.execute(stmt)
+        if parents:
+            await session.execute(
+                update(Agency)
+                .where(Agency.code.in_(parents), Agency.parent_agency_code.is_(None))
+                .values(parent_agency_code=case(parents, value=Agency.code))
+                .execution_options(synchronize_session=False)
+            )
+
+        opp_rows = [row["opportunity"] for row in rows]
+        stmt = mysql_insert(Opportunity).values(opp_rows)
+        stmt = stmt.on_duplicate_key_update({
+            **{col: stmt.inserted[col] for col in opp_rows[0] if col != "opportunity_id"},
+            "updated_at": stmt.inserted.last_synced_at,
+        })
+        await session.execute(stmt)
+
+        result = await session.execute(
+            _OPP_PKS_STMT, {"opp_ids": [r["opportunity_id"] for r in opp_rows]}
+        )
+        pk_by_opp_id = dict(result.all())
+        pks = list(pk_by_opp_id.values())
+
+        # Association tables - delete and recreate, one IN-list DELETE per table.
+        # Child dicts from _build_rows are completed in place, not copied
+        for row in rows:
+            pk = pk_by_opp_id[row["opportunity"]["opportunity_id"]]
+            for children in row["children"].values():
+                for child in children:
+                    child["opportunity_id"] = pk
+        for cls in ASSOCIATION_MODELS:
+            await session.execute(_DELETE_CHILDREN_STMTS[cls], {"pks": pks})
+            child_rows = [child for row in rows for child in row["children"][cls]]
+            if child_rows:
+                await session.execute(_INSERT_CHILDREN_STMTS[cls], child_rows)
+
+        # Extract attachment metadata (lightweight, no downloads) — skip closed/archived.
+        # Linked document extraction (HTTP fetches) is deferred to the Retrieve
+        # phase to keep Discovery fast
+        from app.services.document_service import document_service
+        with_attachments = [
+            (pk_by_opp_id[row["opportunity"]["opportunity_id"]], row["detail"])
+            for row in rows
+            if row["detail"] is not None
+        ]
+        if with_attachments:
+            try:
+                async with session.begin_nested():
+                    await document_service.extract_attachment_metadata_many(session, with_attachments)
+            except Exception as e:
+                logger.warning(f"Failed to extract document metadata for {len(with_attachments)} opportunities: {e}")
+
+    async def _run_fetch_phase(
+        self, items: list[dict | int], close_dates: dict, log_id: int, skip_fresh: bool = False,
+    ):
+        """Phase 2: fetch details and upsert. Shared by full_sync and refresh_sync.
+
+        Fetching and DB writes overlap: a producer task fetches details into
+        a queue while this task drains it into bulk upserts.
+        """
         self.sync_stats["phase"] = "fetching"
         self.sync_stats["total"] = len(items)
 
-        batch_size = 50
-        total_batches = (len(items) + batch_size - 1) // batch_size
-        self.sync_stats["total_batches"] = total_batches
+        queue: asyncio.Queue = asyncio.Queue(maxsize=UPSERT_BATCH_SIZE)
+        producer = asyncio.create_task(self._produce_details(items, close_dates, queue, skip_fresh))
+        try:
+            await self._consume_details(queue)
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
 
-        for i in range(0, len(items), batch_size):
-            if self._cancel_requested:
-                logger.info("Sync cancelled by user")
-                self.sync_stats["cancelled"] = True
-                await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
-                return
-
-            batch = items[i:i + batch_size]
-            self.sync_stats["current_batch"] = i // batch_size + 1
-
-            # Fetch details concurrently (bounded by semaphore)
-            fetch_tasks = []
-            for item in batch:
-                opp_id = item.get("id") if isinstance(item, dict) else item
-                if opp_id:
-                    cd = close_dates.get(int(opp_id))
-                    fetch_tasks.append(self._fetch_detail(int(opp_id), cd))
-
-            details = await asyncio.gather(*fetch_tasks, return_exceptions=True)
-
-            # Write to DB sequentially to avoid deadlocks
-            for detail_result in details:
-                if isinstance(detail_result, Exception):
-                    continue
-                if detail_result is not None:
-                    await self._upsert_detail(detail_result)
-                    # Update progress per-item so the UI stays responsive
-                    self.sync_stats["success"] = self.sync_stats.get("success", 0)
-                    if (self.sync_stats["success"] + self.sync_stats.get("skipped", 0)) % 10 == 0:
-                        await self._publish_stats()
-
-            logger.info(f"Synced batch {i // batch_size + 1}/{total_batches}, progress: {min(i + batch_size, len(items))}/{len(items)}")
-            await self._publish_stats()
+        if self._cancel_requested:
+            logger.info("Sync cancelled by user")
+            self.sync_stats["cancelled"] = True
+            await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
+            return
 
-        await cache_service.invalidate_all()
+        await self._refresh_facet_summary()
+        await cache_service.invalidate_prefix(*OPPORTUNITY_CACHE_PREFIXES)
         self.last_sync = datetime.utcnow()
         self.sync_stats["completed"] = self.last_sync.isoformat()
         logger.info(f"Sync completed: {self.sync_stats}")
         await self._finish_sync_log(log_id, "completed", self.sync_stats)
 
+    async def _produce_details(
+        self, items: list[dict | int], close_dates: dict, queue: asyncio.Queue, skip_fresh: bool = False,
+    ):
+        """Fetch details in concurrent batches and queue them; None marks the end."""
+        batch_size = 50
+        fresh_since = datetime.utcnow() - SYNC_FRESH_WINDOW
+        total_batches = (len(items) + batch_size - 1) // batch_size
+        self.sync_stats["total_batches"] = total_batches
+        try:
+            for i in range(0, len(items), batch_size):
+                if self._cancel_requested:
+                    return
+
+                batch = items[i:i + batch_size]
+                self.sync_stats["current_batch"] = i // batch_size + 1
+
+                unchanged = await self._unchanged_ids(batch, fresh_since) if skip_fresh else set()
+                if unchanged:
+                    self.sync_stats["unchanged"] = self.sync_stats.get("unchanged", 0) + len(unchanged)
+                    self.sync_stats["skipped"] = self.sync_stats.get("skipped", 0) + len(unchanged)
+
+                # Fetch details concurrently (bounded by semaphore)
+                fetch_tasks = []
+                for item in batch:
+                    opp_id = item.get("id") if isinstance(item, dict) else item
+                    if opp_id and int(opp_id) not in unchanged:
+                        cd = close_dates.get(int(opp_id))
+                        fetch_tasks.append(self._fetch_detail(int(opp_id), cd))
+
+                details = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+                for detail in details:
+                    if detail is not None and not isinstance(detail, Exception):
+                        await queue.put(detail)
+
+                logger.info(f"Fetched batch {i // batch_size + 1}/{total_batches}, progress: {min(i + batch_size, len(items))}/{len(items)}")
+                await self._publish_progress()
+        finally:
+            await queue.put(None)
+
+    async def _unchanged_ids(self, batch: list[dict | int], since: datetime) -> set[int]:
+        """IDs of search hits synced since `since` whose close date and status still match."""
+        hits = {
+            int(item["id"]): item
+            for item in batch
+            if isinstance(item, dict) and item.get("id")
+        }
+        if not hits:
+            return set()
+        try:
+            async with async_session() as session:
+                result = await session.execute(_FRESH_ROWS_STMT, {"opp_ids": list(hits), "since": since})
+                rows = result.all()
+        except Exception as e:
+            logger.warning(f"Freshness check failed, fetching the whole batch: {e}")
+            return set()
+        return {
+            opp_id
+            for opp_id, close_date, status in rows
+            if status == (hits[opp_id].get("oppStatus") or "").lower()
+            and close_date == self._parse_date(hits[opp_id].get("closeDate"))
+        }
+
+    async def _consume_details(self, queue: asyncio.Queue):
+        """Drain queued details into bulk upserts until the end marker."""
+        pending: list[dict] = []
+        while True:
+            detail = await queue.get()
+            if detail is None:
+                break
+            pending.append(detail)
+            # Write to DB in large bulk batches, one writer at a time to avoid deadlocks
+            if len(pending) >= UPSERT_BATCH_SIZE:
+                await self._upsert_details(pending)
+                pending = []
+                await self._publish_progress()
+        if pending:
+            await self._upsert_details(pending)
+
     async def full_sync(self, skip_discovery: bool = False, opp_types: list[str] | None = None):
         if self.is_syncing:
             logger.warning("Sync already in progress")
             return
+        if not await self._acquire_lock():
+            logger.warning("Sync already in progress on another worker")
+            return
 
         self.is_syncing = True
         self._cancel_requested = False
         self._task = asyncio.current_task()
+        self._start_heartbeat()
         sync_type = "refresh" if skip_discovery else "full"
         self.sync_stats = {
             "started": datetime.utcnow().isoformat(),
@@ -407,7 +658,7 @@ class SyncService:
             "total_batches": 0,
             "last_error": None,
             "skipped": 0,
-            "errors_list": [],
+            "errors_list": deque(maxlen=MAX_ERRORS_LISTED),
         }
 
         log_id = await self._create_sync_log(sync_type)
@@ -418,13 +669,14 @@ class SyncService:
                 # Use existing opportunity IDs from the database
                 logger.info("Starting refresh sync (skip discovery)...")
                 self.sync_stats["phase"] = "fetching"
+                # Bare IDs are streamed into one list; the fetch phase accepts
+                # them as well as search-hit dicts
                 async with async_session() as session:
-                    result = await session.execute(
-                        select(Opportunity.opportunity_id)
+                    result = await session.stream_scalars(
+                        select(Opportunity.opportunity_id).execution_options(yield_per=5000)
                     )
-                    opp_ids = [row[0] for row in result.all()]
+                    items = [oid async for oid in result]
 
-                items = [{"id": oid} for oid in opp_ids]
                 logger.info(f"Found {len(items)} existing opportunities to refresh")
             else:
                 logger.info("Starting full sync from Grants.gov...")
@@ -436,7 +688,7 @@ class SyncService:
                     self.sync_stats["listing_fetched"] = fetched
                     self.sync_stats["listing_estimated"] = estimated
                     # Schedule async publish so pipeline progress hook fires
-                    asyncio.ensure_future(self._publish_stats())
+                    asyncio.ensure_future(self._publish_progress())
 
                 items = await self.client.fetch_all_opportunities(
                     opp_statuses=opp_types,
@@ -452,16 +704,14 @@ class SyncService:
 
                 logger.info(f"Found {len(items)} opportunities to sync")
 
-            # Build a map of search hit close dates
-            close_dates = {}
-            for item in items:
-                if isinstance(item, dict):
-                    oid = item.get("id")
-                    cd = item.get("closeDate")
-                    if oid and cd:
-                        close_dates[int(oid)] = cd
+            # Build a map of search hit close dates; refresh items are bare IDs
+            close_dates = {} if skip_discovery else {
+                int(item["id"]): item["closeDate"]
+                for item in items
+                if isinstance(item, dict) and item.get("id") and item.get("closeDate")
+            }
 
-            await self._run_fetch_phase(items, close_dates, log_id)
+            await self._run_fetch_phase(items, close_dates, log_id, skip_fresh=not skip_discovery)
 
         except asyncio.CancelledError:
             logger.info("Sync cancelled via task cancellation")
@@ -480,6 +730,8 @@ class SyncService:
             self._cancel_requested = False
             self._current_log_id = None
             self._task = None
+            self._stop_heartbeat()
+            await self._release_lock()
             await self._publish_stats()
 
     async def _fetch_detail(self, opp_id: int, close_date_str: str | None = None) -> dict | None:
@@ -501,40 +753,127 @@ class SyncService:
             self._add_error(opp_id, str(e))
             return None
 
-    async def _upsert_detail(self, detail: dict):
-        """Write a fetched detail to DB (must be called sequentially)."""
-        opp_id = detail.get("_opp_id", 0)
+    def _build_batch(self, details: list[dict], now: datetime) -> tuple[list[dict], list[tuple[int, str]]]:
+        """Build rows for a batch of details; returns (rows, errors)."""
+        errors: list[tuple[int, str]] = []
+        rows_by_opp_id = {}
+        for detail in details:
+            opp_id = detail.get("_opp_id", 0)
+            try:
+                rows = self._build_rows(detail, now)
+            except Exception as e:
+                logger.error(f"Error building rows for opportunity {opp_id}: {e}", exc_info=True)
+                rows = None
+            if rows is None:
+                errors.append((opp_id, "Upsert returned None"))
+                continue
+            # A repeated ID keeps its latest detail
+            rows_by_opp_id[rows["opportunity"]["opportunity_id"]] = rows
+        return list(rows_by_opp_id.values()), errors
+
+    async def _flush_partial(self, details: list[dict]):
+        """Write details fetched before a sync stopped early, so a retry doesn't refetch them."""
+        if not details:
+            return
         try:
+            await self._upsert_details(details)
+        except Exception as e:
+            logger.error(f"Failed to save {len(details)} fetched opportunities: {e}")
+        details.clear()
+
+    async def _upsert_details(self, details: list[dict]):
+        """Write fetched details to DB in one transaction (must be called sequentially).
+
+        If the bulk write fails, each detail is retried on its own so one bad
+        record doesn't cost the whole batch. Counters are kept locally and
+        added to sync_stats once at the end.
+        """
+        now = datetime.utcnow()
+        success = 0
+        # Row building (mostly description classification) is CPU-bound, so it
+        # runs in a worker thread to keep the fetch coroutines moving
+        loop = asyncio.get_running_loop()
+        batch, errors = await loop.run_in_executor(None, self._build_batch, details, now)
+        retry_individually = False
+        if batch:
+            try:
+                async with async_session() as session:
+                    async with session.begin():
+                        await self._upsert_batch(session, batch)
+                success = len(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    opp_id = batch[0]["opportunity"]["opportunity_id"]
+                    logger.error(f"Error upserting opportunity {opp_id}: {e}")
+                    errors.append((opp_id, str(e)))
+                else:
+                    logger.warning(f"Bulk upsert of {len(batch)} opportunities failed, retrying individually: {e}")
+                    retry_individually = True
+
+        if retry_individually:
+            # Same session and transaction; a savepoint per record isolates failures
+            written = 0
+            failed: list[tuple[int, str]] = []
+            try:
+                async with async_session() as session:
+                    async with session.begin():
+                        for rows in batch:
+                            opp_id = rows["opportunity"]["opportunity_id"]
+                            try:
+                                async with session.begin_nested():
+                                    await self._upsert_batch(session, [rows])
+                                written += 1
+                            except Exception as e:
+                                logger.error(f"Error upserting opportunity {opp_id}: {e}")
+                                failed.append((opp_id, str(e)))
+                success = written
+                errors.extend(failed)
+            except Exception as e:
+                logger.error(f"Retrying {len(batch)} opportunities individually failed: {e}")
+                errors.extend((rows["opportunity"]["opportunity_id"], str(e)) for rows in batch)
+
+        self.sync_stats["success"] = self.sync_stats.get("success", 0) + success
+        self.sync_stats["errors"] = self.sync_stats.get("errors", 0) + len(errors)
+        for opp_id, message in errors:
+            self._add_error(opp_id, message)
+
+    async def _close_past_deadline(self):
+        """Mark past-deadline posted opportunities as closed, in short transactions.
+
+        Each chunk seeks ix_opp_status_close_ceiling on (status, close_date)
+        and commits, so row locks are never held for the whole table.
+        """
+        total = 0
+        while True:
             async with async_session() as session:
                 async with session.begin():
-                    result = await self._upsert_opportunity(session, detail)
-                    if result:
-                        self.sync_stats["success"] = self.sync_stats.get("success", 0) + 1
-                    else:
-                        self.sync_stats["errors"] = self.sync_stats.get("errors", 0) + 1
-                        self._add_error(opp_id, "Upsert returned None")
-        except Exception as e:
-            logger.error(f"Error upserting opportunity {opp_id}: {e}")
-            self.sync_stats["errors"] = self.sync_stats.get("errors", 0) + 1
-            self._add_error(opp_id, str(e))
+                    result = await session.execute(_CLOSE_PAST_DEADLINE_SQL)
+            total += result.rowcount
+            if result.rowcount < CLOSE_CHUNK_SIZE:
+                break
+        if total:
+            logger.info(f"Marked {total} past-deadline opportunities as closed")
 
     def _add_error(self, opp_id: int, message: str):
-        errors_list = self.sync_stats.get("errors_list", [])
-        errors_list.append({"opp_id": opp_id, "message": message[:200]})
-        if len(errors_list) > 20:
-            errors_list = errors_list[-20:]
-        self.sync_stats["errors_list"] = errors_list
+        self.sync_stats["errors_list"].append({"opp_id": opp_id, "message": message[:200]})
         self.sync_stats["last_error"] = f"Opp {opp_id}: {message[:200]}"
 
-    async def incremental_sync(self):
-        """Fetch only recently changed opportunities."""
+    async def incremental_sync(self) -> bool | None:
+        """Fetch only recently changed opportunities.
+
+        Returns True on success, False on failure, None if skipped or cancelled.
+        """
         if self.is_syncing:
             logger.warning("Sync already in progress")
             return
+        if not await self._acquire_lock():
+            logger.warning("Sync already in progress on another worker")
+            return
 
         self.is_syncing = True
         self._cancel_requested = False
         self._task = asyncio.current_task()
+        self._start_heartbeat()
         self.sync_stats = {
             "started": datetime.utcnow().isoformat(),
             "type": "incremental",
@@ -545,11 +884,13 @@ class SyncService:
             "current_batch": 0,
             "total_batches": 10,
             "last_error": None,
-            "errors_list": [],
+            "errors_list": deque(maxlen=MAX_ERRORS_LISTED),
         }
 
         log_id = await self._create_sync_log("incremental")
         self._current_log_id = log_id
+        # Fetched but not yet written; flushed on failure or cancellation too
+        details: list[dict] = []
 
         try:
             logger.info("Starting incremental sync...")
@@ -557,6 +898,7 @@ class SyncService:
             for batch_num in range(10):
                 if self._cancel_requested:
                     logger.info("Sync cancelled by user")
+                    await self._flush_partial(details)
                     self.sync_stats["cancelled"] = True
                     await self._finish_sync_log(log_id, "cancelled", self.sync_stats)
                     return
@@ -576,26 +918,29 @@ class SyncService:
                     if opp_id:
                         detail = await self._fetch_detail(int(opp_id), item.get("closeDate"))
                         if detail:
-                            await self._upsert_detail(detail)
+                            details.append(detail)
+                if len(details) >= UPSERT_BATCH_SIZE:
+                    await self._upsert_details(details)
+                    details = []
 
-            # Mark past-deadline opportunities as closed
-            async with async_session() as session:
-                async with session.begin():
-                    await session.execute(
-                        text(
-                            "UPDATE opportunities SET status = 'closed' "
-                            "WHERE status = 'posted' AND close_date < CURDATE()"
-                        )
-                    )
+            # All pages usually fit in one batch, so this is one transaction
+            if details:
+                await self._upsert_details(details)
+                details = []
+
+            await self._close_past_deadline()
 
-            await cache_service.invalidate_all()
+            await self._refresh_facet_summary()
+            await cache_service.invalidate_prefix(*OPPORTUNITY_CACHE_PREFIXES)
             self.last_sync = datetime.utcnow()
             self.sync_stats["completed"] = self.last_sync.isoformat()
             logger.info(f"Incremental sync completed: {self.sync_stats}")
             await self._finish_sync_log(log_id, "completed", self.sync_stats)
+            return True
 
         except asyncio.CancelledError:
             logger.info("Incremental sync cancelled via task cancellation")
+            await self._flush_partial(details)
             self.sync_stats["cancelled"] = True
             try:
                 await self._finish_sync_log(log_id, "cancelled", self.sync_stats, "Cancelled by user")
@@ -603,14 +948,18 @@ class SyncService:
                 pass
         except Exception as e:
             logger.error(f"Incremental sync failed: {e}", exc_info=True)
+            await self._flush_partial(details)
             self.sync_stats["error"] = str(e)
             self.sync_stats["last_error"] = str(e)
             await self._finish_sync_log(log_id, "failed", self.sync_stats, str(e))
+            return False
         finally:
             self.is_syncing = False
             self._cancel_requested = False
             self._current_log_id = None
             self._task = None
+            self._stop_heartbeat()
+            await self._release_lock()
             await self._publish_stats()
 
 
@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Any
+from typing import Any, AsyncIterator
 
 import httpx
 
@@ -9,6 +9,12 @@ from app.services.retry import MAX_RETRIES, RETRY_BACKOFF
 
 logger = logging.getLogger(__name__)
 PAGE_SIZE = 100  # Esploro max per page
+RESEARCHER_CACHE_SIZE = 4096
+RESEARCHER_CACHE_TTL = 3600  # seconds
+
+
+class _FetchAbandoned(Exception):
+    """The caller that owned a shared fetch was cancelled before it finished."""
 
 
 class VersoClient:
@@ -17,8 +23,14 @@ class VersoClient:
     def __init__(self, delay: float = 0.025, max_concurrent: int = 3):
         # 0.025s delay = ~40 req/s, well under the 50/s institution-wide limit
         self._delay = delay
+        self._max_concurrent = max_concurrent
         self._semaphore = asyncio.Semaphore(max_concurrent)
         self._last_request_time = 0.0
+        self._client: httpx.AsyncClient | None = None
+        # primary_id -> (expires_at, record, etag, last_modified); insertion-ordered for LRU eviction
+        self._researcher_cache: dict[str, tuple[float, dict, str | None, str | None]] = {}
+        # (primary_id, etag, last_modified) -> future shared by concurrent callers
+        self._researcher_inflight: dict[tuple, asyncio.Future] = {}
 
     @property
     def _base_url(self) -> str:
@@ -41,33 +53,71 @@ class VersoClient:
             "Authorization": f"apikey {self._api_key}",
         }
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use.
+
+        One pooled HTTP/2 client is reused for every VERSO call so requests
+        share keep-alive connections instead of paying a TLS handshake each.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers=self._headers,
+                http2=True,
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=self._max_concurrent,
+                    max_keepalive_connections=self._max_concurrent,
+                ),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     async def _throttle(self):
-        now = asyncio.get_event_loop().time()
-        elapsed = now - self._last_request_time
-        if elapsed < self._delay:
-            await asyncio.sleep(self._delay - elapsed)
-        self._last_request_time = asyncio.get_event_loop().time()
+        """Space requests at least self._delay apart across concurrent callers.
+
+        Each caller reserves the next free slot before sleeping, so callers
+        arriving together are staggered instead of all firing at once.
+        """
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._last_request_time + self._delay)
+        self._last_request_time = slot
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
     async def _get_with_retry(self, path: str, params: dict | None = None) -> Any:
-        url = f"{self._base_url}{path}"
+        response = await self._request_with_retry(path, params=params)
+        return response.json()
+
+    async def _request_with_retry(
+        self, path: str, params: dict | None = None, headers: dict | None = None,
+    ) -> httpx.Response:
+        """GET with throttling and retries; returns any 2xx or 304 response."""
         merged_params = self._params(params)
 
         for attempt in range(MAX_RETRIES):
             await self._throttle()
             try:
                 async with self._semaphore:
-                    async with httpx.AsyncClient(timeout=30.0) as client:
-                        response = await client.get(url, params=merged_params, headers=self._headers)
+                    # Auth and Accept headers are client defaults; only extras go per request
+                    response = await self._get_client().get(path, params=merged_params, headers=headers)
 
-                        if response.status_code == 429:
-                            # Check X-Exl-Api-Remaining header
-                            wait = RETRY_BACKOFF[min(attempt, len(RETRY_BACKOFF) - 1)]
-                            logger.warning(f"VERSO rate limited (429), waiting {wait}s (attempt {attempt + 1})")
-                            await asyncio.sleep(wait)
-                            continue
+                    if response.status_code == 429:
+                        # Check X-Exl-Api-Remaining header
+                        wait = RETRY_BACKOFF[min(attempt, len(RETRY_BACKOFF) - 1)]
+                        logger.warning(f"VERSO rate limited (429), waiting {wait}s (attempt {attempt + 1})")
+                        await asyncio.sleep(wait)
+                        continue
 
-                        response.raise_for_status()
-                        return response.json()
+                    if response.status_code == 304:
+                        return response
+
+                    response.raise_for_status()
+                    return response
 
             except (httpx.ConnectError, httpx.ReadTimeout, httpx.RemoteProtocolError) as e:
                 wait = RETRY_BACKOFF[min(attempt, len(RETRY_BACKOFF) - 1)]
@@ -75,17 +125,16 @@ class VersoClient:
                 await asyncio.sleep(wait)
                 continue
 
-        raise RuntimeError(f"VERSO: failed after {MAX_RETRIES} retries for {url}")
+        raise RuntimeError(f"VERSO: failed after {MAX_RETRIES} retries for {self._base_url}{path}")
 
-    async def _paginate(self, path: str, params: dict | None = None, cancel_check=None) -> list[dict]:
-        """Paginate through all results using offset/limit."""
-        all_items = []
+    async def _paginate(self, path: str, params: dict | None = None, cancel_check=None) -> AsyncIterator[dict]:
+        """Yield all results using offset/limit, one page in memory at a time."""
         offset = 0
         base_params = dict(params or {})
 
         while True:
             if cancel_check and cancel_check():
-                return all_items
+                return
 
             page_params = {**base_params, "offset": offset, "limit": PAGE_SIZE}
             data = await self._get_with_retry(path, params=page_params)
@@ -110,42 +159,113 @@ class VersoClient:
             if not items:
                 break
 
-            all_items.extend(items)
-            logger.info(f"VERSO: fetched {len(items)} items from {path} (offset={offset}, total={len(all_items)})")
+            logger.info(f"VERSO: fetched {len(items)} items from {path} (offset={offset}, total={offset + len(items)})")
+            for item in items:
+                yield item
 
             if len(items) < PAGE_SIZE:
                 break
 
             offset += len(items)
 
-        return all_items
-
-    async def fetch_researcher(self, primary_id: str) -> dict:
-        """Fetch a single researcher's full record from VERSO."""
-        return await self._get_with_retry(
-            f"/researchers/{primary_id}",
-            params={"user_id_type": "all_unique", "view": "full"},
-        )
-
-    async def fetch_researcher_assets(self, primary_id: str, cancel_check=None) -> list[dict]:
-        """Fetch all assets (publications, etc.) for a researcher."""
-        return await self._paginate(
+    async def fetch_researcher(
+        self, primary_id: str, etag: str | None = None, last_modified: str | None = None,
+    ) -> dict | None:
+        """Fetch a single researcher's full record from VERSO.
+
+        When etag/last_modified from a previous fetch are given the request is
+        conditional and None is returned if the record has not changed.
+        Results are cached for RESEARCHER_CACHE_TTL seconds and concurrent
+        requests for the same record share a single in-flight fetch.
+        """
+        loop = asyncio.get_running_loop()
+        cached = self._researcher_cache.get(primary_id)
+        if cached:
+            expires_at, data, cached_etag, cached_last_modified = cached
+            if expires_at > loop.time():
+                # Refresh LRU position
+                self._researcher_cache[primary_id] = self._researcher_cache.pop(primary_id)
+                if (etag or last_modified) and (etag, last_modified) == (cached_etag, cached_last_modified):
+                    return None
+                return data
+            del self._researcher_cache[primary_id]
+
+        key = (primary_id, etag, last_modified)
+        inflight = self._researcher_inflight.get(key)
+        if inflight:
+            try:
+                return await asyncio.shield(inflight)
+            except _FetchAbandoned:
+                # The owner's cancellation isn't ours; fetch it ourselves
+                return await self.fetch_researcher(primary_id, etag, last_modified)
+
+        future = loop.create_future()
+        self._researcher_inflight[key] = future
+        try:
+            headers = {}
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            response = await self._request_with_retry(
+                f"/researchers/{primary_id}",
+                params={"user_id_type": "all_unique", "view": "full"},
+                headers=headers,
+            )
+            data = None if response.status_code == 304 else response.json()
+        except asyncio.CancelledError:
+            # Fail waiters with a plain exception so they retry rather than
+            # look cancelled themselves
+            self._researcher_inflight.pop(key, None)
+            future.set_exception(_FetchAbandoned())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited isn't logged
+            future.exception()
+            raise
+        else:
+            future.set_result(data)
+            if data is not None:
+                self._researcher_cache[primary_id] = (
+                    loop.time() + RESEARCHER_CACHE_TTL,
+                    data,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
+                while len(self._researcher_cache) > RESEARCHER_CACHE_SIZE:
+                    del self._researcher_cache[next(iter(self._researcher_cache))]
+            return data
+        finally:
+            self._researcher_inflight.pop(key, None)
+
+    def get_validators(self, primary_id: str) -> tuple[str | None, str | None]:
+        """Return the (ETag, Last-Modified) of the cached record for primary_id."""
+        cached = self._researcher_cache.get(primary_id)
+        if not cached:
+            return None, None
+        return cached[2], cached[3]
+
+    def fetch_researcher_assets(self, primary_id: str, cancel_check=None) -> AsyncIterator[dict]:
+        """Stream all assets (publications, etc.) for a researcher."""
+        return self._paginate(
             "/assets",
             params={"user_primary_id": primary_id},
             cancel_check=cancel_check,
         )
 
-    async def fetch_grants(self, cancel_check=None) -> list[dict]:
-        """Fetch all grants from VERSO."""
-        return await self._paginate("/grants", cancel_check=cancel_check)
+    def fetch_grants(self, cancel_check=None) -> AsyncIterator[dict]:
+        """Stream all grants from VERSO."""
+        return self._paginate("/grants", cancel_check=cancel_check)
 
-    async def fetch_projects(self, cancel_check=None) -> list[dict]:
-        """Fetch all projects from VERSO."""
-        return await self._paginate("/projects", cancel_check=cancel_check)
+    def fetch_projects(self, cancel_check=None) -> AsyncIterator[dict]:
+        """Stream all projects from VERSO."""
+        return self._paginate("/projects", cancel_check=cancel_check)
 
-    async def fetch_activities(self, cancel_check=None) -> list[dict]:
-        """Fetch all activities from VERSO."""
-        return await self._paginate("/activities", cancel_check=cancel_check)
+    def fetch_activities(self, cancel_check=None) -> AsyncIterator[dict]:
+        """Stream all activities from VERSO."""
+        return self._paginate("/activities", cancel_check=cancel_check)
 
 
 verso_client = VersoClient()
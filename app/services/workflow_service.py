@@ -1,13 +1,17 @@
 import asyncio
+import functools
 import json
 import logging
+import time
 import zlib
 import base64
 from datetime import datetime
 
-from sqlalchemy import select, func, update
+from sqlalchemy import select, func, insert, update, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from app.config import settings
 from app.database import async_session
 from app.models.agent import Workflow, WorkflowRun, WorkflowStep, AgentMatch
 from app.services.cache_service import cache_service
@@ -19,29 +23,88 @@ WORKFLOW_LOCK_TTL = 600  # 10 minutes
 WORKFLOW_PROGRESS_PREFIX = "pf:workflow"
 MAX_AUTO_RETRIES = 10
 COMPRESS_THRESHOLD = 100_000  # bytes — zlib compress payloads above this
+COMPRESS_LEVEL = 1  # zlib's fastest level; state JSON still shrinks well
+CHECKPOINT_TTL = 86400  # seconds — Redis copy of a run's latest checkpoint
+CHECKPOINT_FLUSH_INTERVAL = 10.0  # seconds — min gap between DB checkpoint writes per run
+CHECKPOINT_MAX_DELTAS = 8  # node deltas kept in Redis before a full snapshot is rewritten
+
+
+# AgentMatch columns returned by get_run_match_dicts, in API field order
+_MATCH_COLUMNS = (
+    AgentMatch.id, AgentMatch.run_id, AgentMatch.researcher_id, AgentMatch.opportunity_id,
+    AgentMatch.overall_score, AgentMatch.relevance_score, AgentMatch.feasibility_score,
+    AgentMatch.impact_score, AgentMatch.justification, AgentMatch.critique,
+    AgentMatch.summary, AgentMatch.confidence, AgentMatch.computed_at,
+)
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+# Checkpoint keys hold the only up-to-date copy between DB flushes, so they
+# must stay outside cache_service.CACHE_PREFIXES and survive invalidate_all()
+def _checkpoint_key(run_id: int) -> str:
+    return f"{WORKFLOW_PROGRESS_PREFIX}:{run_id}:checkpoint"
+
+
+def _checkpoint_deltas_key(run_id: int) -> str:
+    return f"{WORKFLOW_PROGRESS_PREFIX}:{run_id}:checkpoint_deltas"
+
+
+def _decode_json(value):
+    """Decode a JSON text column, passing through values that aren't JSON text."""
+    if not value:
+        return None
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+DEFAULT_WORKFLOWS = [
+    {
+        "slug": "matchmaking",
+        "name": "Researcher-Opportunity Matchmaking",
+        "description": "Multi-agent workflow that matches researchers with grant opportunities using LLM evaluation, critique, and summarization.",
+        "enabled": True,
+    },
+]
 
 
 class WorkflowService:
 
     def __init__(self):
         self._running_tasks: dict[int, asyncio.Task] = {}
-        self._cancel_requested: dict[int, bool] = {}
+        # run_id -> set when cancellation of a run on this worker is requested
+        self._cancel_requested: dict[int, asyncio.Event] = {}
+        self._compiled_graph = None
+        # slug -> workflows.id; rows are never deleted, so ids are stable
+        self._workflow_ids: dict[str, int] = {}
+        # Owner token of the workflow lock while this worker holds it
+        self._lock_token: str | None = None
+        # Number of run tasks on this worker that haven't finished yet
+        self._active_count = 0
+        # run_id -> (node, state snapshot, serialized form if already built)
+        # not yet written to the DB
+        self._checkpoint_buffer: dict[int, tuple[str, dict, str | None]] = {}
+        self._checkpoint_flushed_at: dict[int, float] = {}
+        # run_id -> node deltas appended in Redis since the last full snapshot
+        self._checkpoint_deltas: dict[int, int] = {}
+        # Strong refs to in-flight background progress writes
+        self._progress_tasks: set[asyncio.Task] = set()
 
     async def _acquire_lock(self) -> bool:
-        try:
-            if cache_service._redis:
-                return await cache_service._redis.set(
-                    WORKFLOW_LOCK_KEY, "1", nx=True, ex=WORKFLOW_LOCK_TTL
-                )
-        except Exception:
-            pass
-        return True
+        self._lock_token = await cache_service.acquire_lock(WORKFLOW_LOCK_KEY, WORKFLOW_LOCK_TTL)
+        return self._lock_token is not None
 
     async def _release_lock(self):
-        try:
-            await cache_service.delete(WORKFLOW_LOCK_KEY)
-        except Exception:
-            pass
+        """Release the workflow lock if this worker still owns it."""
+        token, self._lock_token = self._lock_token, None
+        if token:
+            await cache_service.release_lock(WORKFLOW_LOCK_KEY, token)
 
     async def _publish_progress(self, run_id: int, data: dict):
         try:
@@ -50,14 +113,68 @@ class WorkflowService:
         except Exception:
             pass
 
+    def _publish_progress_bg(self, run_id: int, data: dict):
+        """Publish progress without waiting for Redis.
+
+        _publish_progress swallows its own errors, so the task is only kept
+        referenced until it finishes.
+        """
+        task = asyncio.create_task(self._publish_progress(run_id, data))
+        self._progress_tasks.add(task)
+        task.add_done_callback(self._progress_tasks.discard)
+
+    async def _publish_node_progress(self, run_id: int, data: dict, checkpoint: dict | None = None) -> bool:
+        """Publish progress and the checkpoint, extend the lock and read the
+        cancel flag in one round trip.
+
+        Returns True if cancellation was requested.
+        """
+        pipe = cache_service.pipeline()
+        if pipe is None:
+            self._checkpoint_deltas.pop(run_id, None)
+            return False
+        try:
+            cache_service.pipe_set(pipe, f"{WORKFLOW_PROGRESS_PREFIX}:{run_id}:progress", data, 120)
+            if checkpoint is None:
+                pass
+            elif "delta" in checkpoint:
+                deltas_key = _checkpoint_deltas_key(run_id)
+                pipe.rpush(deltas_key, json.dumps(checkpoint, default=str, separators=(",", ":")))
+                pipe.expire(deltas_key, CHECKPOINT_TTL)
+            else:
+                cache_service.pipe_set(pipe, _checkpoint_key(run_id), checkpoint, CHECKPOINT_TTL)
+                pipe.delete(_checkpoint_deltas_key(run_id))
+            if self._lock_token:
+                cache_service.pipe_extend_lock(pipe, WORKFLOW_LOCK_KEY, self._lock_token, WORKFLOW_LOCK_TTL)
+            pipe.exists(f"{WORKFLOW_PROGRESS_PREFIX}:{run_id}:cancel")
+            results = await pipe.execute()
+            return bool(results[-1])
+        except Exception:
+            logger.debug("Failed to publish node progress for run %d", run_id, exc_info=True)
+            # The Redis delta chain may now have a gap; restart it from a snapshot
+            self._checkpoint_deltas.pop(run_id, None)
+            return False
+
     async def get_progress(self, run_id: int) -> dict | None:
         key = f"{WORKFLOW_PROGRESS_PREFIX}:{run_id}:progress"
         return await cache_service.get(key)
 
+    def _track_task(self, run_id: int, task: asyncio.Task):
+        self._running_tasks[run_id] = task
+        self._active_count += 1
+        task.add_done_callback(functools.partial(self._task_finished, run_id))
+
+    def _task_finished(self, run_id: int, task: asyncio.Task):
+        self._active_count -= 1
+        # _execute_matchmaking's finally normally does this; a task cancelled
+        # before it ever started running never reaches it
+        if self._running_tasks.get(run_id) is task:
+            del self._running_tasks[run_id]
+            self._cancel_requested.pop(run_id, None)
+
     async def is_running(self) -> bool:
-        for task in self._running_tasks.values():
-            if not task.done():
-                return True
+        if self._active_count > 0:
+            return True
         # Check Redis lock
         try:
             if cache_service._redis:
@@ -71,9 +188,9 @@ class WorkflowService:
     @staticmethod
     def _serialize_state(state: dict) -> str:
         """Serialize MatchmakingState to a string, compressing if large."""
-        raw = json.dumps(state, default=str)
+        raw = json.dumps(state, default=str, separators=(",", ":"))
         if len(raw) > COMPRESS_THRESHOLD:
-            compressed = zlib.compress(raw.encode("utf-8"))
+            compressed = zlib.compress(raw.encode("utf-8"), COMPRESS_LEVEL)
             return "zlib:" + base64.b64encode(compressed).decode("ascii")
         return raw
 
@@ -86,27 +203,92 @@ class WorkflowService:
             return json.loads(raw)
         return json.loads(data)
 
-    async def _save_checkpoint(self, run_id: int, node_name: str, state: dict):
-        """Save checkpoint state to DB after a node completes."""
+    async def _serialize_state_off_loop(self, state: dict) -> str:
+        """_serialize_state in the default executor; big states take tens of ms."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._serialize_state, state)
+
+    async def _buffer_checkpoint(self, run_id: int, node_name: str, state: dict, delta: dict) -> dict | None:
+        """Buffer a node's checkpoint for the DB and build its Redis entry.
+
+        Redis keeps a full serialized snapshot plus the node outputs (deltas)
+        appended since, so most nodes write only what they changed; every
+        CHECKPOINT_MAX_DELTAS nodes the snapshot is rewritten. The returned
+        entry is written by _publish_node_progress; None means the state
+        can't be serialized. The DB copy is only rewritten every
+        CHECKPOINT_FLUSH_INTERVAL seconds per run by _flush_checkpoint_if_due,
+        and the run's failure path flushes whatever is still buffered.
+        """
+        snapshot = dict(state)
+        count = self._checkpoint_deltas.get(run_id)
+        if count is not None and count < CHECKPOINT_MAX_DELTAS:
+            self._checkpoint_buffer[run_id] = (node_name, snapshot, None)
+            self._checkpoint_deltas[run_id] = count + 1
+            return {"node": node_name, "delta": delta}
         try:
-            serialized = self._serialize_state(state)
-            async with async_session() as session:
-                stmt = (
-                    update(WorkflowRun)
-                    .where(WorkflowRun.id == run_id)
-                    .values(
-                        last_completed_node=node_name,
-                        checkpoint_state=serialized,
-                    )
-                )
-                await session.execute(stmt)
-                await session.commit()
+            serialized = await self._serialize_state_off_loop(snapshot)
+        except Exception:
+            logger.exception("Failed to serialize checkpoint for run %d", run_id)
+            self._checkpoint_buffer[run_id] = (node_name, snapshot, None)
+            return None
+        self._checkpoint_buffer[run_id] = (node_name, snapshot, serialized)
+        self._checkpoint_deltas[run_id] = 0
+        return {"node": node_name, "state": serialized}
+
+    async def _flush_checkpoint_if_due(self, run_id: int):
+        elapsed = time.monotonic() - self._checkpoint_flushed_at.get(run_id, 0.0)
+        if cache_service._redis is None or elapsed >= CHECKPOINT_FLUSH_INTERVAL:
+            await self._flush_checkpoint(run_id)
+
+    async def _flush_checkpoint(self, run_id: int):
+        """Write a run's buffered checkpoint, if any, to the DB."""
+        pending = self._checkpoint_buffer.pop(run_id, None)
+        if pending is None:
+            return
+        node_name, state, serialized = pending
+        try:
+            if serialized is None:
+                serialized = await self._serialize_state_off_loop(state)
+            await self._update_run(run_id, last_completed_node=node_name, checkpoint_state=serialized)
+            self._checkpoint_flushed_at[run_id] = time.monotonic()
             logger.debug("Checkpoint saved for run %d at node '%s'", run_id, node_name)
         except Exception:
             logger.exception("Failed to save checkpoint for run %d", run_id)
 
+    async def _load_checkpoint(self, run: WorkflowRun) -> tuple[str | None, dict | None]:
+        """Latest checkpoint of a run as (node, state).
+
+        Redis holds the newest one (snapshot plus node deltas); the DB copy
+        may lag by a flush interval.
+        """
+        checkpoint = await cache_service.get(_checkpoint_key(run.id))
+        if checkpoint:
+            node_name = checkpoint["node"]
+            state = self._deserialize_state(checkpoint["state"])
+            for entry in await cache_service._redis.lrange(_checkpoint_deltas_key(run.id), 0, -1):
+                delta = json.loads(entry)
+                state.update(delta["delta"])
+                node_name = delta["node"]
+            return node_name, state
+        if run.checkpoint_state and run.last_completed_node:
+            return run.last_completed_node, self._deserialize_state(run.checkpoint_state)
+        return None, None
+
+    async def _update_run(self, run_id: int, *criteria, **values) -> int:
+        """Apply values to a run with a single UPDATE; returns rows matched."""
+        async with async_session() as session:
+            result = await session.execute(
+                update(WorkflowRun)
+                .where(WorkflowRun.id == run_id, *criteria)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return result.rowcount
+
     async def _clear_checkpoint(self, run_id: int):
         """Clear checkpoint state after run completes/fails/cancels."""
+        await cache_service.delete(_checkpoint_key(run_id), _checkpoint_deltas_key(run_id))
         try:
             async with async_session() as session:
                 stmt = (
@@ -122,15 +304,6 @@ class WorkflowService:
         except Exception:
             logger.exception("Failed to clear checkpoint for run %d", run_id)
 
-    async def _refresh_lock(self):
-        """Extend the Redis workflow lock TTL to prevent expiry during long runs."""
-        try:
-            r = cache_service._redis
-            if r:
-                await r.expire(WORKFLOW_LOCK_KEY, WORKFLOW_LOCK_TTL)
-        except Exception:
-            logger.debug("Failed to refresh workflow lock TTL", exc_info=True)
-
     # ─── Resume Logic ─────────────────────────────────
 
     async def resume_interrupted_runs(self):
@@ -141,8 +314,8 @@ class WorkflowService:
         restarted from scratch. Cancelled runs are skipped.
         """
         try:
-            # Release any stale lock first
-            await self._release_lock()
+            # Release any stale lock left by a previous process, whatever its owner
+            await cache_service.delete(WORKFLOW_LOCK_KEY)
 
             async with async_session() as session:
                 # Include "failed" runs that have a checkpoint — they crashed
@@ -163,43 +336,53 @@ class WorkflowService:
 
             from app.services.agent_graph import _is_cancelled
 
+            # Sort runs into buckets first, then write each bucket's status
+            # with one UPDATE in a single transaction
+            cancelled_ids, exhausted_ids, resumable = [], [], []
             for run in interrupted:
                 # Check if cancelled while we were down
                 if await _is_cancelled(run.id):
                     logger.info("Run %d was cancelled, marking as cancelled", run.id)
-                    async with async_session() as session:
-                        db_run = await self.get_run(session, run.id)
-                        if db_run:
-                            db_run.status = "cancelled"
-                            db_run.completed_at = datetime.utcnow()
-                            await session.commit()
-                    continue
-
+                    cancelled_ids.append(run.id)
                 # Check retry cap
-                if run.retry_count >= MAX_AUTO_RETRIES:
+                elif run.retry_count >= MAX_AUTO_RETRIES:
                     logger.warning(
                         "Run %d exceeded max auto-retries (%d), marking as failed",
                         run.id, MAX_AUTO_RETRIES,
                     )
-                    async with async_session() as session:
-                        db_run = await self.get_run(session, run.id)
-                        if db_run:
-                            db_run.status = "failed"
-                            db_run.completed_at = datetime.utcnow()
-                            db_run.error_message = f"Exceeded max auto-retries ({MAX_AUTO_RETRIES})"
-                            db_run.checkpoint_state = None
-                            await session.commit()
-                    continue
+                    exhausted_ids.append(run.id)
+                else:
+                    resumable.append(run)
 
-                # Increment retry count
+            if cancelled_ids or exhausted_ids:
+                now = datetime.utcnow()
                 async with async_session() as session:
-                    stmt = (
-                        update(WorkflowRun)
-                        .where(WorkflowRun.id == run.id)
-                        .values(retry_count=WorkflowRun.retry_count + 1)
-                    )
-                    await session.execute(stmt)
+                    if cancelled_ids:
+                        await session.execute(
+                            update(WorkflowRun)
+                            .where(WorkflowRun.id.in_(cancelled_ids))
+                            .values(status="cancelled", completed_at=now)
+                            .execution_options(synchronize_session=False)
+                        )
+                    if exhausted_ids:
+                        await session.execute(
+                            update(WorkflowRun)
+                            .where(WorkflowRun.id.in_(exhausted_ids))
+                            .values(
+                                status="failed",
+                                completed_at=now,
+                                error_message=f"Exceeded max auto-retries ({MAX_AUTO_RETRIES})",
+                                checkpoint_state=None,
+                            )
+                            .execution_options(synchronize_session=False)
+                        )
                     await session.commit()
+                for run_id in exhausted_ids:
+                    await cache_service.delete(_checkpoint_key(run_id), _checkpoint_deltas_key(run_id))
+
+            for run in resumable:
+                # Increment retry count
+                await self._update_run(run.id, retry_count=WorkflowRun.retry_count + 1)
 
                 # Parse input params for researcher/opportunity IDs
                 input_params = {}
@@ -214,17 +397,17 @@ class WorkflowService:
 
                 # Build resume state if checkpoint exists
                 resume_state = None
-                if run.checkpoint_state and run.last_completed_node:
-                    try:
-                        resume_state = self._deserialize_state(run.checkpoint_state)
-                        resume_state["resume_after"] = run.last_completed_node
+                try:
+                    last_node, resume_state = await self._load_checkpoint(run)
+                    if resume_state is not None:
+                        resume_state["resume_after"] = last_node
                         logger.info(
                             "Resuming run %d from checkpoint '%s' (retry %d)",
-                            run.id, run.last_completed_node, run.retry_count + 1,
+                            run.id, last_node, run.retry_count + 1,
                         )
-                    except Exception:
-                        logger.exception("Failed to deserialize checkpoint for run %d, restarting from scratch", run.id)
-                        resume_state = None
+                except Exception:
+                    logger.exception("Failed to deserialize checkpoint for run %d, restarting from scratch", run.id)
+                    resume_state = None
 
                 if not resume_state:
                     logger.info("Restarting run %d from scratch (retry %d)", run.id, run.retry_count + 1)
@@ -234,14 +417,14 @@ class WorkflowService:
                     logger.warning("Cannot resume run %d — workflow lock held, will retry next restart", run.id)
                     break
 
-                self._cancel_requested[run.id] = False
+                self._cancel_requested[run.id] = asyncio.Event()
                 task = asyncio.create_task(
                     self._execute_matchmaking(
                         run.id, researcher_ids, opportunity_ids,
                         resume_state=resume_state,
                     )
                 )
-                self._running_tasks[run.id] = task
+                self._track_task(run.id, task)
 
                 # Only resume one at a time (lock is held)
                 break
@@ -252,25 +435,23 @@ class WorkflowService:
     # ─── Workflow CRUD ────────────────────────────────
 
     async def seed_workflows(self, session: AsyncSession) -> int:
-        """Seed default workflow definitions."""
-        defaults = [
-            {
-                "slug": "matchmaking",
-                "name": "Researcher-Opportunity Matchmaking",
-                "description": "Multi-agent workflow that matches researchers with grant opportunities using LLM evaluation, critique, and summarization.",
-                "enabled": True,
-            },
-        ]
-        count = 0
-        for d in defaults:
-            stmt = select(Workflow).where(Workflow.slug == d["slug"])
-            result = await session.execute(stmt)
-            if not result.scalar_one_or_none():
-                session.add(Workflow(**d))
-                count += 1
-        if count:
-            await session.commit()
-        return count
+        """Seed default workflow definitions with one INSERT IGNORE."""
+        result = await session.execute(insert(Workflow).prefix_with("IGNORE"), DEFAULT_WORKFLOWS)
+        await session.commit()
+        return result.rowcount
+
+    async def _get_workflow_id(self, session: AsyncSession, slug: str) -> int:
+        """Workflow id by slug, seeding defaults if missing; cached per process."""
+        workflow_id = self._workflow_ids.get(slug)
+        if workflow_id is None:
+            result = await session.execute(select(Workflow.id).where(Workflow.slug == slug))
+            workflow_id = result.scalar_one_or_none()
+            if workflow_id is None:
+                await self.seed_workflows(session)
+                result = await session.execute(select(Workflow.id).where(Workflow.slug == slug))
+                workflow_id = result.scalar_one()
+            self._workflow_ids[slug] = workflow_id
+        return workflow_id
 
     async def get_workflow(self, session: AsyncSession, slug: str) -> Workflow | None:
         stmt = select(Workflow).where(Workflow.slug == slug)
@@ -279,19 +460,54 @@ class WorkflowService:
 
     # ─── Run Management ───────────────────────────────
 
-    async def get_runs(self, session: AsyncSession, limit: int = 50) -> list[WorkflowRun]:
+    async def get_runs(
+        self, session: AsyncSession, limit: int = 50, before_id: int | None = None,
+    ) -> list[WorkflowRun]:
+        """Newest runs first; pass the last id of a page as before_id for the next."""
         stmt = (
             select(WorkflowRun)
-            .order_by(WorkflowRun.created_at.desc())
+            .options(defer(WorkflowRun.checkpoint_state))
+            .order_by(WorkflowRun.created_at.desc(), WorkflowRun.id.desc())
             .limit(limit)
         )
+        if before_id is not None:
+            # Keyset on (created_at, id): seeks ix_wr_created instead of
+            # scanning past skipped rows like OFFSET would
+            before_created = (
+                select(WorkflowRun.created_at)
+                .where(WorkflowRun.id == before_id)
+                .scalar_subquery()
+            )
+            stmt = stmt.where(or_(
+                WorkflowRun.created_at < before_created,
+                and_(WorkflowRun.created_at == before_created, WorkflowRun.id < before_id),
+            ))
         result = await session.execute(stmt)
         return list(result.scalars().all())
 
     async def get_run(self, session: AsyncSession, run_id: int) -> WorkflowRun | None:
-        stmt = select(WorkflowRun).where(WorkflowRun.id == run_id)
-        result = await session.execute(stmt)
-        return result.scalar_one_or_none()
+        # Primary-key lookup; served from the identity map if already loaded.
+        # The checkpoint blob is only read by resume, so it isn't fetched here.
+        return await session.get(WorkflowRun, run_id, options=[defer(WorkflowRun.checkpoint_state)])
+
+    async def get_run_detail(
+        self, run_id: int, matches_limit: int = 100,
+    ) -> tuple[WorkflowRun | None, list[WorkflowStep], list[dict]]:
+        """Load a run, its steps and its top match dicts concurrently.
+
+        Each query gets its own session; a single AsyncSession runs its
+        statements one after another on one connection.
+        """
+        async def _load(method, *args):
+            async with async_session() as session:
+                return await method(session, run_id, *args)
+
+        run, steps, matches = await asyncio.gather(
+            _load(self.get_run),
+            _load(self.get_run_steps),
+            _load(self.get_run_match_dicts, matches_limit),
+        )
+        return run, steps, matches
 
     async def get_run_steps(self, session: AsyncSession, run_id: int) -> list[WorkflowStep]:
         stmt = (
@@ -302,15 +518,19 @@ class WorkflowService:
         result = await session.execute(stmt)
         return list(result.scalars().all())
 
-    async def get_run_matches(self, session: AsyncSession, run_id: int, limit: int = 100) -> list[AgentMatch]:
+    async def get_run_match_dicts(self, session: AsyncSession, run_id: int, limit: int = 100) -> list[dict]:
+        """Top matches of a run by overall score, selected as plain columns (no ORM objects)."""
         stmt = (
-            select(AgentMatch)
+            select(*_MATCH_COLUMNS)
             .where(AgentMatch.run_id == run_id)
             .order_by(AgentMatch.overall_score.desc())
             .limit(limit)
         )
         result = await session.execute(stmt)
-        return list(result.scalars().all())
+        matches = [dict(row._mapping) for row in result]
+        for match in matches:
+            match["computed_at"] = _iso(match["computed_at"])
+        return matches
 
     # ─── Start Workflow ───────────────────────────────
 
@@ -327,32 +547,31 @@ class WorkflowService:
         try:
             async with async_session() as session:
                 # Get or create matchmaking workflow
-                workflow = await self.get_workflow(session, "matchmaking")
-                if not workflow:
-                    await self.seed_workflows(session)
-                    workflow = await self.get_workflow(session, "matchmaking")
-
-                run = WorkflowRun(
-                    workflow_id=workflow.id,
-                    status="pending",
-                    trigger=trigger,
-                    input_params=json.dumps({
-                        "researcher_ids": researcher_ids or [],
-                        "opportunity_ids": opportunity_ids or [],
-                    }),
-                    created_at=datetime.utcnow(),
+                workflow_id = await self._get_workflow_id(session, "matchmaking")
+
+                # Core INSERT: the new id comes back with the statement
+                # (cursor lastrowid), so no refresh SELECT is needed
+                result = await session.execute(
+                    insert(WorkflowRun).values(
+                        workflow_id=workflow_id,
+                        status="pending",
+                        trigger=trigger,
+                        input_params=json.dumps({
+                            "researcher_ids": researcher_ids or [],
+                            "opportunity_ids": opportunity_ids or [],
+                        }),
+                        created_at=datetime.utcnow(),
+                    )
                 )
-                session.add(run)
+                run_id = result.inserted_primary_key[0]
                 await session.commit()
-                await session.refresh(run)
-                run_id = run.id
 
             # Launch background task
-            self._cancel_requested[run_id] = False
+            self._cancel_requested[run_id] = asyncio.Event()
             task = asyncio.create_task(
                 self._execute_matchmaking(run_id, researcher_ids, opportunity_ids)
             )
-            self._running_tasks[run_id] = task
+            self._track_task(run_id, task)
 
             return run_id
 
@@ -369,21 +588,23 @@ class WorkflowService:
     ):
         """Execute the matchmaking LangGraph workflow."""
         from app.services.agent_graph import (
-            build_matchmaking_graph, WorkflowCancelledError, _emit_log, _is_cancelled,
+            build_matchmaking_graph, WorkflowCancelledError, _cancel_events, _emit_log, _is_cancelled,
         )
 
+        cancel_event = self._cancel_requested.setdefault(run_id, asyncio.Event())
+        _cancel_events[run_id] = cancel_event
+        watcher = asyncio.create_task(self._watch_cancel(run_id, asyncio.current_task()))
+
         try:
             # Update run status
-            async with async_session() as session:
-                run = await self.get_run(session, run_id)
-                if run:
-                    run.status = "running"
-                    if not run.started_at:
-                        run.started_at = datetime.utcnow()
-                    await session.commit()
+            await self._update_run(
+                run_id,
+                status="running",
+                started_at=func.coalesce(WorkflowRun.started_at, datetime.utcnow()),
+            )
 
             is_resume = resume_state is not None
-            await self._publish_progress(run_id, {
+            self._publish_progress_bg(run_id, {
                 "status": "running",
                 "phase": "resuming" if is_resume else "initializing",
                 "started_at": datetime.utcnow().isoformat(),
@@ -394,9 +615,10 @@ class WorkflowService:
                 "message": f"Matchmaking workflow {'resumed from checkpoint' if is_resume else 'started'}",
             })
 
-            # Build and compile the graph
-            graph = build_matchmaking_graph()
-            compiled = graph.compile()
+            # The graph is static, so it is built and compiled once per process
+            if self._compiled_graph is None:
+                self._compiled_graph = build_matchmaking_graph().compile()
+            compiled = self._compiled_graph
 
             # Initial state — use resume state or build fresh
             if resume_state:
@@ -425,92 +647,124 @@ class WorkflowService:
 
             # Execute the graph with astream for per-node progress
             final_state = dict(initial_state)
-            async for event in compiled.astream(initial_state):
-                for node_name, node_output in event.items():
-                    if isinstance(node_output, dict):
-                        final_state.update(node_output)
-                    # Publish progress after each node
-                    phase = node_output.get("status", node_name) if isinstance(node_output, dict) else node_name
-                    await self._publish_progress(run_id, {
-                        "status": "running",
-                        "phase": phase,
-                    })
-
-                    # Save checkpoint after each node completes
-                    iteration = final_state.get("iteration", 0)
-                    if node_name in ("match", "critique"):
-                        checkpoint_key = f"{node_name}:{iteration}"
-                    else:
-                        checkpoint_key = node_name
-                    await self._save_checkpoint(run_id, checkpoint_key, final_state)
-
-                # Refresh lock TTL after each graph iteration
-                await self._refresh_lock()
-
-                # Check cancellation between nodes
-                if await _is_cancelled(run_id):
-                    raise WorkflowCancelledError("Workflow cancelled between nodes")
+            # A stuck LLM call would otherwise hold the workflow lock forever
+            max_seconds = settings.WORKFLOW_MAX_SECONDS or None
+            deadline = asyncio.timeout(max_seconds)
+            try:
+                async with deadline:
+                    async for event in compiled.astream(initial_state):
+                        phase = None
+                        checkpoint_key = None
+                        delta = {}
+                        for node_name, node_output in event.items():
+                            if isinstance(node_output, dict):
+                                final_state.update(node_output)
+                            phase = node_output.get("status", node_name) if isinstance(node_output, dict) else node_name
+                            if node_output == {}:
+                                # No state delta (e.g. a node skipped on resume):
+                                # the stored checkpoint is still current
+                                continue
+                            if isinstance(node_output, dict):
+                                delta.update(node_output)
+
+                            # Checkpoint after each node that changed the state
+                            iteration = final_state.get("iteration", 0)
+                            if node_name in ("match", "critique"):
+                                checkpoint_key = f"{node_name}:{iteration}"
+                            else:
+                                checkpoint_key = node_name
+                        checkpoint = None
+                        if checkpoint_key:
+                            checkpoint = await self._buffer_checkpoint(run_id, checkpoint_key, final_state, delta)
+
+                        # Publish progress and the checkpoint, refresh the lock
+                        # TTL and check for cancellation between nodes,
+                        # pipelined into one round trip
+                        cancelled = await self._publish_node_progress(run_id, {
+                            "status": "running",
+                            "phase": phase,
+                        }, checkpoint)
+                        await self._flush_checkpoint_if_due(run_id)
+                        if cancelled:
+                            raise WorkflowCancelledError("Workflow cancelled between nodes")
+            except TimeoutError:
+                if not deadline.expired():
+                    raise
+                raise RuntimeError(
+                    f"Workflow exceeded the {max_seconds}s time limit"
+                ) from None
+
+            # From here on the outcome is being recorded; don't interrupt it
+            watcher.cancel()
 
             # Determine final status
-            if self._cancel_requested.get(run_id) or await _is_cancelled(run_id):
+            if cancel_event.is_set() or await _is_cancelled(run_id):
                 status = "cancelled"
             elif final_state.get("errors"):
                 status = "failed"
             else:
                 status = "completed"
 
-            # Update run with results
-            async with async_session() as session:
-                run = await self.get_run(session, run_id)
-                if run:
-                    run.status = status
-                    run.completed_at = datetime.utcnow()
-
-                    matches_count = len(final_state.get("final_matches", []))
-                    run.output_summary = json.dumps({
-                        "matches_produced": matches_count,
-                        "iterations": final_state.get("iteration", 0),
-                        "candidate_pairs": len(final_state.get("candidate_pairs", [])),
-                        "researchers_processed": len(final_state.get("researcher_profiles", [])),
-                        "opportunities_processed": len(final_state.get("opportunity_profiles", [])),
-                    })
-
-                    if final_state.get("errors"):
-                        run.error_message = "; ".join(final_state["errors"][:5])
-
-                    await session.commit()
+            matches_produced = len(final_state.get("final_matches", []))
 
-            # Clear checkpoint on completion
-            await self._clear_checkpoint(run_id)
+            # Update run with results and clear the checkpoint in one statement
+            values = {
+                "status": status,
+                "completed_at": datetime.utcnow(),
+                "output_summary": json.dumps({
+                    "matches_produced": matches_produced,
+                    "iterations": final_state.get("iteration", 0),
+                    "candidate_pairs": len(final_state.get("candidate_pairs", [])),
+                    "researchers_processed": len(final_state.get("researcher_profiles", [])),
+                    "opportunities_processed": len(final_state.get("opportunity_profiles", [])),
+                }),
+                "checkpoint_state": None,
+                "last_completed_node": None,
+            }
+            if final_state.get("errors"):
+                values["error_message"] = "; ".join(final_state["errors"][:5])
+            # The graph is done, so the lock can go while the row is written;
+            # release_lock never raises, and finally's release is then a no-op
+            await asyncio.gather(
+                self._update_run(run_id, **values),
+                self._release_lock(),
+            )
+            await cache_service.delete(_checkpoint_key(run_id), _checkpoint_deltas_key(run_id))
 
-            await self._publish_progress(run_id, {
+            self._publish_progress_bg(run_id, {
                 "status": status,
                 "phase": "done",
                 "completed_at": datetime.utcnow().isoformat(),
-                "matches_produced": len(final_state.get("final_matches", [])),
+                "matches_produced": matches_produced,
             })
 
             await _emit_log(run_id, {
                 "type": "workflow_end",
-                "message": f"Workflow {status}: {len(final_state.get('final_matches', []))} matches produced",
+                "message": f"Workflow {status}: {matches_produced} matches produced",
             })
 
             logger.info("Workflow run %d completed with status: %s", run_id, status)
 
         except (WorkflowCancelledError, asyncio.CancelledError):
+            watcher.cancel()
             logger.info("Workflow run %d cancelled", run_id)
             try:
-                async with async_session() as session:
-                    run = await self.get_run(session, run_id)
-                    if run and run.status not in ("cancelled",):
-                        run.status = "cancelled"
-                        run.completed_at = datetime.utcnow()
-                        await session.commit()
-
-                # Clear checkpoint on cancel
-                await self._clear_checkpoint(run_id)
+                # Mark cancelled and clear the checkpoint; a run already marked
+                # cancelled keeps its completed_at
+                updated = await self._update_run(
+                    run_id,
+                    WorkflowRun.status != "cancelled",
+                    status="cancelled",
+                    completed_at=datetime.utcnow(),
+                    checkpoint_state=None,
+                    last_completed_node=None,
+                )
+                if updated:
+                    await cache_service.delete(_checkpoint_key(run_id), _checkpoint_deltas_key(run_id))
+                else:
+                    await self._clear_checkpoint(run_id)
 
-                await self._publish_progress(run_id, {
+                self._publish_progress_bg(run_id, {
                     "status": "cancelled",
                     "phase": "done",
                 })
@@ -523,19 +777,21 @@ class WorkflowService:
                 logger.exception("Failed to update run status after cancel")
 
         except Exception as e:
+            watcher.cancel()
             logger.exception("Workflow run %d failed", run_id)
             try:
-                async with async_session() as session:
-                    run = await self.get_run(session, run_id)
-                    if run:
-                        run.status = "failed"
-                        run.completed_at = datetime.utcnow()
-                        run.error_message = str(e)[:500]
-                        await session.commit()
+                # Keep the latest checkpoint in the DB for resume
+                await self._flush_checkpoint(run_id)
+                await self._update_run(
+                    run_id,
+                    status="failed",
+                    completed_at=datetime.utcnow(),
+                    error_message=str(e)[:500],
+                )
 
                 # Note: do NOT clear checkpoint on failure — it allows resume on next restart
 
-                await self._publish_progress(run_id, {
+                self._publish_progress_bg(run_id, {
                     "status": "failed",
                     "phase": "error",
                     "error": str(e)[:200],
@@ -549,12 +805,43 @@ class WorkflowService:
                 logger.exception("Failed to update run status after error")
 
         finally:
+            watcher.cancel()
             await self._release_lock()
             self._running_tasks.pop(run_id, None)
             self._cancel_requested.pop(run_id, None)
+            self._checkpoint_buffer.pop(run_id, None)
+            self._checkpoint_flushed_at.pop(run_id, None)
+            self._checkpoint_deltas.pop(run_id, None)
+            _cancel_events.pop(run_id, None)
 
     # ─── Cancel Workflow ──────────────────────────────
 
+    async def _watch_cancel(self, run_id: int, task: asyncio.Task):
+        """Cancel a run's task as soon as any worker requests it.
+
+        Without this, a run on another worker only noticed the Redis flag at
+        its next _check_cancel, which could be after a long LLM call.
+        """
+        pubsub = cache_service.pubsub()
+        if pubsub is None:
+            return
+        try:
+            await pubsub.subscribe(f"{WORKFLOW_PROGRESS_PREFIX}:{run_id}:cancel_notify")
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                event = self._cancel_requested.get(run_id)
+                if event is not None and not event.is_set():
+                    event.set()
+                    task.cancel()
+                return
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.debug("Cancel watcher failed for run %d", run_id, exc_info=True)
+        finally:
+            await pubsub.close()
+
     async def cancel_run(self, run_id: int) -> bool:
         """Request cancellation of a running workflow via Redis flag.
 
@@ -574,13 +861,23 @@ class WorkflowService:
         if not is_running:
             return False
 
-        # Set Redis cancel flag — checked between nodes and batches
+        # If the task is in this worker's memory, cancel it directly
+        event = self._cancel_requested.get(run_id)
+        if event is not None and not event.is_set():
+            event.set()
+            task = self._running_tasks.get(run_id)
+            if task and not task.done():
+                task.cancel()
+
+        # Set Redis cancel flag — checked between nodes and batches — and
+        # wake the worker running it, if that's another one
         try:
             r = cache_service._redis
             if r:
                 await r.set(f"pf:workflow:{run_id}:cancel", "1", ex=600)
         except Exception:
             pass
+        await cache_service.publish(f"{WORKFLOW_PROGRESS_PREFIX}:{run_id}:cancel_notify", "1")
 
         # Emit cancel log event
         try:
@@ -598,12 +895,6 @@ class WorkflowService:
             "phase": "cancelling",
         })
 
-        # If the task happens to be in this worker's memory, also cancel it
-        self._cancel_requested[run_id] = True
-        task = self._running_tasks.get(run_id)
-        if task and not task.done():
-            task.cancel()
-
         return True
 
     # ─── Serialization ────────────────────────────────
@@ -631,25 +922,14 @@ class WorkflowService:
             "input_params": input_params,
             "output_summary": output_summary,
             "error_message": run.error_message,
-            "started_at": run.started_at.isoformat() if run.started_at else None,
-            "completed_at": run.completed_at.isoformat() if run.completed_at else None,
-            "created_at": run.created_at.isoformat() if run.created_at else None,
+            "started_at": _iso(run.started_at),
+            "completed_at": _iso(run.completed_at),
+            "created_at": _iso(run.created_at),
         }
 
     def step_to_dict(self, step: WorkflowStep) -> dict:
-        input_data = None
-        if step.input_data:
-            try:
-                input_data = json.loads(step.input_data)
-            except (json.JSONDecodeError, TypeError):
-                input_data = step.input_data
-
-        output_data = None
-        if step.output_data:
-            try:
-                output_data = json.loads(step.output_data)
-            except (json.JSONDecodeError, TypeError):
-                output_data = step.output_data
+        input_data = _decode_json(step.input_data)
+        output_data = _decode_json(step.output_data)
 
         return {
             "id": step.id,
@@ -663,25 +943,8 @@ class WorkflowService:
             "token_count": step.token_count,
             "duration_ms": step.duration_ms,
             "error_message": step.error_message,
-            "started_at": step.started_at.isoformat() if step.started_at else None,
-            "completed_at": step.completed_at.isoformat() if step.completed_at else None,
-        }
-
-    def match_to_dict(self, match: AgentMatch) -> dict:
-        return {
-            "id": match.id,
-            "run_id": match.run_id,
-            "researcher_id": match.researcher_id,
-            "opportunity_id": match.opportunity_id,
-            "overall_score": match.overall_score,
-            "relevance_score": match.relevance_score,
-            "feasibility_score": match.feasibility_score,
-            "impact_score": match.impact_score,
-            "justification": match.justification,
-            "critique": match.critique,
-            "summary": match.summary,
-            "confidence": match.confidence,
-            "computed_at": match.computed_at.isoformat() if match.computed_at else None,
+            "started_at": _iso(step.started_at),
+            "completed_at": _iso(step.completed_at),
         }
 
 
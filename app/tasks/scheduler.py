@@ -1,88 +1,102 @@
 import logging
+from datetime import datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.config import settings
 from app.services.sync_service import sync_service
 from app.services.researcher_sync_service import researcher_sync_service
+from app.services.search_service import search_service
 
 logger = logging.getLogger(__name__)
 
-scheduler = AsyncIOScheduler()
+# A run may start late when the loop is busy (e.g. mid-sync); APScheduler's
+# default one-second misfire grace would silently skip it instead
+scheduler = AsyncIOScheduler(
+    job_defaults={"coalesce": True, "misfire_grace_time": 3600, "max_instances": 1},
+)
 
-# Per-source state
-_grants_enabled = True
-_grants_interval_hours = settings.SYNC_INTERVAL_HOURS
+# Schedule used until settings are loaded from the DB. Afterwards the jobs
+# themselves are the only record of the schedule: a paused job has no
+# next_run_time and the interval/cron fields live on its trigger.
+DEFAULT_COLLABNET_DAY = "fri"
+DEFAULT_COLLABNET_HOUR = 1
+DEFAULT_COLLABNET_MINUTE = 0
 
-_collabnet_enabled = True
-_collabnet_day = "fri"
-_collabnet_hour = 1
-_collabnet_minute = 0
+# A failed scheduled grants sync is retried after 1, 2, 4, ... minutes (capped)
+# rather than waiting out the whole interval
+GRANTS_RETRY_BASE_SECONDS = 60
+GRANTS_RETRY_MAX_SECONDS = 3600
+_grants_retries = 0
 
-DAY_CHOICES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+DAY_CHOICES = frozenset(("mon", "tue", "wed", "thu", "fri", "sat", "sun"))
 
 
 def setup_scheduler():
     """Initial setup with config defaults (called if DB not available)."""
-    global _grants_interval_hours
-    _grants_interval_hours = settings.SYNC_INTERVAL_HOURS
-    _add_jobs()
+    _add_jobs(
+        settings.SYNC_INTERVAL_HOURS,
+        DEFAULT_COLLABNET_DAY, DEFAULT_COLLABNET_HOUR, DEFAULT_COLLABNET_MINUTE,
+    )
     scheduler.start()
     logger.info(
-        f"Scheduler started: grants every {_grants_interval_hours}h, "
-        f"collabnet {_collabnet_day} {_collabnet_hour:02d}:{_collabnet_minute:02d} UTC"
+        "Scheduler started: grants every %sh, collabnet %s %02d:%02d UTC",
+        settings.SYNC_INTERVAL_HOURS,
+        DEFAULT_COLLABNET_DAY, DEFAULT_COLLABNET_HOUR, DEFAULT_COLLABNET_MINUTE,
     )
 
 
 async def setup_scheduler_from_db():
     """Load persisted settings from DB and start scheduler."""
-    global _grants_enabled, _grants_interval_hours
-    global _collabnet_enabled, _collabnet_day, _collabnet_hour, _collabnet_minute
-
+    grants = {"enabled": True, "interval_hours": settings.SYNC_INTERVAL_HOURS}
+    collabnet = {
+        "enabled": True,
+        "day": DEFAULT_COLLABNET_DAY,
+        "hour": DEFAULT_COLLABNET_HOUR,
+        "minute": DEFAULT_COLLABNET_MINUTE,
+    }
     try:
         from app.database import async_session
         from app.services.settings_service import settings_service
 
         async with async_session() as session:
             grants = await settings_service.get_grants_scheduler_settings(session)
-            _grants_enabled = grants["enabled"]
-            _grants_interval_hours = grants["interval_hours"]
-
             collabnet = await settings_service.get_collabnet_scheduler_settings(session)
-            _collabnet_enabled = collabnet["enabled"]
-            _collabnet_day = collabnet["day"]
-            _collabnet_hour = collabnet["hour"]
-            _collabnet_minute = collabnet["minute"]
 
         logger.info(
-            f"Scheduler settings loaded from DB: grants every {_grants_interval_hours}h "
-            f"({'enabled' if _grants_enabled else 'paused'}), "
-            f"collabnet {_collabnet_day} {_collabnet_hour:02d}:{_collabnet_minute:02d} "
-            f"({'enabled' if _collabnet_enabled else 'paused'})"
+            "Scheduler settings loaded from DB: grants every %sh (%s), collabnet %s %02d:%02d (%s)",
+            grants["interval_hours"], "enabled" if grants["enabled"] else "paused",
+            collabnet["day"], collabnet["hour"], collabnet["minute"],
+            "enabled" if collabnet["enabled"] else "paused",
         )
-    except Exception as e:
-        logger.warning(f"Could not load scheduler settings from DB, using defaults: {e}")
+    except (SQLAlchemyError, OSError) as e:
+        # DB unreachable: start on defaults. Anything else is a bug and
+        # should fail startup rather than silently run the wrong schedule.
+        logger.warning("Could not load scheduler settings from DB, using defaults: %s", e)
 
-    _add_jobs()
+    _add_jobs(grants["interval_hours"], collabnet["day"], collabnet["hour"], collabnet["minute"])
     scheduler.start()
 
     # Apply paused state after start
-    if not _grants_enabled:
+    if not grants["enabled"]:
         job = scheduler.get_job("incremental_sync")
         if job:
             job.pause()
-    if not _collabnet_enabled:
+    if not collabnet["enabled"]:
         job = scheduler.get_job("researcher_sync")
         if job:
             job.pause()
 
 
-def _add_jobs():
-    """Add scheduler jobs with current settings."""
+def _add_jobs(grants_interval_hours: int, collabnet_day: str, collabnet_hour: int, collabnet_minute: int):
+    """Add scheduler jobs with the given schedule."""
     scheduler.add_job(
-        sync_service.incremental_sync,
+        _run_grants_sync,
         "interval",
-        hours=_grants_interval_hours,
+        hours=grants_interval_hours,
         id="incremental_sync",
         name="Incremental sync from Grants.gov",
         replace_existing=True,
@@ -90,23 +104,88 @@ def _add_jobs():
     scheduler.add_job(
         researcher_sync_service.full_sync,
         "cron",
-        day_of_week=_collabnet_day,
-        hour=_collabnet_hour,
-        minute=_collabnet_minute,
+        day_of_week=collabnet_day,
+        hour=collabnet_hour,
+        minute=collabnet_minute,
         id="researcher_sync",
         name="Weekly researcher sync from CollabNet",
         replace_existing=True,
     )
+    # Deadline facet buckets are relative to today, so rebuild just after midnight
+    scheduler.add_job(
+        search_service.refresh_facet_summary,
+        "cron",
+        hour=0,
+        minute=5,
+        id="facet_summary_refresh",
+        name="Daily facet summary refresh",
+        replace_existing=True,
+    )
 
 
 # --- Grants.gov scheduler ---
 
+async def _run_grants_sync():
+    """Scheduled incremental sync; schedules a backoff retry if it fails."""
+    global _grants_retries
+    succeeded = await sync_service.incremental_sync()
+    if succeeded:
+        _grants_retries = 0
+        return
+    if succeeded is None or not _is_job_active("incremental_sync"):
+        return
+
+    delay = min(GRANTS_RETRY_BASE_SECONDS * 2 ** _grants_retries, GRANTS_RETRY_MAX_SECONDS)
+    run_date = datetime.now(scheduler.timezone) + timedelta(seconds=delay)
+    if run_date >= scheduler.get_job("incremental_sync").next_run_time:
+        # The regular run comes first anyway
+        return
+    _grants_retries += 1
+    scheduler.add_job(
+        _run_grants_sync,
+        "date",
+        run_date=run_date,
+        id="incremental_sync_retry",
+        name="Retry of failed Grants.gov sync",
+        replace_existing=True,
+    )
+    logger.warning("Grants.gov sync failed; retry %d in %ds", _grants_retries, delay)
+
+
+def _is_job_active(job_id: str) -> bool:
+    job = scheduler.get_job(job_id)
+    return job is not None and job.next_run_time is not None
+
+
+def _toggle_job(job_id: str) -> bool:
+    """Pause an active job or resume a paused one. Returns the new enabled state."""
+    job = scheduler.get_job(job_id)
+    if not job:
+        return False
+    if job.next_run_time is not None:
+        job.pause()
+        return False
+    job.resume()
+    return True
+
+
+def _reschedule(job_id: str, trigger):
+    """Swap a job's trigger; a paused job stays paused."""
+    if _is_job_active(job_id):
+        scheduler.reschedule_job(job_id, trigger=trigger)
+    else:
+        scheduler.modify_job(job_id, trigger=trigger)
+
+
 def is_grants_enabled() -> bool:
-    return _grants_enabled
+    return _is_job_active("incremental_sync")
 
 
 def get_grants_interval_hours() -> int:
-    return _grants_interval_hours
+    job = scheduler.get_job("incremental_sync")
+    if not job:
+        return settings.SYNC_INTERVAL_HOURS
+    return int(job.trigger.interval.total_seconds() // 3600)
 
 
 def get_next_run_time(job_id: str = "incremental_sync"):
@@ -118,90 +197,81 @@ def get_next_run_time(job_id: str = "incremental_sync"):
 
 def toggle_grants_scheduler() -> bool:
     """Toggle Grants.gov scheduler on/off. Returns new enabled state."""
-    global _grants_enabled
-    job = scheduler.get_job("incremental_sync")
-    if not job:
-        return False
-
-    if _grants_enabled:
-        job.pause()
-        _grants_enabled = False
-        logger.info("Grants.gov scheduler paused")
-    else:
-        job.resume()
-        _grants_enabled = True
-        logger.info("Grants.gov scheduler resumed")
-    return _grants_enabled
+    enabled = _toggle_job("incremental_sync")
+    logger.info("Grants.gov scheduler %s", "resumed" if enabled else "paused")
+    return enabled
 
 
 def update_grants_interval(hours: int):
     """Update Grants.gov sync interval. Reschedules the job."""
-    global _grants_interval_hours
-    _grants_interval_hours = hours
-    scheduler.reschedule_job(
-        "incremental_sync",
-        trigger="interval",
-        hours=hours,
-    )
-    logger.info(f"Grants.gov scheduler interval updated to {hours} hours")
+    if hours == get_grants_interval_hours():
+        # Rescheduling would restart the interval countdown for nothing
+        return
+    trigger = IntervalTrigger(hours=hours, timezone=scheduler.timezone)
+    job = scheduler.get_job("incremental_sync")
+    if job and job.next_run_time is not None:
+        # Keep the pending run unless the new interval brings it forward;
+        # reschedule_job would restart the wait from now
+        now = datetime.now(scheduler.timezone)
+        next_run = min(job.next_run_time, now + timedelta(hours=hours))
+        scheduler.modify_job("incremental_sync", trigger=trigger, next_run_time=next_run)
+    else:
+        _reschedule("incremental_sync", trigger)
+    logger.info("Grants.gov scheduler interval updated to %s hours", hours)
 
 
 # --- CollabNet scheduler ---
 
 def is_collabnet_enabled() -> bool:
-    return _collabnet_enabled
+    return _is_job_active("researcher_sync")
 
 
 def get_collabnet_schedule() -> dict:
+    job = scheduler.get_job("researcher_sync")
+    if not job:
+        return {
+            "day": DEFAULT_COLLABNET_DAY,
+            "hour": DEFAULT_COLLABNET_HOUR,
+            "minute": DEFAULT_COLLABNET_MINUTE,
+        }
+    fields = {field.name: str(field) for field in job.trigger.fields}
     return {
-        "day": _collabnet_day,
-        "hour": _collabnet_hour,
-        "minute": _collabnet_minute,
+        "day": fields["day_of_week"],
+        "hour": int(fields["hour"]),
+        "minute": int(fields["minute"]),
     }
 
 
 def toggle_collabnet_scheduler() -> bool:
     """Toggle CollabNet scheduler on/off. Returns new enabled state."""
-    global _collabnet_enabled
-    job = scheduler.get_job("researcher_sync")
-    if not job:
-        return False
-
-    if _collabnet_enabled:
-        job.pause()
-        _collabnet_enabled = False
-        logger.info("CollabNet scheduler paused")
-    else:
-        job.resume()
-        _collabnet_enabled = True
-        logger.info("CollabNet scheduler resumed")
-    return _collabnet_enabled
+    enabled = _toggle_job("researcher_sync")
+    logger.info("CollabNet scheduler %s", "resumed" if enabled else "paused")
+    return enabled
 
 
 def update_collabnet_schedule(day: str, hour: int, minute: int):
     """Update CollabNet sync schedule (cron). Reschedules the job."""
-    global _collabnet_day, _collabnet_hour, _collabnet_minute
-    _collabnet_day = day
-    _collabnet_hour = hour
-    _collabnet_minute = minute
-    scheduler.reschedule_job(
+    if day not in DAY_CHOICES:
+        raise ValueError(f"Invalid day: {day!r}")
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"Invalid time: {hour:02d}:{minute:02d}")
+    if get_collabnet_schedule() == {"day": day, "hour": hour, "minute": minute}:
+        return
+    _reschedule(
         "researcher_sync",
-        trigger="cron",
-        day_of_week=day,
-        hour=hour,
-        minute=minute,
+        CronTrigger(day_of_week=day, hour=hour, minute=minute, timezone=scheduler.timezone),
     )
-    logger.info(f"CollabNet scheduler updated to {day} {hour:02d}:{minute:02d} UTC")
+    logger.info("CollabNet scheduler updated to %s %02d:%02d UTC", day, hour, minute)
 
 
 # --- Backwards compatibility ---
 
 def is_enabled() -> bool:
-    return _grants_enabled
+    return is_grants_enabled()
 
 
 def get_interval_hours() -> int:
-    return _grants_interval_hours
+    return get_grants_interval_hours()
 
 
 def toggle_scheduler() -> bool: